@@ -0,0 +1,128 @@
+"""Benchmark: eager vs lazy parsing of panel inbounds.
+
+Usage:
+    uv run python benchmarks/bench_inbound_parsing.py [clients ...]
+"""
+
+import json
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.domain.entities import ClientStat, Inbound, Settings
+from src.infrastructure.lazy_inbound import LazyInbound
+
+
+def make_panel_inbound(clients: int) -> dict[str, Any]:
+    """One item of /panel/api/inbounds/list with `clients` clients."""
+    entries = []
+    stats = []
+    for i in range(clients):
+        client_id = str(uuid.uuid4())
+        email = f"client-{i}@vpn.local"
+        entries.append(
+            {
+                "id": client_id,
+                "email": email,
+                "enable": True,
+                "expireTime": 0,
+                "flow": "xtls-rprx-vision",
+                "limitIp": 0,
+                "totalGB": 0,
+                "reset": 0,
+                "subId": uuid.uuid4().hex[:16],
+                "tgId": 0,
+                "comment": "",
+            }
+        )
+        stats.append(
+            {
+                "id": i,
+                "inboundId": 1,
+                "enable": True,
+                "email": email,
+                "uuid": client_id,
+                "subId": entries[-1]["subId"],
+                "up": i * 1024,
+                "down": i * 4096,
+                "allTime": i * 5120,
+                "expiryTime": 0,
+                "total": 0,
+                "reset": 0,
+                "last": 0,
+            }
+        )
+    return {
+        "id": 1,
+        "up": 10**9,
+        "down": 4 * 10**9,
+        "total": 0,
+        "remark": "bench",
+        "enable": True,
+        "port": 443,
+        "protocol": "vless",
+        "settings": json.dumps({"clients": entries, "decryption": "none"}),
+        "streamSettings": json.dumps({"network": "tcp", "security": "reality"}),
+        "sniffing": json.dumps({"enabled": True}),
+        "clientStats": stats,
+    }
+
+
+def eager_parse(data: dict[str, Any]) -> Inbound:
+    """Previous XUIAdapter._parse_inbound: decode everything up front."""
+    settings_raw = json.loads(data.get("settings", "{}"))
+    settings = Settings(**settings_raw) if isinstance(settings_raw, dict) else Settings()
+    return Inbound(
+        id=data.get("id"),
+        up=data.get("up", 0),
+        down=data.get("down", 0),
+        total=data.get("total", 0),
+        remark=data.get("remark", "reality"),
+        enable=data.get("enable", True),
+        port=data.get("port", 443),
+        protocol=data.get("protocol", "vless"),
+        settings=settings,
+        clientStats=[ClientStat(**stat) for stat in data.get("clientStats") or []],
+        stream_settings=json.loads(data.get("streamSettings", "{}")),
+        sniffing=json.loads(data.get("sniffing", "{}")),
+    )
+
+
+def measure(
+    parse: Callable[[dict[str, Any]], Inbound],
+    use: Callable[[Inbound], Any],
+    data: dict[str, Any],
+    repeat: int = 5,
+) -> float:
+    """Best wall time of parsing and using an inbound, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        use(parse(data))
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000]
+    print(f"{'clients':>8} {'case':<28} {'eager ms':>10} {'lazy ms':>10} {'speedup':>8}")
+    for size in sizes:
+        data = make_panel_inbound(size)
+        cases: dict[str, Callable[[Inbound], Any]] = {
+            "traffic (up/down)": lambda i: (i.up, i.down, i.total),
+            "client stats": lambda i: len(i.clientStats),
+            "full (clients + stats)": lambda i: (len(i.settings.clients), len(i.clientStats)),
+        }
+        for name, use in cases.items():
+            eager = measure(eager_parse, use, data)
+            lazy = measure(LazyInbound.from_panel, use, data)
+            print(f"{size:>8} {name:<28} {eager:>10.2f} {lazy:>10.2f} {eager / lazy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Benchmark: JSON backends on a panel inbound listing.
+
+Usage:
+    uv run --extra fast-json python benchmarks/bench_json_codec.py [clients]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_inbound_parsing import make_panel_inbound
+from src.infrastructure.codec import get_codec
+
+
+def main() -> None:
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    listing = {"success": True, "msg": "", "obj": [make_panel_inbound(clients)]}
+    body = json.dumps(listing).encode()
+
+    print(f"{len(body) / 1e6:.1f} MB listing, {clients} clients")
+    print(f"{'codec':<10} {'loads ms':>10} {'dumps ms':>10}")
+    for name in ("stdlib", "orjson", "msgspec"):
+        try:
+            codec = get_codec(name)
+        except ValueError:
+            print(f"{name:<10} not installed")
+            continue
+        timings = []
+        for func, arg in ((codec.loads, body), (codec.dumps_bytes, listing)):
+            best = float("inf")
+            for _ in range(5):
+                started = time.perf_counter()
+                func(arg)
+                best = min(best, time.perf_counter() - started)
+            timings.append(best * 1000)
+        print(f"{name:<10} {timings[0]:>10.2f} {timings[1]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
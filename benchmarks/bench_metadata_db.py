@@ -0,0 +1,88 @@
+"""Benchmark: client metadata reads and writes under concurrency per engine profile.
+
+Compares SQLite with its default rollback journal against the tuned WAL
+profile (or measures a server database given by URL).
+
+Usage:
+    uv run python benchmarks/bench_metadata_db.py [workers] [seconds] [--database-url URL]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.infrastructure.persistence import ClientMetadataRepository, Database, EngineOptions
+
+ROWS = 5_000
+READ_RATIO = 0.9
+BATCH = 50
+
+
+async def _worker(db: Database, deadline: float, seed: int) -> tuple[int, int, int]:
+    rnd = random.Random(seed)
+    reads = writes = errors = 0
+    while time.perf_counter() < deadline:
+        ids = [f"client-{rnd.randrange(ROWS)}" for _ in range(BATCH)]
+        try:
+            async with db.session() as session:
+                repository = ClientMetadataRepository(session)
+                if rnd.random() < READ_RATIO:
+                    await repository.get_by_client_ids(ids)
+                    reads += 1
+                else:
+                    await repository.update_owner_ref(ids[0], f"owner-{rnd.randrange(100)}")
+                    writes += 1
+        except Exception:
+            errors += 1
+    return reads, writes, errors
+
+
+async def run(name: str, url: str, options: EngineOptions, workers: int, seconds: float) -> None:
+    db = Database(url, options=options)
+    try:
+        await db.prepare_schema()
+        async with db.session() as session:
+            repository = ClientMetadataRepository(session)
+            await repository.delete_many([f"client-{i}" for i in range(ROWS)])
+            await repository.create_many([(f"client-{i}", None) for i in range(ROWS)])
+
+        deadline = time.perf_counter() + seconds
+        results = await asyncio.gather(*(_worker(db, deadline, i) for i in range(workers)))
+        reads, writes, errors = (sum(column) for column in zip(*results))
+        print(f"{name:<12} {reads / seconds:>10.0f} {writes / seconds:>10.0f} {errors:>8}")
+    finally:
+        await db.close()
+
+
+async def amain(args: argparse.Namespace) -> None:
+    print(f"{args.workers} workers, {args.seconds:.0f}s, {ROWS} rows, reads of {BATCH} ids")
+    print(f"{'profile':<12} {'reads/s':>10} {'writes/s':>10} {'errors':>8}")
+    if args.database_url:
+        await run("tuned", args.database_url, EngineOptions(), args.workers, args.seconds)
+        return
+
+    default = EngineOptions(
+        sqlite_journal_mode="DELETE", sqlite_synchronous="FULL", sqlite_mmap_size=0
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, options in (("default", default), ("wal", EngineOptions())):
+            url = f"sqlite+aiosqlite:///{tmp}/{name}.db"
+            await run(name, url, options, args.workers, args.seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("workers", type=int, nargs="?", default=16)
+    parser.add_argument("seconds", type=float, nargs="?", default=5.0)
+    parser.add_argument("--database-url", help="Server database to measure instead of SQLite")
+    asyncio.run(amain(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
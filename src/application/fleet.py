@@ -0,0 +1,95 @@
+"""Fleet-wide use cases spanning many VPN nodes."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Collection, Mapping
+from dataclasses import dataclass
+
+from src.application.services import VPNManagementService
+from src.domain.entities import ClientRecord, Inbound, InboundTraffic, ServerStats
+from src.domain.exceptions import DomainException
+from src.domain.ports import VPNServerPort
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NodeResult[T]:
+    """Result of a read on one node; `value` is None when the node failed."""
+
+    node: str
+    value: T | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the node answered in time."""
+        return self.error is None
+
+
+class FleetService:
+    """Reads fanned out to all VPN nodes concurrently.
+
+    Every node gets its own timeout; a failed or slow node is reported in its
+    NodeResult instead of failing the whole read.
+    """
+
+    def __init__(self, nodes: Mapping[str, VPNServerPort], timeout: float) -> None:
+        self._nodes = nodes
+        self._timeout = timeout
+
+    @property
+    def node_names(self) -> list[str]:
+        """Names of all nodes."""
+        return list(self._nodes)
+
+    def service_for(self, node: str) -> VPNManagementService:
+        """Get management service bound to one node."""
+        return VPNManagementService(self._nodes[node])
+
+    async def _on_node[T](
+        self, name: str, server: VPNServerPort, call: Callable[[VPNServerPort], Awaitable[T]]
+    ) -> NodeResult[T]:
+        """Run call on one node within the per-node timeout."""
+        try:
+            await asyncio.wait_for(server.ensure_authenticated(), self._timeout)
+            return NodeResult(name, value=await asyncio.wait_for(call(server), self._timeout))
+        except TimeoutError:
+            logger.warning(f"Node {name} did not answer in {self._timeout}s")
+            return NodeResult(name, error=f"Timed out after {self._timeout}s")
+        except DomainException as e:
+            logger.warning(f"Node {name} failed: {e}")
+            return NodeResult(name, error=str(e))
+        except Exception as e:
+            # Не доменная ошибка - баг или неожиданный ответ; узел всё равно
+            # не должен ронять весь запрос по флоту
+            logger.exception(f"Node {name} failed unexpectedly")
+            return NodeResult(name, error=str(e) or type(e).__name__)
+
+    async def fan_out[T](
+        self, call: Callable[[VPNServerPort], Awaitable[T]]
+    ) -> list[NodeResult[T]]:
+        """Run call on every node concurrently."""
+        return list(
+            await asyncio.gather(
+                *(self._on_node(name, server, call) for name, server in self._nodes.items())
+            )
+        )
+
+    async def list_inbounds(self) -> list[NodeResult[list[Inbound]]]:
+        """List inbounds of every node."""
+        return await self.fan_out(lambda server: server.get_inbounds())
+
+    async def get_traffic_stats(self) -> list[NodeResult[list[InboundTraffic]]]:
+        """Get traffic statistics of every node."""
+        return await self.fan_out(lambda server: server.get_traffic_stats())
+
+    async def get_server_stats(self) -> list[NodeResult[ServerStats]]:
+        """Get server statistics of every node."""
+        return await self.fan_out(lambda server: server.get_server_stats())
+
+    async def find_clients(
+        self, client_ids: Collection[str]
+    ) -> list[NodeResult[dict[str, ClientRecord]]]:
+        """Find clients on every node (client ids are not tied to a node)."""
+        return await self.fan_out(lambda server: server.find_clients(client_ids))
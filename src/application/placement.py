@@ -0,0 +1,204 @@
+"""Load-aware placement of new clients on inbounds and nodes."""
+
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from dataclasses import dataclass, replace
+
+from src.application.fleet import FleetService
+from src.domain.entities import Inbound, ServerStats
+from src.domain.exceptions import DomainException
+
+logger = logging.getLogger(__name__)
+
+
+class PlacementUnavailableException(DomainException):
+    """No inbound is available for placement."""
+
+
+@dataclass(frozen=True)
+class PlacementCandidate:
+    """Inbound that can receive new clients, with its load figures."""
+
+    node: str
+    inbound_id: int
+    clients: int  # live client count
+    traffic: int  # bytes transferred by its clients since previous refresh
+    cpu: float  # node CPU usage, percent
+    network: int  # node network throughput (up + down)
+
+
+class PlacementPolicy(ABC):
+    """Strategy ranking placement candidates; lower score wins."""
+
+    name: str
+
+    @abstractmethod
+    def score(self, candidate: PlacementCandidate, table: list[PlacementCandidate]) -> float:
+        """Score candidate against the whole table."""
+        ...
+
+
+class LeastClientsPolicy(PlacementPolicy):
+    """Place on the inbound with the fewest clients."""
+
+    name = "least_clients"
+
+    def score(self, candidate: PlacementCandidate, table: list[PlacementCandidate]) -> float:
+        return candidate.clients
+
+
+class LeastTrafficPolicy(PlacementPolicy):
+    """Place on the inbound whose clients moved the least traffic recently."""
+
+    name = "least_traffic"
+
+    def score(self, candidate: PlacementCandidate, table: list[PlacementCandidate]) -> float:
+        return candidate.traffic
+
+
+class WeightedPolicy(PlacementPolicy):
+    """Weighted sum of client count, traffic, CPU and network, each normalized to 0..1."""
+
+    name = "weighted"
+
+    def __init__(self, weights: Mapping[str, float]) -> None:
+        self._weights = {
+            metric: weights.get(metric, 1.0) for metric in ("clients", "traffic", "cpu", "network")
+        }
+
+    def score(self, candidate: PlacementCandidate, table: list[PlacementCandidate]) -> float:
+        total = 0.0
+        for metric, weight in self._weights.items():
+            peak = max(getattr(c, metric) for c in table) or 1
+            total += weight * getattr(candidate, metric) / peak
+        return total
+
+
+def create_policy(name: str, weights: Mapping[str, float] | None = None) -> PlacementPolicy:
+    """Create placement policy by name."""
+    if name == LeastClientsPolicy.name:
+        return LeastClientsPolicy()
+    if name == LeastTrafficPolicy.name:
+        return LeastTrafficPolicy()
+    if name == WeightedPolicy.name:
+        return WeightedPolicy(weights or {})
+    raise ValueError(f"Unknown placement policy: {name}")
+
+
+class PlacementEngine:
+    """Chooses target inbound for new clients from an in-memory load table.
+
+    The table is rebuilt in background every `interval` seconds from inbound
+    snapshots and server stats of every node, so placement itself never
+    waits on upstream calls.
+    """
+
+    def __init__(
+        self,
+        fleet: FleetService,
+        policy: PlacementPolicy,
+        interval: float,
+        weights: Mapping[str, float] | None = None,
+    ) -> None:
+        self._fleet = fleet
+        self._policy = policy
+        self._interval = interval
+        self._weights = weights or {}
+        self._table: list[PlacementCandidate] = []
+        self._traffic_totals: dict[tuple[str, int], int] = {}
+        self._refreshed_at: float | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def table(self) -> list[PlacementCandidate]:
+        """Current load table."""
+        return list(self._table)
+
+    @property
+    def refreshed_at(self) -> float | None:
+        """Unix time of the last successful refresh."""
+        return self._refreshed_at
+
+    async def refresh(self) -> None:
+        """Rebuild the load table from every node."""
+        inbounds, server_stats = await asyncio.gather(
+            self._fleet.list_inbounds(), self._fleet.get_server_stats()
+        )
+        stats_by_node = {result.node: result.value for result in server_stats if result.ok}
+
+        table: list[PlacementCandidate] = []
+        for result in inbounds:
+            if not result.ok or result.value is None:
+                continue  # недоступный узел не участвует в размещении
+            stats = stats_by_node.get(result.node)
+            table.extend(
+                self._candidate(result.node, inbound, stats)
+                for inbound in result.value
+                if inbound.enable and inbound.id is not None
+            )
+
+        self._table = table
+        self._refreshed_at = time.time()
+
+    def _candidate(
+        self, node: str, inbound: Inbound, stats: ServerStats | None
+    ) -> PlacementCandidate:
+        """Build candidate, turning cumulative client counters into recent traffic."""
+        inbound_id = inbound.id or 0
+        total = sum(stat.up + stat.down for stat in inbound.clientStats)
+        previous = self._traffic_totals.get((node, inbound_id), total)
+        self._traffic_totals[(node, inbound_id)] = total
+        return PlacementCandidate(
+            node=node,
+            inbound_id=inbound_id,
+            clients=len(inbound.settings.clients),
+            # Счётчики могут быть сброшены в панели - тогда считаем с нуля
+            traffic=total - previous if total >= previous else total,
+            cpu=stats.cpu_usage if stats else 0.0,
+            network=stats.network_up + stats.network_down if stats else 0,
+        )
+
+    def choose(self, node: str | None = None, policy: str | None = None) -> PlacementCandidate:
+        """Pick the best candidate, optionally restricted to one node.
+
+        The chosen candidate's client count is bumped right away so a burst of
+        placements between refreshes spreads over inbounds.
+        """
+        candidates = [c for c in self._table if node is None or c.node == node]
+        if not candidates:
+            raise PlacementUnavailableException(
+                f"No inbound available for placement{f' on node {node}' if node else ''}"
+            )
+        ranking = create_policy(policy, self._weights) if policy else self._policy
+        best = min(candidates, key=lambda c: ranking.score(c, candidates))
+
+        index = self._table.index(best)
+        self._table[index] = replace(best, clients=best.clients + 1)
+        return best
+
+    async def _run(self) -> None:
+        """Refresh the table periodically."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Placement table refresh failed")
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        """Start background refresh."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop background refresh."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,9 +1,90 @@
 """Application services."""
 
-from src.domain.entities import Client, Inbound, InboundTraffic, ServerStats
+import asyncio
+import heapq
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable, Collection, Iterable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from src.domain.entities import (
+    Client,
+    ClientRecord,
+    ClientStat,
+    Inbound,
+    InboundTraffic,
+    ServerStats,
+)
+from src.domain.exceptions import DomainException
 from src.domain.ports import VPNServerPort
 
 
+@dataclass
+class BatchItemResult:
+    """Outcome of one item of a batch operation."""
+
+    client: Client
+    error: str | None = None
+
+    @property
+    def success(self) -> bool:
+        """Whether the item was applied."""
+        return self.error is None
+
+
+class BulkAction(str, Enum):
+    """Mutation applied to many clients at once."""
+
+    ENABLE = "enable"
+    DISABLE = "disable"
+    DELETE = "delete"
+
+
+@dataclass
+class BulkItemResult:
+    """Outcome of a bulk mutation for one client."""
+
+    client_id: str
+    inbound_id: int | None = None
+    error: str | None = None
+
+    @property
+    def success(self) -> bool:
+        """Whether the mutation was applied."""
+        return self.error is None
+
+
+class ClientTrafficSort(str, Enum):
+    """Counter clients are ranked by."""
+
+    UP = "up"
+    DOWN = "down"
+    TOTAL = "total"
+    ALL_TIME = "all_time"
+
+
+_TRAFFIC_SORT_KEYS: dict[ClientTrafficSort, Callable[[ClientStat], int]] = {
+    ClientTrafficSort.UP: lambda stat: stat.up,
+    ClientTrafficSort.DOWN: lambda stat: stat.down,
+    ClientTrafficSort.TOTAL: lambda stat: stat.up + stat.down,
+    ClientTrafficSort.ALL_TIME: lambda stat: stat.allTime,
+}
+
+
+@dataclass
+class ClientTrafficPage:
+    """One page of the client traffic ranking.
+
+    `last` is the (sort value, email) position of the last item, used as
+    keyset cursor for the next page; None when there are no more items.
+    """
+
+    items: list[ClientStat]
+    last: tuple[int, str] | None = None
+
+
 class VPNManagementService:
     """VPN management service - application layer."""
 
@@ -11,14 +92,23 @@ class VPNManagementService:
         self._vpn_server = vpn_server
 
     async def ensure_authenticated(self) -> None:
-        """Ensure authentication with VPN server."""
-        await self._vpn_server.authenticate()
+        """Ensure authentication with VPN server.
+
+        Cheap for adapters that keep a session: login happens only when needed.
+        """
+        await self._vpn_server.ensure_authenticated()
 
     async def list_inbounds(self) -> list[Inbound]:
         """List all inbounds."""
         await self.ensure_authenticated()
         return await self._vpn_server.get_inbounds()
 
+    async def iter_inbounds(self) -> AsyncIterator[Inbound]:
+        """Iterate over all inbounds without loading the whole list when possible."""
+        await self.ensure_authenticated()
+        async for inbound in self._vpn_server.iter_inbounds():
+            yield inbound
+
     async def get_inbound(self, inbound_id: int) -> Inbound:
         """Get inbound by ID."""
         await self.ensure_authenticated()
@@ -44,11 +134,92 @@ class VPNManagementService:
         await self.ensure_authenticated()
         return await self._vpn_server.add_client(inbound_id, client)
 
+    async def add_clients(
+        self, inbound_id: int, clients: list[Client], chunk_size: int
+    ) -> list[BatchItemResult]:
+        """Add many clients to inbound in chunked multi-client calls.
+
+        Chunks are sent one after another: the panel rewrites the whole inbound
+        settings on every call. A failed chunk marks only its own clients failed.
+        """
+        await self.ensure_authenticated()
+        results: list[BatchItemResult] = []
+        for start in range(0, len(clients), chunk_size):
+            chunk = clients[start : start + chunk_size]
+            try:
+                added = await self._vpn_server.add_clients(inbound_id, chunk)
+            except DomainException as e:
+                results.extend(BatchItemResult(client, error=str(e)) for client in chunk)
+            else:
+                results.extend(BatchItemResult(client) for client in added)
+        return results
+
+    async def bulk_mutate_clients(
+        self, client_ids: list[str], action: BulkAction, concurrency: int
+    ) -> list[BulkItemResult]:
+        """Enable, disable or delete many clients grouped by inbound.
+
+        Clients of one inbound are written sequentially because every panel
+        write rewrites the whole inbound settings; at most `concurrency`
+        inbounds are written at the same time.
+        """
+        await self.ensure_authenticated()
+        results = {client_id: BulkItemResult(client_id) for client_id in client_ids}
+
+        # Все id ищутся за один проход, а не по listing на каждый
+        found = await self._vpn_server.find_clients(results)
+        groups: dict[int, list[ClientRecord]] = defaultdict(list)
+        for client_id, result in results.items():
+            record = found.get(client_id)
+            if record is None:
+                result.error = f"Client {client_id} not found"
+                continue
+            result.inbound_id = record.inbound_id
+            groups[record.inbound_id].append(record)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_group(inbound_id: int, records: list[ClientRecord]) -> None:
+            async with semaphore:
+                for record in records:
+                    try:
+                        await self._apply_bulk_action(inbound_id, record.client, action)
+                    except DomainException as e:
+                        results[record.client.id].error = str(e)
+
+        await asyncio.gather(*(run_group(i, records) for i, records in groups.items()))
+        return list(results.values())
+
+    async def _apply_bulk_action(self, inbound_id: int, client: Client, action: BulkAction) -> None:
+        """Apply bulk action to a single client."""
+        if action is BulkAction.DELETE:
+            await self._vpn_server.delete_client(inbound_id, client.id)
+            return
+        enable = action is BulkAction.ENABLE
+        if client.enable != enable:
+            updated = client.model_copy(update={"enable": enable})
+            await self._vpn_server.update_client(inbound_id, client.id, updated)
+
     async def get_client(self, inbound_id: int, client_id: str) -> Client:
         """Get client from inbound."""
         await self.ensure_authenticated()
         return await self._vpn_server.get_client(inbound_id, client_id)
 
+    async def get_client_record(self, inbound_id: int, client_id: str) -> ClientRecord:
+        """Get client from inbound together with its stats."""
+        await self.ensure_authenticated()
+        return await self._vpn_server.get_client_record(inbound_id, client_id)
+
+    async def find_client(self, client_id: str) -> ClientRecord:
+        """Find client in any inbound together with its stats."""
+        await self.ensure_authenticated()
+        return await self._vpn_server.find_client(client_id)
+
+    async def find_clients(self, client_ids: Iterable[str]) -> dict[str, ClientRecord]:
+        """Find many clients in any inbounds, each needed inbound read once."""
+        await self.ensure_authenticated()
+        return await self._vpn_server.find_clients(client_ids)
+
     async def update_client(self, inbound_id: int, client_id: str, client: Client) -> Client:
         """Update client in inbound."""
         await self.ensure_authenticated()
@@ -64,7 +235,67 @@ class VPNManagementService:
         await self.ensure_authenticated()
         return await self._vpn_server.get_traffic_stats()
 
+    async def rank_client_traffic(
+        self,
+        sort: ClientTrafficSort,
+        limit: int,
+        descending: bool = True,
+        after: tuple[int, str] | None = None,
+        enable: bool | None = None,
+        expired: bool | None = None,
+        client_ids: Collection[str] | None = None,
+    ) -> ClientTrafficPage:
+        """Rank clients of all inbounds by a traffic counter.
+
+        Only the top `limit` clients are selected with a bounded heap, the full
+        list is never sorted. Ties are broken by email, so the (value, email)
+        position of the last item is a stable keyset cursor.
+
+        Args:
+            sort: Counter to rank by
+            limit: Page size
+            descending: Largest values first
+            after: Position of the last item of the previous page
+            enable: Only enabled (True) or disabled (False) clients
+            expired: Only expired (True) or not expired (False) clients
+            client_ids: Only clients with these ids
+        """
+        await self.ensure_authenticated()
+        value_of = _TRAFFIC_SORT_KEYS[sort]
+        sign = -1 if descending else 1
+
+        def rank(stat: ClientStat) -> tuple[int, str]:
+            return sign * value_of(stat), stat.email
+
+        now_ms = int(time.time() * 1000)
+        cursor = (sign * after[0], after[1]) if after is not None else None
+
+        def matches(stat: ClientStat) -> bool:
+            if enable is not None and stat.enable != enable:
+                return False
+            if expired is not None and (0 < stat.expiryTime <= now_ms) != expired:
+                return False
+            if client_ids is not None and stat.uuid not in client_ids:
+                return False
+            return cursor is None or rank(stat) > cursor
+
+        candidates = (
+            stat
+            for inbound in await self._vpn_server.get_inbounds()
+            for stat in inbound.clientStats
+            if matches(stat)
+        )
+        # limit + 1, чтобы узнать, есть ли следующая страница
+        top = heapq.nsmallest(limit + 1, candidates, key=rank)
+        items = top[:limit]
+        last = (value_of(items[-1]), items[-1].email) if len(top) > limit else None
+        return ClientTrafficPage(items=items, last=last)
+
     async def get_server_stats(self) -> ServerStats:
         """Get server statistics."""
         await self.ensure_authenticated()
         return await self._vpn_server.get_server_stats()
+
+    def get_runtime_stats(self) -> dict[str, Any]:
+        """Get runtime counters of the VPN server adapter."""
+        return self._vpn_server.runtime_stats()
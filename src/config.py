@@ -1,8 +1,24 @@
 """Application configuration."""
 
-from pydantic import Field
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+SQLiteJournalMode = Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"]
+SQLiteSynchronous = Literal["OFF", "NORMAL", "FULL", "EXTRA"]
+
+
+class NodeSettings(BaseModel):
+    """Connection settings of one 3x-ui panel (VPN node)."""
+
+    name: str
+    base_url: str
+    username: str
+    password: str
+    verify_ssl: bool = True
+    timeout: int | None = None
+
 
 class Settings(BaseSettings):
     """Application settings."""
@@ -30,6 +46,125 @@ class Settings(BaseSettings):
     x_ui_verify_ssl: bool = Field(
         default=True, description="Verify SSL certificate for 3x-ui panel"
     )
+    x_ui_cache_ttl: float = Field(
+        default=5.0, description="Inbound snapshot cache TTL in seconds (0 disables cache)"
+    )
+    x_ui_cache_stale_ttl: float = Field(
+        default=30.0,
+        description="Seconds an expired snapshot is still served while refreshing in background",
+    )
+
+    # Connection pool and adaptive concurrency per panel
+    x_ui_max_connections: int = Field(default=32, description="Max open connections to one panel")
+    x_ui_max_keepalive_connections: int = Field(
+        default=8, description="Max idle keep-alive connections to one panel"
+    )
+    x_ui_keepalive_expiry: float = Field(
+        default=30.0, description="Seconds an idle keep-alive connection is kept"
+    )
+    x_ui_http2: bool = Field(
+        default=False, description="Use HTTP/2 to panels (needs `uv sync --extra http2`)"
+    )
+    x_ui_adaptive_concurrency: bool = Field(
+        default=True, description="Limit parallel requests per panel by observed latency"
+    )
+    x_ui_concurrency_initial: int = Field(
+        default=4, description="Initial parallel requests per panel"
+    )
+    x_ui_concurrency_max: int = Field(
+        default=16, description="Upper bound of the adaptive concurrency limit"
+    )
+    x_ui_queue_timeout: float = Field(
+        default=10.0, description="Seconds a request waits for a free slot before failing"
+    )
+    x_ui_latency_tolerance: float = Field(
+        default=2.0,
+        description="Latency over this multiple of the endpoint baseline shrinks the limit",
+    )
+
+    # Retries and circuit breaker per panel
+    x_ui_retry_attempts: int = Field(
+        default=3, description="Attempts of a retryable panel request (1 disables retries)"
+    )
+    x_ui_retry_base_delay: float = Field(
+        default=0.2, description="Base delay of jittered exponential backoff in seconds"
+    )
+    x_ui_retry_max_delay: float = Field(default=2.0, description="Max backoff delay in seconds")
+    x_ui_retry_budget: float = Field(
+        default=10.0,
+        ge=0,
+        description="Seconds a panel request may spend on retries (0 = no limit)",
+    )
+    x_ui_circuit_failure_threshold: int = Field(
+        default=5, description="Consecutive failures that open the circuit (0 disables)"
+    )
+    x_ui_circuit_reset_timeout: float = Field(
+        default=30.0, description="Seconds an open circuit fails fast before a probe"
+    )
+
+    json_codec: str = Field(
+        default="auto",
+        description="JSON backend for panel traffic: auto, orjson, msgspec or stdlib",
+    )
+
+    x_ui_batch_size: int = Field(
+        default=100, gt=0, description="Max clients sent to 3x-ui in one addClient call"
+    )
+    x_ui_bulk_concurrency: int = Field(
+        default=4, gt=0, description="Max inbounds written in parallel by bulk client operations"
+    )
+
+    # Fleet settings: the panel above is the default node, more can be added here
+    # as JSON, e.g. X_UI_NODES='[{"name": "de-1", "base_url": "...", ...}]'
+    x_ui_default_node: str = Field(default="default", description="Name of the default node")
+    x_ui_nodes: list[NodeSettings] = Field(
+        default_factory=list, description="Additional 3x-ui panels"
+    )
+    panel_secret_key: str | None = Field(
+        default=None,
+        description="Fernet key(s), comma-separated, encrypting passwords in panel_nodes",
+    )
+    fleet_node_timeout: float = Field(
+        default=10.0, description="Per-node timeout in seconds for fleet-wide reads"
+    )
+
+    # Client placement
+    placement_policy: str = Field(
+        default="least_clients",
+        description="Default placement policy: least_clients, least_traffic or weighted",
+    )
+    placement_refresh_interval: float = Field(
+        default=30.0, description="Seconds between placement load table refreshes"
+    )
+    placement_weights: dict[str, float] = Field(
+        default_factory=lambda: {"clients": 1.0, "traffic": 1.0, "cpu": 1.0, "network": 1.0},
+        description="Metric weights of the weighted placement policy",
+    )
+
+    # Traffic history
+    traffic_collector_enabled: bool = Field(
+        default=True, description="Collect traffic time series in background"
+    )
+    traffic_sample_interval: float = Field(
+        default=60.0, description="Seconds between traffic counter samples"
+    )
+    traffic_raw_retention_hours: int = Field(
+        default=48, description="Hours raw traffic samples are kept"
+    )
+    traffic_hourly_retention_days: int = Field(
+        default=31, description="Days hourly traffic buckets are kept"
+    )
+    traffic_daily_retention_days: int = Field(
+        default=400, description="Days daily traffic buckets are kept"
+    )
+
+    # Live stats stream
+    live_stats_interval: float = Field(
+        default=5.0, description="Seconds between polls of a node with live stats subscribers"
+    )
+    live_stats_queue_size: int = Field(
+        default=16, description="Events buffered per live stats subscriber before dropping"
+    )
 
     # Database settings
     database_url: str = Field(
@@ -38,9 +173,55 @@ class Settings(BaseSettings):
     database_echo: bool = Field(
         default=False, description="Echo SQL statements to stdout (for debugging)"
     )
+    # SQLite: pragmas set on every connection
+    database_sqlite_journal_mode: SQLiteJournalMode = Field(
+        default="WAL", description="SQLite journal mode: WAL, DELETE, TRUNCATE, PERSIST or MEMORY"
+    )
+    database_sqlite_synchronous: SQLiteSynchronous = Field(
+        default="NORMAL", description="SQLite synchronous level: OFF, NORMAL, FULL or EXTRA"
+    )
+    database_sqlite_busy_timeout: int = Field(
+        default=5000, description="Milliseconds a SQLite writer waits for the lock"
+    )
+    database_sqlite_mmap_size: int = Field(
+        default=256 * 1024 * 1024, description="Bytes of the SQLite file memory-mapped for reads"
+    )
+    # PostgreSQL and other server databases: connection pool
+    database_pool_size: int = Field(default=10, description="Connections kept in the pool")
+    database_max_overflow: int = Field(
+        default=20, description="Extra connections opened above pool_size under load"
+    )
+    database_pool_timeout: float = Field(
+        default=30.0, description="Seconds to wait for a free pooled connection"
+    )
+    database_pool_recycle: int = Field(
+        default=1800, description="Seconds after which pooled connections are reopened"
+    )
+    database_pool_pre_ping: bool = Field(
+        default=True, description="Check pooled connections before use"
+    )
+    database_statement_cache_size: int = Field(
+        default=100, description="asyncpg prepared statement cache per connection (0 for pgbouncer)"
+    )
+    database_auto_migrate: bool = Field(
+        default=True,
+        description="Apply pending migrations at startup; turn off to run `make migrate` instead",
+    )
+    metadata_cache_size: int = Field(
+        default=10_000, description="Max client metadata entries cached in memory (0 disables)"
+    )
+    metadata_cache_ttl: float = Field(
+        default=300.0, description="Seconds a cached client metadata entry is trusted"
+    )
 
     # Security
     api_key: str | None = Field(default=None, description="API key for authentication")
 
+    @field_validator("database_sqlite_journal_mode", "database_sqlite_synchronous", mode="before")
+    @classmethod
+    def _upper_pragma_value(cls, value: object) -> object:
+        """SQLite pragma values are case-insensitive."""
+        return value.upper() if isinstance(value, str) else value
+
 
 settings = Settings()
@@ -1,5 +1,6 @@
 """Domain entities."""
 
+import hashlib
 from enum import Enum
 from typing import Any
 
@@ -113,6 +114,26 @@ class Inbound(BaseModel):
     stream_settings: dict[str, Any] = Field(default_factory=dict)
     sniffing: dict[str, Any] = Field(default_factory=dict)
 
+    def content_version(self) -> str:
+        """Hash of the inbound content; equal content gives equal versions."""
+        return hashlib.blake2b(self.model_dump_json().encode(), digest_size=16).hexdigest()
+
+    def find_client_record(self, client_id: str) -> "ClientRecord | None":
+        """Find client of this inbound together with its stats."""
+        for client in self.settings.clients:
+            if client.id == client_id:
+                stat = next((s for s in self.clientStats if s.email == client.email), None)
+                return ClientRecord(inbound_id=self.id or 0, client=client, stat=stat)
+        return None
+
+
+class ClientRecord(BaseModel):
+    """Client located in its inbound together with traffic stats."""
+
+    inbound_id: int
+    client: Client
+    stat: ClientStat | None = None
+
 
 class InboundTraffic(BaseModel):
     """Inbound traffic statistics."""
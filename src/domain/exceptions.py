@@ -27,3 +27,11 @@ class ClientNotFoundException(DomainException):
 
 class InvalidConfigurationException(DomainException):
     """Invalid configuration exception."""
+
+
+class NodeNotFoundException(DomainException):
+    """VPN node (3x-ui panel) not found exception."""
+
+
+class NodeUnavailableException(VPNServerException):
+    """VPN node temporarily refuses requests (overloaded or failing)."""
@@ -1,8 +1,17 @@
 """Domain ports (interfaces)."""
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterable
+from typing import Any
 
-from src.domain.entities import Client, Inbound, InboundTraffic, ServerStats
+from src.domain.entities import (
+    Client,
+    ClientRecord,
+    Inbound,
+    InboundTraffic,
+    ServerStats,
+)
+from src.domain.exceptions import ClientNotFoundException
 
 
 class VPNServerPort(ABC):
@@ -13,11 +22,35 @@ class VPNServerPort(ABC):
         """Authenticate with VPN server."""
         ...
 
+    async def ensure_authenticated(self) -> None:
+        """Authenticate only if there is no valid session.
+
+        Adapters that keep a session should override this to skip the login
+        round-trip; the default authenticates every time.
+        """
+        await self.authenticate()
+
+    async def close(self) -> None:
+        """Release resources held by the adapter."""
+
+    def runtime_stats(self) -> dict[str, Any]:
+        """Runtime counters of the adapter (cache, connection reuse, ...)."""
+        return {}
+
     @abstractmethod
     async def get_inbounds(self) -> list[Inbound]:
         """Get all inbounds."""
         ...
 
+    async def iter_inbounds(self) -> AsyncIterator[Inbound]:
+        """Iterate over all inbounds.
+
+        Adapters that can parse the upstream response incrementally should
+        override this; the default loads the full list first.
+        """
+        for inbound in await self.get_inbounds():
+            yield inbound
+
     @abstractmethod
     async def get_inbound(self, inbound_id: int) -> Inbound:
         """Get inbound by ID."""
@@ -43,11 +76,60 @@ class VPNServerPort(ABC):
         """Add client to inbound."""
         ...
 
+    async def add_clients(self, inbound_id: int, clients: list[Client]) -> list[Client]:
+        """Add several clients to inbound.
+
+        The default implementation adds them one by one; adapters whose panel
+        accepts many clients per call should override it.
+        """
+        return [await self.add_client(inbound_id, client) for client in clients]
+
     @abstractmethod
     async def get_client(self, inbound_id: int, client_id: str) -> Client:
         """Get client from inbound."""
         ...
 
+    async def find_client(self, client_id: str) -> ClientRecord:
+        """Find client in any inbound.
+
+        The default implementation scans all inbounds; indexed adapters
+        override it with a direct lookup.
+        """
+        for inbound in await self.get_inbounds():
+            record = inbound.find_client_record(client_id)
+            if record is not None:
+                return record
+        raise ClientNotFoundException(f"Client {client_id} not found")
+
+    async def find_clients(self, client_ids: Iterable[str]) -> dict[str, ClientRecord]:
+        """Find many clients in any inbounds; ids that are not found are left out.
+
+        The default implementation scans one inbound listing; indexed adapters
+        fetch only the inbounds holding the clients, each once.
+        """
+        wanted = set(client_ids)
+        found: dict[str, ClientRecord] = {}
+        if not wanted:
+            return found
+        for inbound in await self.get_inbounds():
+            for client in inbound.settings.clients:
+                if client.id in wanted and client.id not in found:
+                    record = inbound.find_client_record(client.id)
+                    if record is not None:
+                        found[client.id] = record
+        return found
+
+    async def get_client_record(self, inbound_id: int, client_id: str) -> ClientRecord:
+        """Get client of an inbound together with its stats.
+
+        One inbound fetch serves both the client and its ClientStat.
+        """
+        inbound = await self.get_inbound(inbound_id)
+        record = inbound.find_client_record(client_id)
+        if record is None:
+            raise ClientNotFoundException(f"Client {client_id} not found in inbound {inbound_id}")
+        return record
+
     @abstractmethod
     async def update_client(self, inbound_id: int, client_id: str, client: Client) -> Client:
         """Update client in inbound."""
@@ -0,0 +1,400 @@
+"""Snapshot cache decorator for VPN server adapters."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from src.domain.entities import Client, ClientRecord, Inbound, InboundTraffic, ServerStats
+from src.domain.exceptions import ClientNotFoundException, InboundNotFoundException
+from src.domain.ports import VPNServerPort
+from src.infrastructure.client_index import ClientIndex
+
+logger = logging.getLogger(__name__)
+
+# Ключ для списка id inbounds (порядок выдачи get_inbounds)
+_INBOUND_IDS_KEY = "inbound_ids"
+
+
+@dataclass
+class CacheStats:
+    """Cache hit/miss counters."""
+
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    invalidations: int = 0
+
+
+@dataclass
+class _Entry[T]:
+    """Cached value with the monotonic time it was fetched at."""
+
+    value: T
+    fetched_at: float
+
+
+class CachedVPNServer(VPNServerPort):
+    """Caching decorator around any VPNServerPort implementation.
+
+    Keeps parsed Inbound snapshots for `ttl` seconds. After that a snapshot is
+    still served for `stale_ttl` seconds while a background refresh runs
+    (stale-while-revalidate), so callers only wait on upstream when nothing
+    usable is cached. Successful mutations invalidate the affected inbound.
+
+    Every stored snapshot also feeds a ClientIndex, so client lookups do not
+    scan inbound client lists.
+
+    Cached snapshots are shared between callers and must be treated as
+    read-only; use `model_copy(update=...)` to derive modified entities.
+    """
+
+    def __init__(
+        self,
+        inner: VPNServerPort,
+        ttl: float = 5.0,
+        stale_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._inner = inner
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._clock = clock
+        self._inbounds: dict[int, _Entry[Inbound]] = {}
+        self._inbound_ids: _Entry[list[int]] | None = None
+        self._refreshing: dict[Any, asyncio.Task[Any]] = {}
+        # Версия последней инвалидации каждого inbound, списка id и всего кеша:
+        # refresh, начатый до неё, не записывает в кеш устаревший снимок
+        self._version = 0
+        self._invalidated: dict[int, int] = {}
+        self._listing_invalidated = 0
+        self._cleared = 0
+        self.stats = CacheStats()
+        self.index = ClientIndex()
+
+    @property
+    def inner(self) -> VPNServerPort:
+        """Wrapped adapter."""
+        return self._inner
+
+    def _state(self, entry: _Entry[Any] | None) -> str:
+        """Classify cache entry as fresh, stale or missing."""
+        if entry is None:
+            return "missing"
+        age = self._clock() - entry.fetched_at
+        if age <= self._ttl:
+            return "fresh"
+        if age <= self._ttl + self._stale_ttl:
+            return "stale"
+        return "missing"
+
+    def _refresh[T](
+        self, key: Any, fetch: Callable[[], Coroutine[Any, Any, T]]
+    ) -> "asyncio.Task[T]":
+        """Start refresh for key unless one is already running."""
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self._refreshing[key] = task
+            task.add_done_callback(lambda t: self._on_refresh_done(key, t))
+        return task
+
+    def _on_refresh_done(self, key: Any, task: "asyncio.Task[Any]") -> None:
+        """Forget finished refresh and account for its outcome."""
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
+        if task.cancelled():
+            return
+        self.stats.refreshes += 1
+        error = task.exception()
+        if error is not None:
+            self.stats.refresh_errors += 1
+            logger.warning(f"Cache refresh of {key!r} failed: {error}")
+
+    async def _cached[T](
+        self,
+        key: Any,
+        entry: _Entry[T] | None,
+        fetch: Callable[[], Coroutine[Any, Any, T]],
+    ) -> T:
+        """Serve entry according to its freshness, refreshing when needed."""
+        state = self._state(entry)
+        if entry is not None and state == "fresh":
+            self.stats.hits += 1
+            return entry.value
+        if entry is not None and state == "stale":
+            self.stats.stale_hits += 1
+            self._refresh(key, fetch)
+            return entry.value
+        self.stats.misses += 1
+        return await asyncio.shield(self._refresh(key, fetch))
+
+    def _store_inbound(self, inbound: Inbound, fetched_at: float, index: bool = True) -> None:
+        """Store inbound snapshot, re-indexing its clients unless `index` is False."""
+        if inbound.id is not None:
+            self._inbounds[inbound.id] = _Entry(inbound, fetched_at)
+            if index:
+                self.index.index_inbound(inbound)
+
+    def _bump_version(self) -> int:
+        """Next invalidation version."""
+        self._version += 1
+        self.stats.invalidations += 1
+        return self._version
+
+    def _is_current(self, inbound_id: int | None, since: int) -> bool:
+        """Whether an inbound was not invalidated after version `since`."""
+        invalidated = self._invalidated.get(inbound_id, 0) if inbound_id is not None else 0
+        return max(self._cleared, invalidated) <= since
+
+    async def _fetch_inbounds(self) -> list[Inbound]:
+        """Fetch all inbounds from upstream and store snapshots.
+
+        Inbounds invalidated while the listing was in flight are not stored;
+        the rest of the listing still is.
+        """
+        since, fetched_at = self._version, self._clock()
+        inbounds = await self._inner.get_inbounds()
+        current = [inbound for inbound in inbounds if self._is_current(inbound.id, since)]
+        complete = len(current) == len(inbounds)
+        if complete:
+            # Полный список заменяет индекс целиком, по одному не индексируем
+            self.index.replace_all(inbounds)
+        for inbound in current:
+            self._store_inbound(inbound, fetched_at, index=not complete)
+        if max(self._cleared, self._listing_invalidated) <= since:
+            self._inbound_ids = _Entry(
+                [inbound.id for inbound in inbounds if inbound.id is not None], fetched_at
+            )
+        return inbounds
+
+    async def _fetch_inbound(self, inbound_id: int) -> Inbound:
+        """Fetch single inbound from upstream and store snapshot."""
+        since, fetched_at = self._version, self._clock()
+        inbound = await self._inner.get_inbound(inbound_id)
+        if self._is_current(inbound_id, since):
+            self._store_inbound(inbound, fetched_at)
+        return inbound
+
+    def invalidate(self, inbound_id: int | None = None) -> None:
+        """Drop cached snapshot of one inbound, or everything if id is None."""
+        version = self._bump_version()
+        if inbound_id is None:
+            self._cleared = version
+            self._invalidated.clear()
+            self._inbounds.clear()
+            self._inbound_ids = None
+        else:
+            self._invalidated[inbound_id] = version
+            self._inbounds.pop(inbound_id, None)
+
+    def _invalidate_listing(self) -> None:
+        """Drop cached list of inbound ids (inbound created or deleted)."""
+        self._listing_invalidated = self._bump_version()
+        self._inbound_ids = None
+
+    def runtime_stats(self) -> dict[str, Any]:
+        """Inner adapter stats extended with cache counters."""
+        return {
+            **self._inner.runtime_stats(),
+            "cache": {
+                **asdict(self.stats),
+                "inbounds": len(self._inbounds),
+                "indexed_clients": len(self.index),
+            },
+        }
+
+    async def close(self) -> None:
+        """Cancel background refreshes and close wrapped adapter."""
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        self._refreshing.clear()
+        await self._inner.close()
+
+    async def authenticate(self) -> bool:
+        """Authenticate with VPN server."""
+        return await self._inner.authenticate()
+
+    async def ensure_authenticated(self) -> None:
+        """Authenticate only if there is no valid session."""
+        await self._inner.ensure_authenticated()
+
+    async def get_inbounds(self) -> list[Inbound]:
+        """Get all inbounds from cached snapshots."""
+        ids_entry = self._inbound_ids
+        state = self._state(ids_entry)
+        if ids_entry is None or state == "missing":
+            self.stats.misses += 1
+            return await asyncio.shield(self._refresh(_INBOUND_IDS_KEY, self._fetch_inbounds))
+
+        if state == "fresh":
+            self.stats.hits += 1
+        else:
+            self.stats.stale_hits += 1
+            self._refresh(_INBOUND_IDS_KEY, self._fetch_inbounds)
+
+        # Инвалидированные по отдельности inbounds дозапрашиваем точечно
+        entries = {inbound_id: self._inbounds.get(inbound_id) for inbound_id in ids_entry.value}
+        missing = [i for i, entry in entries.items() if self._state(entry) == "missing"]
+        fetched = dict(zip(missing, await asyncio.gather(*(self.get_inbound(i) for i in missing))))
+        return [
+            fetched[inbound_id] if entry is None or inbound_id in fetched else entry.value
+            for inbound_id, entry in entries.items()
+        ]
+
+    async def iter_inbounds(self) -> AsyncIterator[Inbound]:
+        """Iterate over cached snapshots, or stream from upstream without caching.
+
+        A streamed listing is not stored: keeping it would defeat the flat
+        memory use streaming is for.
+        """
+        if self._state(self._inbound_ids) != "missing":
+            for inbound in await self.get_inbounds():
+                yield inbound
+            return
+        self.stats.misses += 1
+        async for inbound in self._inner.iter_inbounds():
+            yield inbound
+
+    async def get_inbound(self, inbound_id: int) -> Inbound:
+        """Get inbound by ID from cached snapshot."""
+        return await self._cached(
+            inbound_id,
+            self._inbounds.get(inbound_id),
+            lambda: self._fetch_inbound(inbound_id),
+        )
+
+    async def create_inbound(self, inbound: Inbound) -> Inbound:
+        """Create new inbound."""
+        created = await self._inner.create_inbound(inbound)
+        self._invalidate_listing()
+        return created
+
+    async def update_inbound(self, inbound_id: int, inbound: Inbound) -> Inbound:
+        """Update existing inbound."""
+        updated = await self._inner.update_inbound(inbound_id, inbound)
+        self.invalidate(inbound_id)
+        return updated
+
+    async def delete_inbound(self, inbound_id: int) -> bool:
+        """Delete inbound."""
+        deleted = await self._inner.delete_inbound(inbound_id)
+        self.invalidate(inbound_id)
+        self.index.remove_inbound(inbound_id)
+        self._invalidate_listing()
+        return deleted
+
+    async def add_client(self, inbound_id: int, client: Client) -> Client:
+        """Add client to inbound."""
+        added = await self._inner.add_client(inbound_id, client)
+        self.invalidate(inbound_id)
+        self.index.put_client(inbound_id, added)
+        return added
+
+    async def add_clients(self, inbound_id: int, clients: list[Client]) -> list[Client]:
+        """Add several clients to inbound."""
+        added = await self._inner.add_clients(inbound_id, clients)
+        self.invalidate(inbound_id)
+        for client in added:
+            self.index.put_client(inbound_id, client)
+        return added
+
+    async def get_client(self, inbound_id: int, client_id: str) -> Client:
+        """Get client from cached inbound snapshot."""
+        record = await self.get_client_record(inbound_id, client_id)
+        return record.client
+
+    async def get_client_record(self, inbound_id: int, client_id: str) -> ClientRecord:
+        """Get client of an inbound with stats from the cached snapshot and index."""
+        inbound = await self.get_inbound(inbound_id)
+        record = self.index.get(client_id)
+        if record is None or record.inbound_id != inbound_id:
+            # Снимок мог не попасть в индекс (конкурентная инвалидация)
+            record = inbound.find_client_record(client_id)
+        if record is None:
+            raise ClientNotFoundException(f"Client {client_id} not found in inbound {inbound_id}")
+        return record
+
+    async def find_client(self, client_id: str) -> ClientRecord:
+        """Find client in any inbound using the client index.
+
+        Clients created outside this service become visible once the inbound
+        listing is refreshed (at most `ttl + stale_ttl` seconds).
+        """
+        location = self.index.locate(client_id)
+        if location is None:
+            await self.get_inbounds()
+            location = self.index.locate(client_id)
+        if location is None:
+            raise ClientNotFoundException(f"Client {client_id} not found")
+
+        # Обновляем снимок inbound, если он протух; это же переиндексирует клиентов
+        inbound = await self.get_inbound(location.inbound_id)
+        record = self.index.get(client_id) or inbound.find_client_record(client_id)
+        if record is None:
+            raise ClientNotFoundException(f"Client {client_id} not found")
+        return record
+
+    async def find_clients(self, client_ids: Iterable[str]) -> dict[str, ClientRecord]:
+        """Find many clients using the client index.
+
+        Clients are grouped by inbound, so an inbound holding several of them
+        is fetched (or refreshed, when stale) once.
+        """
+        locations = {client_id: self.index.locate(client_id) for client_id in client_ids}
+        if None in locations.values():
+            await self.get_inbounds()
+            locations = {
+                client_id: location or self.index.locate(client_id)
+                for client_id, location in locations.items()
+            }
+
+        by_inbound: dict[int, list[str]] = {}
+        for client_id, location in locations.items():
+            if location is not None:
+                by_inbound.setdefault(location.inbound_id, []).append(client_id)
+
+        async def collect(inbound_id: int, ids: list[str]) -> list[ClientRecord]:
+            try:
+                inbound = await self.get_inbound(inbound_id)
+            except InboundNotFoundException:
+                return []
+            records = (self.index.get(i) or inbound.find_client_record(i) for i in ids)
+            return [record for record in records if record is not None]
+
+        groups = await asyncio.gather(*(collect(i, ids) for i, ids in by_inbound.items()))
+        return {record.client.id: record for records in groups for record in records}
+
+    async def update_client(self, inbound_id: int, client_id: str, client: Client) -> Client:
+        """Update client in inbound."""
+        updated = await self._inner.update_client(inbound_id, client_id, client)
+        self.invalidate(inbound_id)
+        self.index.put_client(inbound_id, updated)
+        return updated
+
+    async def delete_client(self, inbound_id: int, client_id: str) -> bool:
+        """Delete client from inbound."""
+        deleted = await self._inner.delete_client(inbound_id, client_id)
+        self.invalidate(inbound_id)
+        self.index.remove_client(client_id)
+        return deleted
+
+    async def get_traffic_stats(self) -> list[InboundTraffic]:
+        """Get traffic statistics derived from cached inbound snapshots."""
+        return [
+            InboundTraffic(
+                inbound_id=inbound.id or 0,
+                up=inbound.up,
+                down=inbound.down,
+                total=inbound.total,
+            )
+            for inbound in await self.get_inbounds()
+        ]
+
+    async def get_server_stats(self) -> ServerStats:
+        """Get server statistics (not cached)."""
+        return await self._inner.get_server_stats()
@@ -0,0 +1,141 @@
+"""In-memory index of clients built from inbound snapshots."""
+
+from dataclasses import dataclass
+
+from src.domain.entities import Client, ClientRecord, ClientStat, Inbound
+
+
+@dataclass(frozen=True, slots=True)
+class ClientLocation:
+    """Where a client lives."""
+
+    inbound_id: int
+    email: str
+
+
+class ClientIndex:
+    """O(1) client lookups across all inbounds.
+
+    Maps client id to its inbound and email, email to ClientStat and subId to
+    client id. Whole inbounds are re-indexed from fresh snapshots, single
+    clients are updated incrementally after mutations.
+
+    Snapshots are indexed on the first lookup after they arrive, so storing a
+    lazily parsed inbound does not decode its clients until somebody asks.
+    """
+
+    def __init__(self) -> None:
+        self._locations: dict[str, ClientLocation] = {}
+        self._clients: dict[str, Client] = {}
+        self._stats: dict[str, ClientStat] = {}
+        self._sub_ids: dict[str, str] = {}
+        self._members: dict[int, set[str]] = {}
+        self._pending: dict[int, Inbound] = {}
+
+    def __len__(self) -> int:
+        self._flush()
+        return len(self._locations)
+
+    def __contains__(self, client_id: object) -> bool:
+        self._flush()
+        return client_id in self._locations
+
+    def _flush(self) -> None:
+        """Index snapshots stored since the last lookup."""
+        while self._pending:
+            _, inbound = self._pending.popitem()
+            self._index_now(inbound)
+
+    def replace_all(self, inbounds: list[Inbound]) -> None:
+        """Rebuild index from a full inbound listing."""
+        self._locations.clear()
+        self._clients.clear()
+        self._stats.clear()
+        self._sub_ids.clear()
+        self._members.clear()
+        self._pending.clear()
+        for inbound in inbounds:
+            self.index_inbound(inbound)
+
+    def index_inbound(self, inbound: Inbound) -> None:
+        """Replace entries of one inbound with its current snapshot."""
+        if inbound.id is None:
+            return
+        self.remove_inbound(inbound.id)
+        self._pending[inbound.id] = inbound
+
+    def _index_now(self, inbound: Inbound) -> None:
+        """Add entries of one inbound."""
+        if inbound.id is None:
+            return
+        for stat in inbound.clientStats:
+            self._stats[stat.email] = stat
+        for client in inbound.settings.clients:
+            self._put(inbound.id, client)
+
+    def remove_inbound(self, inbound_id: int) -> None:
+        """Drop all clients of an inbound."""
+        self._pending.pop(inbound_id, None)
+        for client_id in list(self._members.pop(inbound_id, ())):
+            self._drop(client_id, drop_stat=True)
+
+    def put_client(self, inbound_id: int, client: Client) -> None:
+        """Add or replace a single client."""
+        self._flush()
+        self._put(inbound_id, client)
+
+    def _put(self, inbound_id: int, client: Client) -> None:
+        """Add or replace a single client without flushing pending snapshots."""
+        previous = self._locations.get(client.id)
+        if previous is not None:
+            self._drop(client.id, drop_stat=previous.email != client.email)
+        self._locations[client.id] = ClientLocation(inbound_id, client.email)
+        self._clients[client.id] = client
+        self._members.setdefault(inbound_id, set()).add(client.id)
+        if client.subId:
+            self._sub_ids[client.subId] = client.id
+
+    def remove_client(self, client_id: str) -> None:
+        """Drop a single client."""
+        self._flush()
+        self._drop(client_id, drop_stat=True)
+
+    def _drop(self, client_id: str, drop_stat: bool) -> None:
+        """Remove client entries from every map."""
+        location = self._locations.pop(client_id, None)
+        client = self._clients.pop(client_id, None)
+        if location is None:
+            return
+        self._members.get(location.inbound_id, set()).discard(client_id)
+        if drop_stat:
+            self._stats.pop(location.email, None)
+        if client is not None and self._sub_ids.get(client.subId) == client_id:
+            del self._sub_ids[client.subId]
+
+    def locate(self, client_id: str) -> ClientLocation | None:
+        """Get inbound id and email of a client."""
+        self._flush()
+        return self._locations.get(client_id)
+
+    def get(self, client_id: str) -> ClientRecord | None:
+        """Get client with its inbound id and stats."""
+        self._flush()
+        location = self._locations.get(client_id)
+        if location is None:
+            return None
+        return ClientRecord(
+            inbound_id=location.inbound_id,
+            client=self._clients[client_id],
+            stat=self._stats.get(location.email),
+        )
+
+    def stat_by_email(self, email: str) -> ClientStat | None:
+        """Get traffic stats by client email."""
+        self._flush()
+        return self._stats.get(email)
+
+    def get_by_sub_id(self, sub_id: str) -> ClientRecord | None:
+        """Get client by subscription id."""
+        self._flush()
+        client_id = self._sub_ids.get(sub_id)
+        return self.get(client_id) if client_id is not None else None
@@ -0,0 +1,64 @@
+"""Single-flight coalescing of identical concurrent calls."""
+
+import asyncio
+from collections.abc import Callable, Coroutine, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class SingleFlightStats:
+    """Coalescing counters."""
+
+    calls: int = 0  # all calls made through SingleFlight
+    executions: int = 0  # calls that actually reached upstream
+    coalesced: int = 0  # calls that joined an in-flight execution
+    errors: int = 0  # failed executions (error fanned out to every awaiter)
+
+    @property
+    def saved_ratio(self) -> float:
+        """Share of calls that did not hit upstream."""
+        return self.coalesced / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        """Counters as plain dict."""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "saved_ratio": round(self.saved_ratio, 4),
+        }
+
+
+class SingleFlight[T]:
+    """Share one in-flight execution between concurrent calls with the same key.
+
+    Every awaiter gets the same result object (or the same exception), so
+    results must be treated as read-only. Cancelling one awaiter does not
+    cancel the shared execution for the others.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Task[T]] = {}
+        self.stats = SingleFlightStats()
+
+    async def do(self, key: Hashable, fn: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        """Run fn for key, or join the execution already in flight."""
+        self.stats.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats.executions += 1
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.stats.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[T]") -> None:
+        """Drop finished execution so the next call goes upstream again."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats.errors += 1
@@ -0,0 +1,94 @@
+"""JSON codec with optional fast backends.
+
+orjson or msgspec are used when installed (`uv sync --extra fast-json`),
+stdlib json otherwise. All backends produce compact JSON and raise
+ValueError on malformed input.
+"""
+
+import json
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class JSONCodec:
+    """Set of JSON functions of one backend."""
+
+    name: str
+    loads: Callable[[str | bytes], Any]
+    dumps_bytes: Callable[[Any], bytes]
+
+    def dumps(self, obj: Any) -> str:
+        """Encode object to JSON string."""
+        return self.dumps_bytes(obj).decode()
+
+
+def _stdlib_codec() -> JSONCodec:
+    """Codec on top of the json module."""
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    return JSONCodec(
+        name="stdlib",
+        loads=json.loads,
+        dumps_bytes=lambda obj: encoder.encode(obj).encode(),
+    )
+
+
+def _orjson_codec() -> JSONCodec:
+    """Codec on top of orjson."""
+    import orjson
+
+    # orjson.JSONDecodeError - подкласс ValueError
+    return JSONCodec(name="orjson", loads=orjson.loads, dumps_bytes=orjson.dumps)
+
+
+def _msgspec_codec() -> JSONCodec:
+    """Codec on top of msgspec."""
+    import msgspec
+
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+
+    def loads(data: str | bytes) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    return JSONCodec(name="msgspec", loads=loads, dumps_bytes=encoder.encode)
+
+
+_FACTORIES: dict[str, Callable[[], JSONCodec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "stdlib": _stdlib_codec,
+}
+
+
+def get_codec(name: str = "auto") -> JSONCodec:
+    """Get codec by backend name.
+
+    Args:
+        name: orjson, msgspec, stdlib or auto (fastest installed)
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    if name == "auto":
+        for factory in _FACTORIES.values():
+            try:
+                return factory()
+            except ImportError:
+                continue
+    if name not in _FACTORIES:
+        raise ValueError(f"Unknown JSON codec: {name}")
+    try:
+        return _FACTORIES[name]()
+    except ImportError as e:
+        raise ValueError(f"JSON codec {name} is not installed") from e
+
+
+default_codec = get_codec()
@@ -0,0 +1,212 @@
+"""Adaptive concurrency limit for requests to one 3x-ui panel."""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import httpx
+
+from src.domain.exceptions import NodeUnavailableException
+from src.infrastructure.metrics import registry
+
+CONCURRENCY_LIMIT = registry.gauge(
+    "xui_concurrency_limit", "Current adaptive concurrency limit per panel", ("node",)
+)
+INFLIGHT = registry.gauge("xui_inflight_requests", "Requests in flight per panel", ("node",))
+QUEUE_TIMEOUTS = registry.counter(
+    "xui_queue_timeouts_total", "Requests rejected after waiting for a slot", ("node",)
+)
+
+
+@dataclass
+class LimiterStats:
+    """Concurrency limiter counters."""
+
+    acquired: int = 0  # slots granted
+    queued: int = 0  # acquisitions that had to wait
+    timeouts: int = 0  # waits that ran out of queue_timeout
+    increases: int = 0  # additive limit increases
+    decreases: int = 0  # multiplicative limit decreases
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter driven by observed latency.
+
+    The limit grows by one per window of successful requests while the panel
+    is fully used and shrinks by `backoff` when a request is slower than
+    `tolerance` times the baseline latency of its endpoint or times out.
+    The baseline is the minimum latency seen per endpoint, slowly drifting
+    up so that a permanently slower panel is eventually accepted as normal.
+    Only requests started after the last decrease can decrease the limit
+    again, so one burst of slow responses shrinks it once.
+
+    Requests over the limit wait in FIFO order for at most `queue_timeout`
+    seconds and then fail with NodeUnavailableException.
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        queue_timeout: float = 10.0,
+        tolerance: float = 2.0,
+        backoff: float = 0.8,
+        baseline_drift: float = 0.01,
+    ) -> None:
+        self._name = name
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._queue_timeout = queue_timeout
+        self._tolerance = tolerance
+        self._backoff = backoff
+        self._baseline_drift = baseline_drift
+        self._baselines: dict[str, float] = {}
+        self._inflight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._decreased_at = 0.0
+        self.stats = LimiterStats()
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        """Current number of concurrent requests allowed."""
+        return int(self._limit)
+
+    @property
+    def inflight(self) -> int:
+        """Requests currently holding a slot."""
+        return self._inflight
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for a slot."""
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    @asynccontextmanager
+    async def slot(self, key: str = "") -> AsyncIterator[None]:
+        """Hold a slot for one request and feed its latency back.
+
+        Args:
+            key: Endpoint template; latency is compared with its own baseline
+
+        Raises:
+            NodeUnavailableException: If no slot was freed within queue_timeout
+        """
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except httpx.TimeoutException:
+            self.release(key, started, overloaded=True)
+            raise
+        except BaseException:
+            self.release(key, started, sample=False)
+            raise
+        else:
+            self.release(key, started)
+
+    async def acquire(self) -> None:
+        """Wait for a free slot."""
+        self.stats.acquired += 1
+        if not self._waiters and self._inflight < self.limit:
+            self._inflight += 1
+            self._publish()
+            return
+
+        self.stats.queued += 1
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(self._queue_timeout):
+                await waiter
+        except TimeoutError:
+            self._abandon(waiter)
+            self.stats.timeouts += 1
+            QUEUE_TIMEOUTS.inc((self._name,))
+            raise NodeUnavailableException(
+                f"Node {self._name} is busy: no free slot in {self._queue_timeout}s "
+                f"(limit {self.limit})"
+            ) from None
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+    def release(
+        self, key: str, started: float, overloaded: bool = False, sample: bool = True
+    ) -> None:
+        """Free a slot and adjust the limit.
+
+        Args:
+            key: Endpoint template of the request
+            started: time.monotonic() when the slot was acquired
+            overloaded: The request failed in a way that signals overload
+            sample: Whether the request latency should be taken into account
+        """
+        was_saturated = self._inflight >= self.limit
+        self._inflight -= 1
+        if sample or overloaded:
+            now = time.monotonic()
+            latency = now - started
+            baseline = self._baselines.get(key)
+            if baseline is None or latency < baseline:
+                self._baselines[key] = latency
+            else:
+                self._baselines[key] = min(latency, baseline * (1 + self._baseline_drift))
+
+            if overloaded or (baseline is not None and latency > baseline * self._tolerance):
+                if started >= self._decreased_at:
+                    self._limit = max(self._min_limit, self._limit * self._backoff)
+                    self._decreased_at = now
+                    self.stats.decreases += 1
+            elif was_saturated and self._limit < self._max_limit:
+                # +1 за окно: каждый из limit запросов добавляет 1/limit
+                self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+                self.stats.increases += 1
+        self._wake()
+        self._publish()
+
+    def _wake(self) -> None:
+        """Hand free slots to waiters in FIFO order."""
+        while self._waiters and self._inflight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._inflight += 1
+                waiter.set_result(None)
+
+    def _abandon(self, waiter: asyncio.Future[None]) -> None:
+        """Forget a waiter that stopped waiting, returning a slot it was handed."""
+        if waiter.done() and not waiter.cancelled():
+            # Слот выдан в момент отмены - возвращаем без замера латентности
+            self._inflight -= 1
+            self._wake()
+            self._publish()
+        else:
+            waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def _publish(self) -> None:
+        """Update gauges of this panel."""
+        CONCURRENCY_LIMIT.set((self._name,), self.limit)
+        INFLIGHT.set((self._name,), self._inflight)
+
+    def as_dict(self) -> dict[str, float]:
+        """Current state and counters as plain dict."""
+        return {
+            "limit": self.limit,
+            "inflight": self._inflight,
+            "queued": self.queued,
+            "acquired": self.stats.acquired,
+            "waited": self.stats.queued,
+            "timeouts": self.stats.timeouts,
+            "increases": self.stats.increases,
+            "decreases": self.stats.decreases,
+        }
@@ -1,15 +1,36 @@
 """Dependency injection container using dishka."""
 
+import logging
 from collections.abc import AsyncIterator
 
 from dishka import Provider, Scope, provide
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.application.fleet import FleetService
+from src.application.placement import PlacementEngine, create_policy
 from src.application.services import VPNManagementService
 from src.config import Settings, settings
 from src.domain.ports import VPNServerPort
-from src.infrastructure.persistence import ClientMetadataRepository, Database
-from src.infrastructure.x_ui_adapter import XUIAdapter
+from src.infrastructure.fleet import (
+    NodeRegistry,
+    build_node_adapter,
+    default_node_settings,
+    panel_node_settings,
+)
+from src.infrastructure.live_stats import LiveStatsHub
+from src.infrastructure.persistence import (
+    ClientMetadataCache,
+    ClientMetadataRepository,
+    Database,
+    EngineOptions,
+    PanelNodeRepository,
+    TrafficRepository,
+)
+from src.infrastructure.secrets import SecretBox
+from src.infrastructure.traffic_collector import DAY, HOUR, TrafficCollector
+
+logger = logging.getLogger(__name__)
 
 
 class InfrastructureProvider(Provider):
@@ -26,9 +47,21 @@ class InfrastructureProvider(Provider):
         db = Database(
             database_url=settings.database_url,
             echo=settings.database_echo,
+            options=EngineOptions(
+                sqlite_journal_mode=settings.database_sqlite_journal_mode,
+                sqlite_synchronous=settings.database_sqlite_synchronous,
+                sqlite_busy_timeout=settings.database_sqlite_busy_timeout,
+                sqlite_mmap_size=settings.database_sqlite_mmap_size,
+                pool_size=settings.database_pool_size,
+                max_overflow=settings.database_max_overflow,
+                pool_timeout=settings.database_pool_timeout,
+                pool_recycle=settings.database_pool_recycle,
+                pool_pre_ping=settings.database_pool_pre_ping,
+                statement_cache_size=settings.database_statement_cache_size,
+            ),
         )
-        # Create tables on startup
-        await db.create_tables()
+        # Одна проверка версии схемы, если миграции уже применены
+        await db.prepare_schema(auto_migrate=settings.database_auto_migrate)
         yield db
         await db.close()
 
@@ -38,29 +71,116 @@ class InfrastructureProvider(Provider):
         async with database.session() as session:
             yield session
 
+    @provide(scope=Scope.APP)
+    def provide_client_metadata_cache(self, settings: Settings) -> ClientMetadataCache:
+        """Provide process-wide client metadata cache."""
+        return ClientMetadataCache(
+            maxsize=settings.metadata_cache_size, ttl=settings.metadata_cache_ttl
+        )
+
+    @provide(scope=Scope.REQUEST)
+    def provide_client_metadata_repository(
+        self, session: AsyncSession, cache: ClientMetadataCache
+    ) -> ClientMetadataRepository:
+        """Provide client metadata repository backed by the shared cache."""
+        return ClientMetadataRepository(session, cache)
+
     @provide(scope=Scope.REQUEST)
-    def provide_client_metadata_repository(self, session: AsyncSession) -> ClientMetadataRepository:
-        """Provide client metadata repository."""
-        return ClientMetadataRepository(session)
+    def provide_traffic_repository(self, session: AsyncSession) -> TrafficRepository:
+        """Provide traffic history repository."""
+        return TrafficRepository(session)
+
+    @provide(scope=Scope.APP)
+    async def provide_node_registry(
+        self, settings: Settings, database: Database
+    ) -> AsyncIterator[NodeRegistry]:
+        """Provide registry of 3x-ui panels from settings and database."""
+        registry = NodeRegistry(default_node=settings.x_ui_default_node)
+        nodes = [default_node_settings(settings), *settings.x_ui_nodes]
+
+        box = SecretBox(settings.panel_secret_key) if settings.panel_secret_key else None
+        async with database.session() as session:
+            panels = await PanelNodeRepository(session).list_enabled()
+        nodes.extend(panel_node_settings(panel, box) for panel in panels)
+
+        for node in nodes:
+            if node.name in registry:
+                logger.warning(f"Duplicate node {node.name} ignored")
+                continue
+            registry.register(node.name, build_node_adapter(node, settings))
+        yield registry
+        await registry.close()
 
     @provide(scope=Scope.APP)
-    async def provide_vpn_server(self, settings: Settings) -> AsyncIterator[VPNServerPort]:
-        """Provide VPN server adapter."""
-        adapter = XUIAdapter(
-            base_url=settings.x_ui_base_url,
-            username=settings.x_ui_username,
-            password=settings.x_ui_password,
-            timeout=settings.x_ui_timeout,
-            verify_ssl=settings.x_ui_verify_ssl,
+    def provide_vpn_server(self, registry: NodeRegistry) -> VPNServerPort:
+        """Provide VPN server adapter of the default node."""
+        return registry.default
+
+    @provide(scope=Scope.APP)
+    async def provide_traffic_collector(
+        self, registry: NodeRegistry, database: Database, settings: Settings
+    ) -> AsyncIterator[TrafficCollector]:
+        """Provide traffic collector, running in background when enabled."""
+        collector = TrafficCollector(
+            registry,
+            database,
+            interval=settings.traffic_sample_interval,
+            raw_retention=settings.traffic_raw_retention_hours * HOUR,
+            hourly_retention=settings.traffic_hourly_retention_days * DAY,
+            daily_retention=settings.traffic_daily_retention_days * DAY,
+            node_timeout=settings.fleet_node_timeout,
+        )
+        if settings.traffic_collector_enabled:
+            collector.start()
+        yield collector
+        await collector.stop()
+
+    @provide(scope=Scope.APP)
+    async def provide_live_stats_hub(
+        self, registry: NodeRegistry, settings: Settings
+    ) -> AsyncIterator[LiveStatsHub]:
+        """Provide hub of shared live stats pollers."""
+        hub = LiveStatsHub(
+            registry,
+            interval=settings.live_stats_interval,
+            queue_size=settings.live_stats_queue_size,
+            node_timeout=settings.fleet_node_timeout,
         )
-        yield adapter
-        await adapter.close()
+        yield hub
+        await hub.close()
 
 
 class ApplicationProvider(Provider):
     """Provider for application services."""
 
     @provide(scope=Scope.REQUEST)
-    def provide_vpn_management_service(self, vpn_server: VPNServerPort) -> VPNManagementService:
-        """Provide VPN management service."""
-        return VPNManagementService(vpn_server)
+    def provide_vpn_management_service(
+        self, request: Request, registry: NodeRegistry
+    ) -> VPNManagementService:
+        """Provide VPN management service for the node addressed by the route.
+
+        Routes under /nodes/{node_id} work with that node, others with the default one.
+        """
+        node_id = request.path_params.get("node_id")
+        server = registry[node_id] if node_id is not None else registry.default
+        return VPNManagementService(server)
+
+    @provide(scope=Scope.APP)
+    def provide_fleet_service(self, registry: NodeRegistry, settings: Settings) -> FleetService:
+        """Provide fleet-wide service."""
+        return FleetService(registry, timeout=settings.fleet_node_timeout)
+
+    @provide(scope=Scope.APP)
+    async def provide_placement_engine(
+        self, fleet: FleetService, settings: Settings
+    ) -> AsyncIterator[PlacementEngine]:
+        """Provide placement engine with running background refresh."""
+        engine = PlacementEngine(
+            fleet,
+            policy=create_policy(settings.placement_policy, settings.placement_weights),
+            interval=settings.placement_refresh_interval,
+            weights=settings.placement_weights,
+        )
+        engine.start()
+        yield engine
+        await engine.stop()
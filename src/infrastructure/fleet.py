@@ -0,0 +1,148 @@
+"""Registry of 3x-ui panels (VPN nodes)."""
+
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+import httpx
+
+from src.config import NodeSettings, Settings
+from src.domain.exceptions import InvalidConfigurationException, NodeNotFoundException
+from src.domain.ports import VPNServerPort
+from src.infrastructure.cache import CachedVPNServer
+from src.infrastructure.codec import get_codec
+from src.infrastructure.concurrency import AdaptiveLimiter
+from src.infrastructure.persistence import PanelNode
+from src.infrastructure.resilience import CircuitBreaker, RetryPolicy
+from src.infrastructure.secrets import SecretBox
+from src.infrastructure.x_ui_adapter import XUIAdapter
+
+
+def build_node_adapter(node: NodeSettings, settings: Settings) -> VPNServerPort:
+    """Create adapter for one panel with its own HTTP client and auth session."""
+    limiter = None
+    if settings.x_ui_adaptive_concurrency:
+        limiter = AdaptiveLimiter(
+            name=node.name,
+            initial_limit=settings.x_ui_concurrency_initial,
+            max_limit=settings.x_ui_concurrency_max,
+            queue_timeout=settings.x_ui_queue_timeout,
+            tolerance=settings.x_ui_latency_tolerance,
+        )
+    adapter: VPNServerPort = XUIAdapter(
+        base_url=node.base_url,
+        username=node.username,
+        password=node.password,
+        timeout=node.timeout or settings.x_ui_timeout,
+        verify_ssl=node.verify_ssl,
+        codec=get_codec(settings.json_codec),
+        node=node.name,
+        limits=httpx.Limits(
+            max_connections=settings.x_ui_max_connections,
+            max_keepalive_connections=settings.x_ui_max_keepalive_connections,
+            keepalive_expiry=settings.x_ui_keepalive_expiry,
+        ),
+        http2=settings.x_ui_http2,
+        limiter=limiter,
+        retry=RetryPolicy(
+            attempts=settings.x_ui_retry_attempts,
+            base_delay=settings.x_ui_retry_base_delay,
+            max_delay=settings.x_ui_retry_max_delay,
+            budget=settings.x_ui_retry_budget,
+        ),
+        breaker=CircuitBreaker(
+            node.name,
+            failure_threshold=settings.x_ui_circuit_failure_threshold,
+            reset_timeout=settings.x_ui_circuit_reset_timeout,
+        ),
+    )
+    if settings.x_ui_cache_ttl > 0:
+        adapter = CachedVPNServer(
+            adapter,
+            ttl=settings.x_ui_cache_ttl,
+            stale_ttl=settings.x_ui_cache_stale_ttl,
+        )
+    return adapter
+
+
+def panel_node_settings(panel: PanelNode, box: SecretBox | None) -> NodeSettings:
+    """Node settings of a panel registered in the database.
+
+    Raises:
+        InvalidConfigurationException: If there is no key or the stored
+            password is not encrypted with it
+    """
+    if box is None:
+        raise InvalidConfigurationException(
+            f"Panel node {panel.name} is registered in the database, "
+            "but PANEL_SECRET_KEY is not set"
+        )
+    try:
+        password = box.decrypt(panel.password_encrypted)
+    except InvalidConfigurationException as e:
+        raise InvalidConfigurationException(
+            f"Password of panel node {panel.name} is not encrypted with PANEL_SECRET_KEY: "
+            "run `python -m src.infrastructure.persistence encrypt-node-passwords`"
+        ) from e
+    return NodeSettings(
+        name=panel.name,
+        base_url=panel.base_url,
+        username=panel.username,
+        password=password,
+        verify_ssl=panel.verify_ssl,
+    )
+
+
+def default_node_settings(settings: Settings) -> NodeSettings:
+    """Node settings of the panel configured with X_UI_* variables."""
+    return NodeSettings(
+        name=settings.x_ui_default_node,
+        base_url=settings.x_ui_base_url,
+        username=settings.x_ui_username,
+        password=settings.x_ui_password,
+        verify_ssl=settings.x_ui_verify_ssl,
+    )
+
+
+class NodeRegistry(Mapping[str, VPNServerPort]):
+    """Named VPN server adapters, one per 3x-ui panel."""
+
+    def __init__(self, default_node: str) -> None:
+        self._default_node = default_node
+        self._nodes: dict[str, VPNServerPort] = {}
+
+    def __getitem__(self, name: str) -> VPNServerPort:
+        try:
+            return self._nodes[name]
+        except KeyError:
+            raise NodeNotFoundException(f"Node {name} not found") from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def default_name(self) -> str:
+        """Name of the default node."""
+        return self._default_node
+
+    @property
+    def default(self) -> VPNServerPort:
+        """Adapter of the default node."""
+        return self[self._default_node]
+
+    def register(self, name: str, server: VPNServerPort) -> None:
+        """Register node adapter under a unique name."""
+        if name in self._nodes:
+            raise ValueError(f"Node {name} is already registered")
+        self._nodes[name] = server
+
+    def runtime_stats(self) -> dict[str, Any]:
+        """Runtime counters of every node."""
+        return {name: server.runtime_stats() for name, server in self._nodes.items()}
+
+    async def close(self) -> None:
+        """Close every node adapter."""
+        for server in self._nodes.values():
+            await server.close()
@@ -0,0 +1,81 @@
+"""Incremental parsing of large JSON responses."""
+
+import json
+import re
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+
+_SEPARATORS = " \t\r\n,"
+
+
+class JSONStreamError(ValueError):
+    """Streamed JSON document is malformed or truncated."""
+
+
+class JSONArrayNotFoundError(JSONStreamError):
+    """The streamed document has no array under the requested key.
+
+    Carries the whole (small) document, e.g. an error response, so the caller
+    can decode it the usual way.
+    """
+
+    def __init__(self, document: str) -> None:
+        super().__init__("JSON array not found in document")
+        self.document = document
+
+
+async def iter_json_array(chunks: AsyncIterable[str], key: str) -> AsyncIterator[Any]:
+    """Yield items of the array under top-level `key` of a streamed JSON object.
+
+    Only the item being parsed is buffered, so memory does not grow with the
+    array length. Items must be objects, arrays or strings (a number split
+    between chunks would be decoded partially). Keys of the object after the
+    array are not read.
+
+    Raises:
+        JSONArrayNotFoundError: If the document ends before the array starts
+        JSONStreamError: If the array is malformed or truncated
+    """
+    decoder = json.JSONDecoder()
+    start = re.compile(rf'"{re.escape(key)}"\s*:\s*\[')
+    chunk_iter = aiter(chunks)
+
+    buffer = ""
+    while (match := start.search(buffer)) is None:
+        chunk = await anext(chunk_iter, None)
+        if chunk is None:
+            raise JSONArrayNotFoundError(buffer)
+        buffer += chunk
+    buffer = buffer[match.end() :]
+
+    # Незавершённый элемент декодируем повторно только после удвоения буфера,
+    # иначе большой элемент, приходящий мелкими чанками, парсился бы за O(n^2)
+    retry_at = 0
+    exhausted = False
+    while True:
+        pos = 0
+        while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+
+        if pos < len(buffer) and (len(buffer) >= retry_at or exhausted):
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise JSONStreamError("Truncated or malformed JSON array") from None
+                retry_at = 2 * len(buffer)
+            else:
+                yield item
+                buffer = buffer[end:]
+                retry_at = 0
+                continue
+        elif exhausted:
+            raise JSONStreamError("Truncated JSON array")
+
+        chunk = await anext(chunk_iter, None)
+        if chunk is None:
+            exhausted = True
+        else:
+            buffer = buffer[pos:] + chunk
@@ -0,0 +1,128 @@
+"""Inbound entity that decodes its heavy sub-documents on first access."""
+
+import hashlib
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from pydantic import PrivateAttr, TypeAdapter, ValidationError
+from pydantic_core import to_jsonable_python
+
+from src.domain.entities import ClientStat, Inbound, InboundProtocol, Settings
+from src.infrastructure.codec import JSONCodec, default_codec
+
+_CLIENT_STATS = TypeAdapter(list[ClientStat])
+
+
+def _load_settings(raw: str, codec: JSONCodec) -> Settings:
+    """Decode `settings` JSON string of a panel inbound."""
+    try:
+        return Settings.model_validate_json(raw)
+    except ValidationError:
+        # Не объект (например, "null") - как и раньше, пустые settings
+        value = codec.loads(raw)
+        return Settings(**value) if isinstance(value, dict) else Settings()
+
+
+_LOADERS: dict[str, Callable[[Any, JSONCodec], Any]] = {
+    "settings": _load_settings,
+    "stream_settings": lambda raw, codec: codec.loads(raw),
+    "sniffing": lambda raw, codec: codec.loads(raw),
+    "clientStats": lambda raw, codec: _CLIENT_STATS.validate_python(raw),
+}
+
+
+class LazyInbound(Inbound):
+    """Inbound parsed from a panel response with lazy sub-documents.
+
+    `settings` (with every client), `streamSettings`, `sniffing` and
+    `clientStats` are kept raw and decoded only when first read, so callers
+    that need just counters (traffic stats, summaries) skip most of the
+    decoding work. Decoded values are stored on the instance; copies made with
+    `model_copy` share the raw data and decode on their own.
+
+    `content_version` hashes the raw data instead of dumping the model and is
+    computed once per instance (snapshots are read-only).
+    """
+
+    _raw: dict[str, Any] = PrivateAttr(default_factory=dict)
+    _codec: JSONCodec = PrivateAttr(default=default_codec)
+    _version: str | None = PrivateAttr(default=None)
+
+    @classmethod
+    def from_panel(cls, data: dict[str, Any], codec: JSONCodec = default_codec) -> "LazyInbound":
+        """Build inbound from one item of the panel inbound list."""
+        inbound = cls.model_construct(
+            id=data.get("id"),
+            up=data.get("up", 0),
+            down=data.get("down", 0),
+            total=data.get("total", 0),
+            remark=data.get("remark", "reality"),
+            enable=data.get("enable", True),
+            port=data.get("port", 443),
+            protocol=InboundProtocol(data.get("protocol", "vless")),
+        )
+        # model_construct заполняет значения по умолчанию - убираем их,
+        # чтобы обращение к полю попало в __getattr__
+        for name in _LOADERS:
+            inbound.__dict__.pop(name, None)
+        inbound._raw = {
+            "settings": data.get("settings", "{}"),
+            "stream_settings": data.get("streamSettings", "{}"),
+            "sniffing": data.get("sniffing", "{}"),
+            "clientStats": data.get("clientStats") or [],
+        }
+        inbound._codec = codec
+        return inbound
+
+    def __getattr__(self, name: str) -> Any:
+        private = self.__pydantic_private__ or {}
+        raw = private.get("_raw")
+        if raw is not None and name in raw:
+            value = _LOADERS[name](raw[name], private["_codec"])
+            self.__dict__[name] = value
+            return value
+        return super().__getattr__(name)  # type: ignore[misc]
+
+    def content_version(self) -> str:
+        """Hash of the panel data the inbound was parsed from."""
+        if self._version is None:
+            raw = self._raw
+            # Декодированные ленивые поля хешируем по сырым данным
+            fields = {name: value for name, value in self.__dict__.items() if name not in raw}
+            payload = self._codec.dumps_bytes([to_jsonable_python(fields), raw])
+            self._version = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        return self._version
+
+    def model_copy(
+        self, *, update: Mapping[str, Any] | None = None, deep: bool = False
+    ) -> "LazyInbound":
+        """Copy inbound; updated lazy fields stop being read from raw data."""
+        copy = super().model_copy(update=update, deep=deep)
+        copy._version = None
+        if update:
+            copy._raw = {name: value for name, value in self._raw.items() if name not in update}
+        return copy
+
+    def materialize(self) -> "LazyInbound":
+        """Decode every lazy field now."""
+        for name in _LOADERS:
+            getattr(self, name)
+        return self
+
+    def model_dump(self, **kwargs: Any) -> dict[str, Any]:
+        """Dump inbound, decoding lazy fields first."""
+        self.materialize()
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs: Any) -> str:
+        """Dump inbound as JSON, decoding lazy fields first."""
+        self.materialize()
+        return super().model_dump_json(**kwargs)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare decoded fields; raw data and the cached version are ignored."""
+        if not isinstance(other, LazyInbound):
+            return super().__eq__(other)
+        self.materialize()
+        other.materialize()
+        return self.__dict__ == other.__dict__
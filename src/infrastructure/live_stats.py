@@ -0,0 +1,167 @@
+"""Shared pollers pushing live server stats and traffic deltas to subscribers."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from src.domain.entities import InboundTraffic, ServerStats
+from src.domain.ports import VPNServerPort
+from src.infrastructure.metrics import registry
+from src.infrastructure.traffic_collector import counter_delta
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBERS = registry.gauge("live_stats_subscribers", "Live stats subscribers per node", ("node",))
+DROPPED_EVENTS = registry.counter(
+    "live_stats_dropped_events_total", "Events dropped for slow live stats subscribers", ("node",)
+)
+
+
+@dataclass(frozen=True, slots=True)
+class LiveEvent:
+    """One pushed event: `name` is server, traffic or error."""
+
+    name: str
+    data: Any
+
+
+class Subscription:
+    """Bounded event queue of one subscriber.
+
+    A subscriber that does not keep up loses the oldest events rather than
+    slowing the poller down or growing memory; traffic events carry
+    cumulative counters too, so a gap does not corrupt the totals.
+    """
+
+    def __init__(self, node: str, maxsize: int) -> None:
+        self.node = node
+        self.dropped = 0
+        self._queue: asyncio.Queue[LiveEvent] = asyncio.Queue(maxsize)
+
+    def put(self, event: LiveEvent) -> None:
+        """Enqueue event, dropping the oldest one when the queue is full."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+            DROPPED_EVENTS.inc((self.node,))
+        self._queue.put_nowait(event)
+
+    async def get(self) -> LiveEvent:
+        """Wait for the next event."""
+        return await self._queue.get()
+
+
+class LiveStatsHub:
+    """One background poller per node, fanned out to any number of subscribers.
+
+    A node is polled every `interval` seconds only while it has subscribers,
+    so upstream load does not depend on how many dashboards are open. Each
+    poll publishes a `server` event with ServerStats and a `traffic` event
+    with per-inbound counters and their deltas since the previous poll. New
+    subscribers get the latest events right away.
+    """
+
+    def __init__(
+        self,
+        nodes: Mapping[str, VPNServerPort],
+        interval: float = 5.0,
+        queue_size: int = 16,
+        node_timeout: float = 10.0,
+    ) -> None:
+        self._nodes = nodes
+        self._interval = interval
+        self._queue_size = queue_size
+        self._node_timeout = node_timeout
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._pollers: dict[str, asyncio.Task[None]] = {}
+        self._counters: dict[str, dict[int, tuple[int, int]]] = {}
+        self._latest: dict[str, dict[str, LiveEvent]] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, node: str) -> AsyncIterator[Subscription]:
+        """Receive events of a node for the duration of the context."""
+        subscription = Subscription(node, self._queue_size)
+        for event in self._latest.get(node, {}).values():
+            subscription.put(event)
+        subscribers = self._subscribers.setdefault(node, set())
+        subscribers.add(subscription)
+        SUBSCRIBERS.set((node,), len(subscribers))
+        if node not in self._pollers:
+            self._pollers[node] = asyncio.create_task(self._poll(node))
+        try:
+            yield subscription
+        finally:
+            subscribers.discard(subscription)
+            SUBSCRIBERS.set((node,), len(subscribers))
+            if not subscribers:
+                await self._stop_poller(node)
+
+    def _publish(self, node: str, event: LiveEvent) -> None:
+        """Send event to every subscriber of the node."""
+        self._latest.setdefault(node, {})[event.name] = event
+        for subscription in self._subscribers.get(node, ()):
+            subscription.put(event)
+
+    def _traffic_event(self, node: str, traffic: list[InboundTraffic]) -> LiveEvent:
+        """Cumulative inbound counters with deltas since the previous poll."""
+        counters = self._counters.setdefault(node, {})
+        items = []
+        for inbound in traffic:
+            previous = counters.get(inbound.inbound_id)
+            counters[inbound.inbound_id] = (inbound.up, inbound.down)
+            items.append(
+                {
+                    **inbound.model_dump(),
+                    "up_delta": counter_delta(previous[0], inbound.up) if previous else 0,
+                    "down_delta": counter_delta(previous[1], inbound.down) if previous else 0,
+                }
+            )
+        return LiveEvent("traffic", items)
+
+    async def poll_once(self, node: str) -> None:
+        """Read server stats and traffic of a node and publish them."""
+        server = self._nodes[node]
+        stats, traffic = await asyncio.gather(
+            asyncio.wait_for(server.get_server_stats(), self._node_timeout),
+            asyncio.wait_for(server.get_traffic_stats(), self._node_timeout),
+            return_exceptions=True,
+        )
+        if isinstance(stats, ServerStats):
+            self._publish(node, LiveEvent("server", stats.model_dump()))
+        if isinstance(traffic, list):
+            self._publish(node, self._traffic_event(node, traffic))
+        errors = [str(r) or type(r).__name__ for r in (stats, traffic) if isinstance(r, Exception)]
+        if errors:
+            logger.warning(f"Live stats poll of node {node} failed: {errors}")
+            self._publish(node, LiveEvent("error", {"detail": "; ".join(errors)}))
+        else:
+            self._latest.get(node, {}).pop("error", None)
+
+    async def _poll(self, node: str) -> None:
+        """Poll a node periodically while it has subscribers."""
+        while True:
+            try:
+                await self.poll_once(node)
+            except Exception:
+                logger.exception(f"Live stats poll of node {node} failed")
+            await asyncio.sleep(self._interval)
+
+    async def _stop_poller(self, node: str) -> None:
+        """Cancel poller of a node and forget its state."""
+        task = self._pollers.pop(node, None)
+        self._counters.pop(node, None)
+        self._latest.pop(node, None)
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def close(self) -> None:
+        """Stop every poller."""
+        for node in list(self._pollers):
+            await self._stop_poller(node)
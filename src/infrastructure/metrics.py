@@ -0,0 +1,224 @@
+"""Lightweight in-process metrics exposed in Prometheus text format.
+
+Metrics keep one child per label combination in a dict; recording is a dict
+lookup plus a couple of additions, cheap enough for every request. Label
+values must come from bounded sets (templated paths, status codes, node
+names), never from ids.
+"""
+
+import re
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from typing import Any
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_ID_SEGMENT = re.compile(r"/[^/]*\d[^/]*")
+
+
+def template_path(path: str) -> str:
+    """Replace path segments containing digits (ids, uuids) with {id}."""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+def _escape(value: str) -> str:
+    """Escape label value for the text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    """Render {name="value",...} label set."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Render sample value, integers without a fractional part."""
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+class _Metric[C]:
+    """Metric family with one child per label combination."""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._children: dict[LabelValues, C] = {}
+
+    def _new_child(self) -> C:
+        raise NotImplementedError
+
+    def _child(self, labels: LabelValues) -> C:
+        child = self._children.get(labels)
+        if child is None:
+            child = self._children[labels] = self._new_child()
+        return child
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> Iterator[str]:
+        """Render family in Prometheus text format."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+
+class Counter(_Metric[list[float]]):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def _new_child(self) -> list[float]:
+        return [0.0]
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        """Increase counter of a label combination."""
+        self._child(labels)[0] += amount
+
+    def value(self, labels: LabelValues = ()) -> float:
+        """Current value of a label combination."""
+        child = self._children.get(labels)
+        return child[0] if child else 0.0
+
+    def _samples(self) -> Iterator[str]:
+        for labels, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(child[0])}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, labels: LabelValues, value: float) -> None:
+        """Set gauge of a label combination."""
+        self._child(labels)[0] = value
+
+
+class _HistogramChild:
+    """Bucket counts (non-cumulative), sum and count of one label combination."""
+
+    __slots__ = ("count", "counts", "sum")
+
+    def __init__(self, buckets: int) -> None:
+        self.counts = [0] * (buckets + 1)  # последний - +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric[_HistogramChild]):
+    """Distribution of observed values in fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(len(self.buckets))
+
+    def observe(self, labels: LabelValues, value: float) -> None:
+        """Record one observation."""
+        child = self._child(labels)
+        child.counts[bisect_left(self.buckets, value)] += 1
+        child.sum += value
+        child.count += 1
+
+    def _samples(self) -> Iterator[str]:
+        bounds = [*(_format_value(b) for b in self.buckets), "+Inf"]
+        for labels, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, child.counts):
+                cumulative += count
+                label_set = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{label_set} {cumulative}"
+            label_set = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_set} {_format_value(child.sum)}"
+            yield f"{self.name}_count{label_set} {child.count}"
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric[Any]] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def _register[M: _Metric[Any]](self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        """Create and register counter."""
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        """Create and register gauge."""
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register histogram."""
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collect: Callable[[], None]) -> None:
+        """Register callback that updates gauges right before rendering."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text format."""
+        for collect in self._collectors:
+            collect()
+        lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+XUI_REQUEST_DURATION = registry.histogram(
+    "xui_request_duration_seconds",
+    "Latency of requests to 3x-ui panels",
+    ("node", "method", "endpoint", "status"),
+)
+XUI_RESPONSE_BYTES = registry.counter(
+    "xui_response_bytes_total",
+    "Bytes received from 3x-ui panels",
+    ("node", "endpoint"),
+)
+XUI_LOGINS = registry.counter(
+    "xui_logins_total",
+    "Logins to 3x-ui panels",
+    ("node", "result"),
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "Latency of API requests",
+    ("method", "route", "status"),
+)
+DB_SESSION_DURATION = registry.histogram(
+    "db_session_duration_seconds",
+    "Lifetime of database sessions",
+    ("result",),
+)
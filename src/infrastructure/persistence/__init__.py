@@ -1,12 +1,40 @@
 """Persistence layer for VPN service."""
 
 from src.infrastructure.persistence.database import Database
-from src.infrastructure.persistence.models import Base, ClientMetadata
-from src.infrastructure.persistence.repository import ClientMetadataRepository
+from src.infrastructure.persistence.engine import EngineOptions
+from src.infrastructure.persistence.metadata_cache import ClientMetadataCache
+from src.infrastructure.persistence.migrations import SCHEMA_VERSION, SchemaVersionError
+from src.infrastructure.persistence.models import (
+    Base,
+    ClientMetadata,
+    Lease,
+    PanelNode,
+    TrafficGranularity,
+    TrafficScope,
+    TrafficUsage,
+)
+from src.infrastructure.persistence.repository import (
+    ClientMetadataRepository,
+    LeaseRepository,
+    PanelNodeRepository,
+    TrafficRepository,
+)
 
 __all__ = [
     "Database",
+    "EngineOptions",
     "Base",
     "ClientMetadata",
+    "ClientMetadataCache",
     "ClientMetadataRepository",
+    "Lease",
+    "LeaseRepository",
+    "PanelNode",
+    "PanelNodeRepository",
+    "SCHEMA_VERSION",
+    "SchemaVersionError",
+    "TrafficGranularity",
+    "TrafficRepository",
+    "TrafficScope",
+    "TrafficUsage",
 ]
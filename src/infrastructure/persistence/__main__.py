@@ -0,0 +1,75 @@
+"""Command line for database schema migrations and panel password encryption.
+
+Usage:
+    python -m src.infrastructure.persistence [upgrade|current] [--database-url URL]
+    python -m src.infrastructure.persistence generate-key
+    python -m src.infrastructure.persistence encrypt-secret < password.txt
+    python -m src.infrastructure.persistence encrypt-node-passwords [--database-url URL]
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.config import settings
+from src.infrastructure.persistence.database import Database
+from src.infrastructure.persistence.migrations import SCHEMA_VERSION, current_version, migrate
+from src.infrastructure.persistence.repository import PanelNodeRepository
+from src.infrastructure.secrets import SecretBox
+
+COMMANDS = ("upgrade", "current", "generate-key", "encrypt-secret", "encrypt-node-passwords")
+
+
+def _secret_box() -> SecretBox:
+    if not settings.panel_secret_key:
+        sys.exit("PANEL_SECRET_KEY is not set")
+    return SecretBox(settings.panel_secret_key)
+
+
+async def _encrypt_node_passwords(database_url: str) -> None:
+    database = Database(database_url)
+    try:
+        async with database.session() as session:
+            encrypted = await PanelNodeRepository(session).encrypt_passwords(_secret_box())
+        print(f"Encrypted {encrypted} plaintext panel password(s)")
+    finally:
+        await database.close()
+
+
+async def main() -> None:
+    """Run one command."""
+    parser = argparse.ArgumentParser(description="Database schema migrations")
+    parser.add_argument("command", choices=COMMANDS, nargs="?", default="upgrade")
+    parser.add_argument("--database-url", default=settings.database_url)
+    args = parser.parse_args()
+
+    if args.command == "generate-key":
+        print(SecretBox.generate_key())
+        return
+    if args.command == "encrypt-secret":
+        # Токен для ручного INSERT в panel_nodes.password_encrypted
+        print(_secret_box().encrypt(sys.stdin.read().rstrip("\n")))
+        return
+    if args.command == "encrypt-node-passwords":
+        await _encrypt_node_passwords(args.database_url)
+        return
+
+    engine = create_async_engine(args.database_url)
+    try:
+        if args.command == "current":
+            print(f"{await current_version(engine)} (latest {SCHEMA_VERSION})")
+            return
+        applied = await migrate(engine)
+        for migration in applied:
+            print(f"Applied {migration.version}: {migration.description}")
+        print(f"Schema is at version {SCHEMA_VERSION}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
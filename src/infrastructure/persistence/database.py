@@ -1,5 +1,6 @@
 """Database configuration and session management."""
 
+import time
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
@@ -7,27 +8,33 @@ from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
-    create_async_engine,
 )
 
+from src.infrastructure.metrics import DB_SESSION_DURATION
+from src.infrastructure.persistence.engine import EngineOptions, create_engine
+from src.infrastructure.persistence.migrations import (
+    SCHEMA_VERSION,
+    check_version,
+    current_version,
+    migrate,
+)
 from src.infrastructure.persistence.models import Base
 
 
 class Database:
     """Database manager for SQLAlchemy async engine."""
 
-    def __init__(self, database_url: str, echo: bool = False) -> None:
+    def __init__(
+        self, database_url: str, echo: bool = False, options: EngineOptions | None = None
+    ) -> None:
         """Initialize database with connection URL.
 
         Args:
             database_url: SQLAlchemy database URL (e.g., 'sqlite+aiosqlite:///./vpn.db')
             echo: Whether to echo SQL statements to stdout
+            options: Engine tuning (SQLite pragmas, pool sizes), defaults if None
         """
-        self.engine: AsyncEngine = create_async_engine(
-            database_url,
-            echo=echo,
-            future=True,
-        )
+        self.engine: AsyncEngine = create_engine(database_url, options or EngineOptions(), echo)
         self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
             self.engine,
             class_=AsyncSession,
@@ -37,10 +44,28 @@ class Database:
         )
 
     async def create_tables(self) -> None:
-        """Create all tables defined in models."""
+        """Create all tables defined in models, bypassing migrations (tests, scratch DBs)."""
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
+    async def prepare_schema(self, auto_migrate: bool = True) -> None:
+        """Bring the schema to the version of this code, or check it is there.
+
+        With `auto_migrate` pending migrations are applied; an up-to-date
+        database costs one version lookup. Without it the version is only
+        checked, for deployments that run `make migrate` as a separate step.
+
+        Raises:
+            SchemaVersionError: If the schema is behind and auto_migrate is off,
+                or the database is newer than this code
+        """
+        version = await current_version(self.engine)
+        if auto_migrate and version < SCHEMA_VERSION:
+            await migrate(self.engine)
+            # Другой процесс мог мигрировать дальше - перечитываем версию
+            version = await current_version(self.engine)
+        await check_version(self.engine, version)
+
     async def drop_tables(self) -> None:
         """Drop all tables (use with caution!)."""
         async with self.engine.begin() as conn:
@@ -54,13 +79,18 @@ class Database:
             async with db.session() as session:
                 result = await session.execute(...)
         """
+        started = time.perf_counter()
+        result = "rollback"
         async with self.session_factory() as session:
             try:
                 yield session
                 await session.commit()
+                result = "commit"
             except Exception:
                 await session.rollback()
                 raise
+            finally:
+                DB_SESSION_DURATION.observe((result,), time.perf_counter() - started)
 
     async def close(self) -> None:
         """Close database engine."""
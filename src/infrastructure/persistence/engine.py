@@ -0,0 +1,86 @@
+"""Engine profiles chosen from the database URL."""
+
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import URL, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.config import SQLiteJournalMode, SQLiteSynchronous
+
+
+@dataclass(frozen=True)
+class EngineOptions:
+    """Tuning of the database engine; only the part matching the backend is used.
+
+    SQLite gets per-connection pragmas: WAL lets readers run alongside the
+    single writer, synchronous=NORMAL is durable under WAL except for the last
+    transactions on power loss, busy_timeout makes a blocked writer wait
+    instead of failing with "database is locked", and mmap_size serves reads
+    from the page cache without copying. Server databases get a sized,
+    pre-pinged connection pool; asyncpg additionally caches prepared
+    statements (set statement_cache_size to 0 behind pgbouncer in
+    transaction mode).
+    """
+
+    sqlite_journal_mode: SQLiteJournalMode = "WAL"
+    sqlite_synchronous: SQLiteSynchronous = "NORMAL"
+    sqlite_busy_timeout: int = 5000  # ms
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100
+
+
+def _is_memory(url: URL) -> bool:
+    return url.database in (None, "", ":memory:") or "mode=memory" in str(url)
+
+
+def sqlite_pragmas(options: EngineOptions, memory: bool = False) -> list[str]:
+    """PRAGMA statements run on every new SQLite connection."""
+    pragmas = [f"PRAGMA busy_timeout={options.sqlite_busy_timeout}"]
+    if not memory:
+        # У базы в памяти нет файла журнала и mmap
+        pragmas += [
+            f"PRAGMA journal_mode={options.sqlite_journal_mode}",
+            f"PRAGMA synchronous={options.sqlite_synchronous}",
+            f"PRAGMA mmap_size={options.sqlite_mmap_size}",
+        ]
+    return pragmas
+
+
+def create_engine(database_url: str, options: EngineOptions, echo: bool = False) -> AsyncEngine:
+    """Create async engine with the profile of the URL's backend."""
+    url = make_url(database_url)
+    kwargs: dict[str, Any] = {"echo": echo, "future": True}
+
+    if url.get_backend_name() == "sqlite":
+        engine = create_async_engine(url, **kwargs)
+        pragmas = sqlite_pragmas(options, memory=_is_memory(url))
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+        return engine
+
+    kwargs.update(
+        pool_size=options.pool_size,
+        max_overflow=options.max_overflow,
+        pool_timeout=options.pool_timeout,
+        pool_recycle=options.pool_recycle,
+        pool_pre_ping=options.pool_pre_ping,
+    )
+    if url.get_driver_name() == "asyncpg":
+        # Кеш SQLAlchemy-обёртки над prepared statements и собственный кеш asyncpg
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(options.statement_cache_size)}
+        )
+        kwargs["connect_args"] = {"statement_cache_size": options.statement_cache_size}
+    return create_async_engine(url, **kwargs)
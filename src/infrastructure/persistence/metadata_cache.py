@@ -0,0 +1,184 @@
+"""In-process read-through cache of client metadata."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.infrastructure.metrics import registry
+from src.infrastructure.persistence.models import ClientMetadata
+
+CACHE_LOOKUPS = registry.counter(
+    "metadata_cache_lookups_total", "Client metadata cache lookups", ("result",)
+)
+CACHE_SIZE = registry.gauge("metadata_cache_entries", "Client metadata cache entries")
+
+
+@dataclass
+class MetadataCacheStats:
+    """Metadata cache counters."""
+
+    hits: int = 0  # включая negative_hits
+    negative_hits: int = 0  # попадания в запись "метаданных нет"
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class _Snapshot:
+    """Column values of a ClientMetadata row, detached from any session."""
+
+    id: int
+    client_id: str
+    owner_ref: str | None
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def of(cls, metadata: ClientMetadata) -> "_Snapshot":
+        return cls(
+            metadata.id,
+            metadata.client_id,
+            metadata.owner_ref,
+            metadata.created_at,
+            metadata.updated_at,
+        )
+
+    def to_model(self) -> ClientMetadata:
+        """Fresh transient instance, so callers never share or mutate cached state."""
+        return ClientMetadata(
+            id=self.id,
+            client_id=self.client_id,
+            owner_ref=self.owner_ref,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+
+class ClientMetadataCache:
+    """Bounded LRU cache of ClientMetadata by client_id with a TTL.
+
+    Shared by all ClientMetadataRepository instances of the process. Clients
+    without metadata are cached as well (negative entries), since most panel
+    clients never get any. Repository writes invalidate the affected ids;
+    metadata changed in the database by another process is picked up after
+    `ttl` seconds. A `maxsize` of 0 disables caching.
+
+    Every invalidation gets a new version. Readers take `version` before
+    querying and pass it to `store`, which drops the result if the client was
+    invalidated meanwhile: a query that raced with a write cannot put the
+    pre-write row back. Versions of at most `maxsize` recent invalidations
+    are kept; older readers conservatively store nothing.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300.0) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[_Snapshot | None, float]] = OrderedDict()
+        self._version = 0
+        # client_id -> версия последней инвалидации, от старых к новым
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        # Версия, до которой инвалидации забыты (вытеснены или clear)
+        self._horizon = 0
+        self.stats = MetadataCacheStats()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether anything is cached."""
+        return self._maxsize > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def version(self) -> int:
+        """Invalidation version to pass to `store` for a query started now."""
+        return self._version
+
+    def lookup(self, client_id: str) -> tuple[bool, ClientMetadata | None]:
+        """Cached metadata of a client.
+
+        Returns:
+            (found, metadata): found is False on a miss; metadata is None for
+            a cached "no metadata" entry
+        """
+        entry = self._entries.get(client_id)
+        if entry is not None and time.monotonic() - entry[1] >= self._ttl:
+            del self._entries[client_id]
+            CACHE_SIZE.set((), len(self._entries))
+            entry = None
+        if entry is None:
+            self.stats.misses += 1
+            CACHE_LOOKUPS.inc(("miss",))
+            return False, None
+
+        self._entries.move_to_end(client_id)
+        self.stats.hits += 1
+        snapshot = entry[0]
+        if snapshot is None:
+            self.stats.negative_hits += 1
+            CACHE_LOOKUPS.inc(("negative_hit",))
+            return True, None
+        CACHE_LOOKUPS.inc(("hit",))
+        return True, snapshot.to_model()
+
+    def store(self, client_id: str, metadata: ClientMetadata | None, since: int) -> None:
+        """Remember metadata of a client, or that it has none.
+
+        Args:
+            client_id: VPN client UUID
+            metadata: Queried metadata, None if the client has none
+            since: `version` taken before the query; the result is dropped if
+                the client was invalidated after it
+        """
+        if not self.enabled:
+            return
+        if max(self._horizon, self._invalidated.get(client_id, 0)) > since:
+            return
+        # None - запись "метаданных нет", тоже кешируется
+        snapshot = _Snapshot.of(metadata) if metadata is not None else None
+        self._entries[client_id] = (snapshot, time.monotonic())
+        self._entries.move_to_end(client_id)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        CACHE_SIZE.set((), len(self._entries))
+
+    def invalidate(self, client_ids: Iterable[str]) -> None:
+        """Forget cached entries of clients and reject their in-flight reads."""
+        if not self.enabled:
+            return
+        self._version += 1
+        for client_id in client_ids:
+            if self._entries.pop(client_id, None) is not None:
+                self.stats.invalidations += 1
+            self._invalidated[client_id] = self._version
+            self._invalidated.move_to_end(client_id)
+        while len(self._invalidated) > self._maxsize:
+            _, version = self._invalidated.popitem(last=False)
+            self._horizon = version
+        CACHE_SIZE.set((), len(self._entries))
+
+    def clear(self) -> None:
+        """Forget everything."""
+        self._version += 1
+        self._horizon = self._version
+        self._invalidated.clear()
+        self._entries.clear()
+        CACHE_SIZE.set((), 0)
+
+    def as_dict(self) -> dict[str, float]:
+        """Size and counters as plain dict."""
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self._maxsize,
+            "hits": self.stats.hits,
+            "negative_hits": self.stats.negative_hits,
+            "misses": self.stats.misses,
+            "hit_ratio": self.stats.hits / lookups if lookups else 0.0,
+            "evictions": self.stats.evictions,
+            "invalidations": self.stats.invalidations,
+        }
@@ -0,0 +1,271 @@
+"""Versioned schema migrations.
+
+Every migration has a version number and an `upgrade` function run on a sync
+connection. Applied versions are recorded in the `schema_version` table, so
+an up-to-date database costs one small SELECT at startup. Migrations never
+change once released: schema changes are new migrations appended to
+MIGRATIONS, and models.py is kept in sync with the result.
+
+Run pending migrations with `make migrate` (or `python -m src.infrastructure.persistence`).
+"""
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Connection,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    SmallInteger,
+    String,
+    Table,
+    func,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+_schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change."""
+
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _initial_schema(conn: Connection) -> None:
+    """Tables as they were created by create_all before migrations existed.
+
+    Existing tables are left alone, so databases created by create_all are
+    adopted as version 1.
+    """
+    metadata = MetaData()
+    Table(
+        "client_metadata",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("client_id", String(255), unique=True, nullable=False, index=True),
+        Column("owner_ref", String(255), nullable=True, index=True),
+        Column("created_at", DateTime, nullable=False),
+        Column("updated_at", DateTime, nullable=False),
+    )
+    Table(
+        "panel_nodes",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("name", String(100), unique=True, nullable=False),
+        Column("base_url", String(500), nullable=False),
+        Column("username", String(255), nullable=False),
+        Column("password", String(255), nullable=False),
+        Column("verify_ssl", Boolean, nullable=False),
+        Column("enabled", Boolean, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+    )
+    Table(
+        "traffic_usage",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("granularity", SmallInteger, nullable=False),
+        Column("bucket", Integer, nullable=False),
+        Column("node", String(100), nullable=False),
+        Column("scope", SmallInteger, nullable=False),
+        Column("key", String(255), nullable=False),
+        Column("up", BigInteger, nullable=False),
+        Column("down", BigInteger, nullable=False),
+        Index("ix_traffic_usage_series", "granularity", "node", "scope", "key", "bucket"),
+    )
+    metadata.create_all(conn, checkfirst=True)
+
+
+def _composite_indexes(conn: Connection) -> None:
+    """Indexes for owner lookups and traffic maintenance queries.
+
+    (owner_ref, client_id) serves get_by_owner_ref and replaces the single
+    column owner_ref index it starts with; (granularity, bucket) serves the
+    newest-bucket lookup, rollups and retention deletes, which do not filter
+    by node or key and cannot use the series index past its first column.
+    """
+    metadata = MetaData()
+    client_metadata = Table("client_metadata", metadata, autoload_with=conn)
+    traffic_usage = Table("traffic_usage", metadata, autoload_with=conn)
+    existing = {index["name"] for index in inspect(conn).get_indexes("client_metadata")}
+    if "ix_client_metadata_owner_ref" in existing:
+        Index("ix_client_metadata_owner_ref", client_metadata.c.owner_ref).drop(conn)
+    Index(
+        "ix_client_metadata_owner_client",
+        client_metadata.c.owner_ref,
+        client_metadata.c.client_id,
+    ).create(conn)
+    Index(
+        "ix_traffic_usage_granularity_bucket",
+        traffic_usage.c.granularity,
+        traffic_usage.c.bucket,
+    ).create(conn)
+
+
+def _encrypted_node_passwords(conn: Connection) -> None:
+    """panel_nodes.password becomes password_encrypted, wide enough for tokens.
+
+    Values are carried over unchanged; plaintext passwords of existing rows
+    are encrypted with `python -m src.infrastructure.persistence encrypt-node-passwords`.
+    """
+    conn.execute(text("ALTER TABLE panel_nodes RENAME COLUMN password TO password_encrypted"))
+    # SQLite не проверяет длину VARCHAR
+    if conn.dialect.name == "postgresql":
+        conn.execute(
+            text("ALTER TABLE panel_nodes ALTER COLUMN password_encrypted TYPE VARCHAR(1000)")
+        )
+    elif conn.dialect.name in ("mysql", "mariadb"):
+        conn.execute(
+            text("ALTER TABLE panel_nodes MODIFY password_encrypted VARCHAR(1000) NOT NULL")
+        )
+
+
+def _leases(conn: Connection) -> None:
+    """Table of leases electing one runner of background jobs among workers."""
+    Table(
+        "leases",
+        MetaData(),
+        Column("name", String(100), primary_key=True),
+        Column("holder", String(255), nullable=False),
+        Column("expires_at", Integer, nullable=False),
+    ).create(conn)
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "initial schema", _initial_schema),
+    Migration(2, "composite indexes for owner and traffic queries", _composite_indexes),
+    Migration(3, "encrypted panel node passwords", _encrypted_node_passwords),
+    Migration(4, "leases of background jobs", _leases),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+# Ключ advisory lock в Postgres и имя блокировки в MySQL
+_LOCK_KEY = 0x7855_4D69_6772  # "xUMigr"
+_LOCK_NAME = "vpn_schema_migrations"
+
+
+class SchemaVersionError(RuntimeError):
+    """Database schema is not at the version this code expects."""
+
+
+def _current_version(conn: Connection) -> int:
+    if not inspect(conn).has_table(_schema_version.name):
+        return 0
+    return conn.execute(select(func.max(_schema_version.c.version))).scalar() or 0
+
+
+def _upgrade(conn: Connection, target: int) -> list[Migration]:
+    _schema_version.create(conn, checkfirst=True)
+    current = _current_version(conn)
+    applied = []
+    for migration in MIGRATIONS:
+        if current < migration.version <= target:
+            logger.info(f"Applying migration {migration.version}: {migration.description}")
+            migration.upgrade(conn)
+            conn.execute(
+                _schema_version.insert().values(
+                    version=migration.version,
+                    description=migration.description,
+                    # Naive UTC, как и остальные DateTime колонки
+                    applied_at=datetime.now(UTC).replace(tzinfo=None),
+                )
+            )
+            applied.append(migration)
+    return applied
+
+
+async def current_version(engine: AsyncEngine) -> int:
+    """Version of the database schema, 0 for an empty database."""
+    async with engine.connect() as conn:
+        return await conn.run_sync(_current_version)
+
+
+def _lock(conn: Connection) -> None:
+    """Serialize migrations of concurrently starting workers and replicas.
+
+    Held until the migration transaction ends (MySQL: until `_unlock`), so the
+    version `_upgrade` reads after it is final.
+    """
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+    elif dialect == "sqlite":
+        # Запись блокируется сразу, а не при первом INSERT после CREATE TABLE
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    elif dialect in ("mysql", "mariadb"):
+        conn.execute(text("SELECT GET_LOCK(:name, -1)"), {"name": _LOCK_NAME})
+
+
+def _unlock(conn: Connection) -> None:
+    if conn.dialect.name in ("mysql", "mariadb"):
+        conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": _LOCK_NAME})
+
+
+def _locked_upgrade(conn: Connection, target: int) -> list[Migration]:
+    _lock(conn)
+    try:
+        return _upgrade(conn, target)
+    finally:
+        _unlock(conn)
+
+
+async def migrate(engine: AsyncEngine, target: int = SCHEMA_VERSION) -> list[Migration]:
+    """Apply pending migrations up to `target` in one transaction.
+
+    Safe to run from several processes at once: an up-to-date schema costs
+    one version lookup, otherwise the upgrade holds a database lock and
+    re-reads the version, so only the first process applies migrations.
+
+    Returns:
+        Applied migrations, empty when the schema was up to date
+    """
+    if await current_version(engine) >= target:
+        return []
+    async with engine.begin() as conn:
+        return await conn.run_sync(_locked_upgrade, target)
+
+
+async def check_version(engine: AsyncEngine, version: int | None = None) -> None:
+    """Fail unless the schema is exactly at SCHEMA_VERSION.
+
+    Args:
+        engine: Database engine
+        version: Schema version already read by the caller, None to look it up
+
+    Raises:
+        SchemaVersionError: If migrations are pending or the database is newer
+    """
+    if version is None:
+        version = await current_version(engine)
+    if version < SCHEMA_VERSION:
+        raise SchemaVersionError(
+            f"Database schema is at version {version}, {SCHEMA_VERSION} is required: "
+            "run `make migrate`"
+        )
+    if version > SCHEMA_VERSION:
+        raise SchemaVersionError(
+            f"Database schema version {version} is newer than this code ({SCHEMA_VERSION})"
+        )
@@ -1,9 +1,10 @@
 """SQLAlchemy models for persistence layer."""
 
 from datetime import datetime
+from enum import IntEnum
 from typing import Optional
 
-from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import BigInteger, Boolean, DateTime, Index, Integer, SmallInteger, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -21,10 +22,11 @@ class ClientMetadata(Base):
     """
 
     __tablename__ = "client_metadata"
+    __table_args__ = (Index("ix_client_metadata_owner_client", "owner_ref", "client_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     client_id: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
-    owner_ref: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, index=True)
+    owner_ref: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
@@ -32,3 +34,86 @@ class ClientMetadata(Base):
 
     def __repr__(self) -> str:
         return f"<ClientMetadata(client_id={self.client_id}, owner_ref={self.owner_ref})>"
+
+
+class PanelNode(Base):
+    """3x-ui panel (VPN node) registered in database.
+
+    Complements nodes from settings so panels can be added without redeploy.
+    The password is stored encrypted with PANEL_SECRET_KEY (see SecretBox).
+    """
+
+    __tablename__ = "panel_nodes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+    base_url: Mapped[str] = mapped_column(String(500), nullable=False)
+    username: Mapped[str] = mapped_column(String(255), nullable=False)
+    password_encrypted: Mapped[str] = mapped_column(String(1000), nullable=False)
+    verify_ssl: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PanelNode(name={self.name}, base_url={self.base_url})>"
+
+
+class TrafficGranularity(IntEnum):
+    """Bucket size of traffic usage rows."""
+
+    RAW = 0  # one row per collector sample
+    HOUR = 1
+    DAY = 2
+
+
+class TrafficScope(IntEnum):
+    """What a traffic usage row is about."""
+
+    INBOUND = 0
+    CLIENT = 1
+
+
+class TrafficUsage(Base):
+    """Traffic transferred during one time bucket.
+
+    Stores deltas (not cumulative counters) of an inbound or a client. Raw
+    samples are rolled up into hourly and daily buckets; small integer codes
+    for granularity and scope keep rows compact.
+    """
+
+    __tablename__ = "traffic_usage"
+    __table_args__ = (
+        Index("ix_traffic_usage_series", "granularity", "node", "scope", "key", "bucket"),
+        Index("ix_traffic_usage_granularity_bucket", "granularity", "bucket"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    granularity: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    bucket: Mapped[int] = mapped_column(Integer, nullable=False)  # unix time of bucket start
+    node: Mapped[str] = mapped_column(String(100), nullable=False)
+    scope: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    key: Mapped[str] = mapped_column(String(255), nullable=False)  # inbound id or client id
+    up: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    down: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<TrafficUsage(key={self.key}, bucket={self.bucket}, up={self.up}, down={self.down})>"
+        )
+
+
+class Lease(Base):
+    """Exclusive right of one process to run a singleton background job.
+
+    Workers and replicas share the database: the holder renews its lease
+    before every run, others take it over only after it expired.
+    """
+
+    __tablename__ = "leases"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(255), nullable=False)
+    expires_at: Mapped[int] = mapped_column(Integer, nullable=False)  # unix time
+
+    def __repr__(self) -> str:
+        return f"<Lease(name={self.name}, holder={self.holder}, expires_at={self.expires_at})>"
@@ -1,23 +1,73 @@
 """Repository for client metadata persistence."""
 
-from typing import Optional
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from typing import Any, Optional, cast
 
-from sqlalchemy import select
+from sqlalchemy import (
+    CursorResult,
+    Table,
+    delete,
+    event,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
-from src.infrastructure.persistence.models import ClientMetadata
+from src.infrastructure.persistence.metadata_cache import ClientMetadataCache
+from src.infrastructure.persistence.models import (
+    ClientMetadata,
+    Lease,
+    PanelNode,
+    TrafficGranularity,
+    TrafficScope,
+    TrafficUsage,
+)
+from src.infrastructure.secrets import SecretBox
+
+# Ниже лимита переменных SQLite (999 в старых сборках) и удобно для Postgres
+IN_CHUNK_SIZE = 500
 
 
 class ClientMetadataRepository:
-    """Repository for managing client metadata in database."""
+    """Repository for managing client metadata in database.
 
-    def __init__(self, session: AsyncSession) -> None:
+    Lookups by client_id go through an optional shared ClientMetadataCache;
+    writes invalidate the ids they touch right away and once more after the
+    commit, so a concurrent read cannot cache the pre-commit state.
+    """
+
+    def __init__(self, session: AsyncSession, cache: ClientMetadataCache | None = None) -> None:
         """Initialize repository with database session.
 
         Args:
             session: SQLAlchemy async session
+            cache: Process-wide metadata cache, None to always query
         """
         self.session = session
+        self.cache = cache
+        self._written: set[str] = set()
+
+    def _invalidate(self, client_ids: Iterable[str]) -> None:
+        """Drop written ids from the cache now and after the transaction commits."""
+        if self.cache is None:
+            return
+        ids = set(client_ids)
+        self.cache.invalidate(ids)
+        if not self._written:
+            event.listen(self.session.sync_session, "after_commit", self._after_commit, once=True)
+        self._written |= ids
+
+    def _after_commit(self, session: Session) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(self._written)
+        self._written = set()
 
     async def create(self, client_id: str, owner_ref: Optional[str] = None) -> ClientMetadata:
         """Create new client metadata record.
@@ -35,8 +85,25 @@ class ClientMetadataRepository:
         )
         self.session.add(metadata)
         await self.session.flush()
+        self._invalidate([client_id])
         return metadata
 
+    async def create_many(self, records: list[tuple[str, Optional[str]]]) -> None:
+        """Create many client metadata records with one bulk INSERT.
+
+        Args:
+            records: Pairs of (VPN client UUID, owner_ref)
+        """
+        if not records:
+            return
+        # Core insert по таблице: ORM bulk insert разбивает строки с owner_ref=None
+        # и без него на отдельные INSERT
+        await self.session.execute(
+            insert(cast(Table, ClientMetadata.__table__)),
+            [{"client_id": client_id, "owner_ref": owner_ref} for client_id, owner_ref in records],
+        )
+        self._invalidate(client_id for client_id, _ in records)
+
     async def get_by_client_id(self, client_id: str) -> Optional[ClientMetadata]:
         """Get client metadata by VPN client ID.
 
@@ -46,10 +113,57 @@ class ClientMetadataRepository:
         Returns:
             ClientMetadata if found, None otherwise
         """
+        if self.cache is None:
+            return await self._load(client_id)
+        found, metadata = self.cache.lookup(client_id)
+        if found:
+            return metadata
+        since = self.cache.version
+        metadata = await self._load(client_id)
+        if client_id not in self._written:
+            self.cache.store(client_id, metadata, since)
+        return metadata
+
+    async def _load(self, client_id: str) -> Optional[ClientMetadata]:
+        """Query metadata of a client, bypassing the cache."""
         stmt = select(ClientMetadata).where(ClientMetadata.client_id == client_id)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_by_client_ids(self, client_ids: Iterable[str]) -> dict[str, ClientMetadata]:
+        """Get metadata of many clients with one IN query per IN_CHUNK_SIZE ids.
+
+        Args:
+            client_ids: VPN client UUIDs, duplicates are ignored
+
+        Returns:
+            Mapping of client_id to ClientMetadata for clients that have metadata
+        """
+        ids = list(dict.fromkeys(client_ids))
+        found: dict[str, ClientMetadata] = {}
+        if self.cache is not None:
+            missed = []
+            for client_id in ids:
+                cached, metadata = self.cache.lookup(client_id)
+                if not cached:
+                    missed.append(client_id)
+                elif metadata is not None:
+                    found[client_id] = metadata
+            ids = missed
+
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            chunk = ids[start : start + IN_CHUNK_SIZE]
+            since = self.cache.version if self.cache is not None else 0
+            stmt = select(ClientMetadata).where(ClientMetadata.client_id.in_(chunk))
+            result = await self.session.execute(stmt)
+            loaded = {metadata.client_id: metadata for metadata in result.scalars()}
+            found.update(loaded)
+            if self.cache is not None:
+                for client_id in chunk:
+                    if client_id not in self._written:
+                        self.cache.store(client_id, loaded.get(client_id), since)
+        return found
+
     async def get_by_owner_ref(self, owner_ref: str) -> list[ClientMetadata]:
         """Get all client metadata records for a specific owner.
 
@@ -75,10 +189,11 @@ class ClientMetadataRepository:
         Returns:
             Updated ClientMetadata if found, None otherwise
         """
-        metadata = await self.get_by_client_id(client_id)
+        metadata = await self._load(client_id)
         if metadata:
             metadata.owner_ref = owner_ref
             await self.session.flush()
+            self._invalidate([client_id])
         return metadata
 
     async def delete(self, client_id: str) -> bool:
@@ -90,9 +205,302 @@ class ClientMetadataRepository:
         Returns:
             True if deleted, False if not found
         """
-        metadata = await self.get_by_client_id(client_id)
-        if metadata:
-            await self.session.delete(metadata)
-            await self.session.flush()
+        return await self.delete_many([client_id]) > 0
+
+    async def delete_many(self, client_ids: list[str]) -> int:
+        """Delete metadata of many clients with a single DELETE statement.
+
+        Args:
+            client_ids: VPN client UUIDs
+
+        Returns:
+            Number of deleted records
+        """
+        if not client_ids:
+            return 0
+        stmt = delete(ClientMetadata).where(ClientMetadata.client_id.in_(client_ids))
+        result = cast(CursorResult[Any], await self.session.execute(stmt))
+        self._invalidate(client_ids)
+        return result.rowcount
+
+    async def update_owner_ref_many(self, client_ids: list[str], owner_ref: Optional[str]) -> int:
+        """Set owner_ref of many clients with a single UPDATE statement.
+
+        Args:
+            client_ids: VPN client UUIDs
+            owner_ref: New user ID from billing system
+
+        Returns:
+            Number of updated records
+        """
+        if not client_ids:
+            return 0
+        stmt = (
+            update(ClientMetadata)
+            .where(ClientMetadata.client_id.in_(client_ids))
+            .values(owner_ref=owner_ref, updated_at=datetime.now(UTC).replace(tzinfo=None))
+            .execution_options(synchronize_session=False)
+        )
+        result = cast(CursorResult[Any], await self.session.execute(stmt))
+        self._invalidate(client_ids)
+        return result.rowcount
+
+
+class PanelNodeRepository:
+    """Repository for 3x-ui panels registered in database."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        """Initialize repository with database session.
+
+        Args:
+            session: SQLAlchemy async session
+        """
+        self.session = session
+
+    async def list_enabled(self) -> list[PanelNode]:
+        """Get all enabled panel nodes.
+
+        Returns:
+            List of PanelNode instances ordered by name
+        """
+        stmt = select(PanelNode).where(PanelNode.enabled.is_(True)).order_by(PanelNode.name)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def add(
+        self,
+        name: str,
+        base_url: str,
+        username: str,
+        password: str,
+        box: SecretBox,
+        verify_ssl: bool = True,
+    ) -> PanelNode:
+        """Register a panel, storing its password encrypted.
+
+        Args:
+            name: Unique node name
+            base_url: Panel URL including its secret path
+            username: Panel admin username
+            password: Panel admin password in plaintext
+            box: Encryption of the password
+
+        Returns:
+            Created PanelNode instance
+        """
+        node = PanelNode(
+            name=name,
+            base_url=base_url,
+            username=username,
+            password_encrypted=box.encrypt(password),
+            verify_ssl=verify_ssl,
+            enabled=True,
+        )
+        self.session.add(node)
+        await self.session.flush()
+        return node
+
+    async def encrypt_passwords(self, box: SecretBox) -> int:
+        """Encrypt plaintext passwords and re-encrypt the rest with the first key.
+
+        Returns:
+            Number of passwords that were stored in plaintext
+        """
+        encrypted = 0
+        for node in (await self.session.execute(select(PanelNode))).scalars():
+            if box.is_encrypted(node.password_encrypted):
+                node.password_encrypted = box.rotate(node.password_encrypted)
+            else:
+                node.password_encrypted = box.encrypt(node.password_encrypted)
+                encrypted += 1
+        await self.session.flush()
+        return encrypted
+
+
+class TrafficRepository:
+    """Repository for traffic usage time series."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        """Initialize repository with database session.
+
+        Args:
+            session: SQLAlchemy async session
+        """
+        self.session = session
+
+    async def add_samples(self, rows: list[dict[str, int | str]]) -> None:
+        """Store raw traffic deltas with one bulk INSERT.
+
+        Args:
+            rows: Dicts with bucket, node, scope, key, up and down
+        """
+        if not rows:
+            return
+        await self.session.execute(
+            insert(TrafficUsage),
+            [{**row, "granularity": TrafficGranularity.RAW} for row in rows],
+        )
+
+    async def last_bucket(self, granularity: TrafficGranularity) -> Optional[int]:
+        """Get start of the newest bucket of given granularity.
+
+        Args:
+            granularity: Bucket granularity
+
+        Returns:
+            Unix time of the newest bucket, None if there are no rows
+        """
+        stmt = select(func.max(TrafficUsage.bucket)).where(TrafficUsage.granularity == granularity)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def rollup(
+        self,
+        source: TrafficGranularity,
+        target: TrafficGranularity,
+        bucket_size: int,
+        since: int,
+        until: int,
+    ) -> None:
+        """Aggregate rows of source granularity into target buckets.
+
+        Uses one INSERT ... SELECT ... GROUP BY, only complete target buckets
+        in [since, until) are aggregated.
+
+        Args:
+            source: Granularity of rows to aggregate
+            target: Granularity of produced rows
+            bucket_size: Target bucket size in seconds
+            since: Start of the first target bucket to produce
+            until: End of the last target bucket to produce
+        """
+        target_bucket = (TrafficUsage.bucket // bucket_size) * bucket_size
+        select_stmt = (
+            select(
+                literal(int(target)).label("granularity"),
+                target_bucket.label("bucket"),
+                TrafficUsage.node,
+                TrafficUsage.scope,
+                TrafficUsage.key,
+                func.sum(TrafficUsage.up),
+                func.sum(TrafficUsage.down),
+            )
+            .where(
+                TrafficUsage.granularity == source,
+                TrafficUsage.bucket >= since,
+                TrafficUsage.bucket < until,
+            )
+            .group_by(target_bucket, TrafficUsage.node, TrafficUsage.scope, TrafficUsage.key)
+        )
+        await self.session.execute(
+            insert(TrafficUsage).from_select(
+                ["granularity", "bucket", "node", "scope", "key", "up", "down"], select_stmt
+            )
+        )
+
+    async def delete_older_than(self, granularity: TrafficGranularity, before: int) -> int:
+        """Delete rows of given granularity older than a moment.
+
+        Args:
+            granularity: Bucket granularity
+            before: Unix time; buckets starting earlier are deleted
+
+        Returns:
+            Number of deleted rows
+        """
+        stmt = delete(TrafficUsage).where(
+            TrafficUsage.granularity == granularity, TrafficUsage.bucket < before
+        )
+        result = cast(CursorResult[Any], await self.session.execute(stmt))
+        return result.rowcount
+
+    async def get_series(
+        self,
+        node: str,
+        scope: TrafficScope,
+        key: str,
+        granularity: TrafficGranularity,
+        start: int,
+        end: int,
+    ) -> list[TrafficUsage]:
+        """Get traffic buckets of one inbound or client in a time range.
+
+        Args:
+            node: Node name
+            scope: Inbound or client
+            key: Inbound id or client id
+            granularity: Bucket granularity
+            start: Unix time, inclusive
+            end: Unix time, exclusive
+
+        Returns:
+            TrafficUsage rows ordered by bucket
+        """
+        stmt = (
+            select(TrafficUsage)
+            .where(
+                TrafficUsage.granularity == granularity,
+                TrafficUsage.node == node,
+                TrafficUsage.scope == scope,
+                TrafficUsage.key == key,
+                TrafficUsage.bucket >= start,
+                TrafficUsage.bucket < end,
+            )
+            .order_by(TrafficUsage.bucket)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+
+class LeaseRepository:
+    """Repository for leases of singleton background jobs."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        """Initialize repository with database session.
+
+        Args:
+            session: SQLAlchemy async session
+        """
+        self.session = session
+
+    async def acquire(self, name: str, holder: str, ttl: int, now: int) -> bool:
+        """Take or renew a lease.
+
+        Succeeds when the lease is free, expired or already held by `holder`;
+        the row update is atomic, so of concurrent callers only one wins.
+
+        Args:
+            name: Job name
+            holder: Unique id of the calling process
+            ttl: Seconds the lease is valid without renewal
+            now: Current unix time
+
+        Returns:
+            True if `holder` holds the lease until now + ttl
+        """
+        stmt = (
+            update(Lease)
+            .where(Lease.name == name, or_(Lease.holder == holder, Lease.expires_at <= now))
+            .values(holder=holder, expires_at=now + ttl)
+        )
+        result = cast(CursorResult[Any], await self.session.execute(stmt))
+        if result.rowcount:
             return True
-        return False
+        try:
+            async with self.session.begin_nested():
+                self.session.add(Lease(name=name, holder=holder, expires_at=now + ttl))
+        except IntegrityError:
+            # Аренду только что создал другой процесс
+            return False
+        return True
+
+    async def release(self, name: str, holder: str) -> None:
+        """Give up a lease so another process can take it at once.
+
+        Args:
+            name: Job name
+            holder: Id of the process that holds the lease
+        """
+        await self.session.execute(
+            update(Lease).where(Lease.name == name, Lease.holder == holder).values(expires_at=0)
+        )
@@ -0,0 +1,169 @@
+"""Retry policy and circuit breaker for requests to one 3x-ui panel."""
+
+import random
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+
+import httpx
+
+from src.domain.exceptions import NodeUnavailableException
+from src.infrastructure.metrics import registry
+
+CIRCUIT_STATE = registry.gauge(
+    "xui_circuit_state",
+    "Circuit breaker state per panel (0 closed, 1 half-open, 2 open)",
+    ("node",),
+)
+CIRCUIT_REJECTIONS = registry.counter(
+    "xui_circuit_rejections_total", "Requests rejected while the circuit was open", ("node",)
+)
+RETRIES = registry.counter("xui_retries_total", "Repeated panel requests", ("node", "method"))
+
+# Запрос не ушёл в панель - повторять безопасно любой метод
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+RETRYABLE_STATUSES = frozenset({502, 503, 504})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Jittered exponential backoff for failed panel requests.
+
+    `attempts` counts the first try, so 1 disables retries. `budget` limits
+    the seconds spent on one request across attempts (0 for no limit): no
+    retry starts after it is spent and backoff never sleeps past it.
+    """
+
+    attempts: int = 1
+    base_delay: float = 0.2
+    max_delay: float = 2.0
+    budget: float = 0.0
+
+    def delay(self, retry: int, elapsed: float = 0.0) -> float:
+        """Seconds to sleep before retry number `retry` (0-based), full jitter."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+        if self.budget:
+            delay = min(delay, max(0.0, self.budget - elapsed))
+        return delay
+
+    def should_retry(
+        self,
+        retry: int,
+        idempotent: bool,
+        error: httpx.HTTPError | None = None,
+        status_code: int | None = None,
+        elapsed: float = 0.0,
+    ) -> bool:
+        """Whether a failed attempt may be repeated.
+
+        Requests that never reached the panel are always safe to repeat;
+        timeouts, dropped connections and gateway errors only for idempotent
+        requests. Nothing is repeated once `elapsed` seconds since the first
+        attempt exhaust the budget.
+        """
+        if retry + 1 >= self.attempts or (self.budget and elapsed >= self.budget):
+            return False
+        if isinstance(error, _NOT_SENT_ERRORS):
+            return True
+        if not idempotent:
+            return False
+        if error is not None:
+            return isinstance(error, httpx.TransportError)
+        return status_code in RETRYABLE_STATUSES
+
+
+class CircuitState(IntEnum):
+    """Circuit breaker state (values are exported as the metric)."""
+
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker of one panel.
+
+    After `failure_threshold` failures in a row (transport errors and 5xx)
+    requests fail fast with NodeUnavailableException for `reset_timeout`
+    seconds. Then a single probe request is let through: its success closes
+    the circuit, its failure opens it again. A threshold of 0 disables the
+    breaker.
+    """
+
+    def __init__(
+        self, name: str = "default", failure_threshold: int = 5, reset_timeout: float = 30.0
+    ) -> None:
+        self._name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._publish()
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state; an open circuit past reset_timeout reports half-open."""
+        if (
+            self._state is CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self._reset_timeout
+        ):
+            return CircuitState.HALF_OPEN
+        return self._state
+
+    def before_request(self) -> bool:
+        """Let a request through or reject it.
+
+        Returns:
+            True if the request is the probe of a half-open circuit; only the
+            probe may call `release_probe`
+
+        Raises:
+            NodeUnavailableException: If the circuit is open or a probe is running
+        """
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return False
+        if state is CircuitState.HALF_OPEN and not self._probing:
+            self._state = CircuitState.HALF_OPEN
+            self._probing = True
+            self._publish()
+            return True
+        CIRCUIT_REJECTIONS.inc((self._name,))
+        retry_in = max(0.0, self._reset_timeout - (time.monotonic() - self._opened_at))
+        raise NodeUnavailableException(
+            f"Node {self._name} is unavailable: circuit open, retry in {retry_in:.0f}s"
+        )
+
+    def record_success(self) -> None:
+        """Request reached the panel and got a non-5xx answer."""
+        self._failures = 0
+        self._probing = False
+        if self._state is not CircuitState.CLOSED:
+            self._state = CircuitState.CLOSED
+            self._publish()
+
+    def record_failure(self) -> None:
+        """Request failed in transport or with 5xx."""
+        self._failures += 1
+        if self._probing or (self._failure_threshold and self._failures >= self._failure_threshold):
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+            self._probing = False
+            self._publish()
+
+    def release_probe(self) -> None:
+        """Forget a probe that ended without an outcome (e.g. was cancelled).
+
+        Called only by the request `before_request` admitted as the probe, so
+        a cancelled ordinary request cannot let a second probe through.
+        """
+        self._probing = False
+
+    def _publish(self) -> None:
+        CIRCUIT_STATE.set((self._name,), self._state)
+
+    def as_dict(self) -> dict[str, object]:
+        """Current state as plain dict."""
+        return {"state": self.state.name.lower(), "consecutive_failures": self._failures}
@@ -0,0 +1,58 @@
+"""Encryption of secrets stored in the application database."""
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+
+from src.domain.exceptions import InvalidConfigurationException
+
+
+class SecretBox:
+    """Symmetric encryption of short secrets such as panel passwords.
+
+    Tokens are Fernet (AES-128-CBC with HMAC-SHA256), so tampered values are
+    rejected rather than decrypted to garbage. Several comma-separated keys
+    may be given to rotate: the first one encrypts, any of them decrypts.
+    """
+
+    def __init__(self, keys: str) -> None:
+        try:
+            self._fernet = MultiFernet([Fernet(key.strip()) for key in keys.split(",")])
+        except ValueError as e:
+            raise InvalidConfigurationException(
+                "PANEL_SECRET_KEY must be comma-separated Fernet keys "
+                "(python -m src.infrastructure.persistence generate-key)"
+            ) from e
+
+    @staticmethod
+    def generate_key() -> str:
+        """New random key."""
+        return Fernet.generate_key().decode()
+
+    def encrypt(self, secret: str) -> str:
+        """Encrypt a secret into a printable token."""
+        return self._fernet.encrypt(secret.encode()).decode()
+
+    def decrypt(self, token: str) -> str:
+        """Decrypt a token made by `encrypt` with any of the keys.
+
+        Raises:
+            InvalidConfigurationException: If the token was not encrypted with
+                these keys or was modified
+        """
+        try:
+            return self._fernet.decrypt(token.encode()).decode()
+        except InvalidToken as e:
+            raise InvalidConfigurationException(
+                "Secret is not encrypted with PANEL_SECRET_KEY"
+            ) from e
+
+    def is_encrypted(self, value: str) -> bool:
+        """Whether a value is a token of these keys."""
+        try:
+            self._fernet.decrypt(value.encode())
+        except InvalidToken:
+            return False
+        return True
+
+    def rotate(self, token: str) -> str:
+        """Re-encrypt a token with the first key."""
+        return self._fernet.rotate(token.encode()).decode()
@@ -0,0 +1,230 @@
+"""Background collector of traffic time series."""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections.abc import Mapping
+
+from src.domain.entities import Inbound
+from src.domain.ports import VPNServerPort
+from src.infrastructure.persistence import (
+    Database,
+    LeaseRepository,
+    TrafficGranularity,
+    TrafficRepository,
+    TrafficScope,
+)
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+LEASE_NAME = "traffic_collector"
+# Аренда переживает пару пропущенных циклов держателя
+LEASE_INTERVALS = 3
+
+# Ключ счётчика: (узел, scope, id inbound или клиента)
+_CounterKey = tuple[str, int, str]
+
+
+def counter_delta(previous: int, current: int) -> int:
+    """Traffic transferred between two readings of a cumulative counter.
+
+    A counter that went down was reset in the panel, so everything it shows
+    now was transferred after the reset.
+    """
+    return current - previous if current >= previous else current
+
+
+class TrafficCollector:
+    """Samples traffic counters of every node and stores deltas in the database.
+
+    Every `interval` seconds cumulative counters of inbounds and clients are
+    read (from cached snapshots when caching is on) and the difference to the
+    previous reading is stored as a raw row. Complete hours of raw rows are
+    rolled up into hourly buckets and complete days of hourly buckets into
+    daily ones; every granularity has its own retention.
+
+    Every worker and replica runs a collector, but only the holder of a
+    database lease samples and rolls up; the others take over once the
+    holder stops renewing it.
+    """
+
+    def __init__(
+        self,
+        nodes: Mapping[str, VPNServerPort],
+        database: Database,
+        interval: float,
+        raw_retention: int,
+        hourly_retention: int,
+        daily_retention: int,
+        node_timeout: float,
+    ) -> None:
+        self._nodes = nodes
+        self._database = database
+        self._interval = interval
+        self._retention = {
+            TrafficGranularity.RAW: raw_retention,
+            TrafficGranularity.HOUR: hourly_retention,
+            TrafficGranularity.DAY: daily_retention,
+        }
+        self._node_timeout = node_timeout
+        self._counters: dict[_CounterKey, tuple[int, int]] = {}
+        # Начало первого ещё не свёрнутого бакета для каждой гранулярности
+        self._watermarks: dict[TrafficGranularity, int] = {}
+        self._holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lease_ttl = max(1, int(interval * LEASE_INTERVALS))
+        self._task: asyncio.Task[None] | None = None
+
+    def _deltas(self, node: str, inbounds: list[Inbound]) -> list[tuple[int, str, int, int]]:
+        """Turn cumulative counters into deltas since the previous sample.
+
+        The first reading of a counter only sets the baseline.
+        """
+        readings: list[tuple[int, str, int, int]] = []
+        for inbound in inbounds:
+            if inbound.id is None:
+                continue
+            readings.append((TrafficScope.INBOUND, str(inbound.id), inbound.up, inbound.down))
+            readings.extend(
+                (TrafficScope.CLIENT, stat.uuid or stat.email, stat.up, stat.down)
+                for stat in inbound.clientStats
+            )
+
+        deltas: list[tuple[int, str, int, int]] = []
+        for scope, key, up, down in readings:
+            previous = self._counters.get((node, scope, key))
+            self._counters[(node, scope, key)] = (up, down)
+            if previous is None:
+                continue
+            delta_up, delta_down = counter_delta(previous[0], up), counter_delta(previous[1], down)
+            if delta_up or delta_down:
+                deltas.append((scope, key, delta_up, delta_down))
+        return deltas
+
+    async def sample(self, now: float | None = None) -> int:
+        """Read counters of every node and store deltas as raw rows.
+
+        Returns:
+            Number of stored rows
+        """
+        bucket = int(time.time() if now is None else now)
+
+        names = list(self._nodes)
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(self._nodes[name].get_inbounds(), self._node_timeout)
+                for name in names
+            ),
+            return_exceptions=True,
+        )
+
+        rows: list[dict[str, int | str]] = []
+        for node, result in zip(names, results):
+            if isinstance(result, BaseException):
+                # Пропущенный сэмпл не теряет трафик: дельта придёт со следующим
+                logger.warning(f"Traffic sample of node {node} failed: {result}")
+                continue
+            rows.extend(
+                {"bucket": bucket, "node": node, "scope": scope, "key": key, "up": up, "down": down}
+                for scope, key, up, down in self._deltas(node, result)
+            )
+
+        async with self._database.session() as session:
+            await TrafficRepository(session).add_samples(rows)
+        return len(rows)
+
+    async def _rollup_step(
+        self,
+        repository: TrafficRepository,
+        source: TrafficGranularity,
+        target: TrafficGranularity,
+        bucket_size: int,
+        now: float,
+    ) -> int | None:
+        """Roll up complete target buckets that are not rolled up yet.
+
+        Returns:
+            New watermark of the target granularity, None if nothing was rolled up
+        """
+        until = int(now // bucket_size * bucket_size)
+        since = self._watermarks.get(target)
+        if since is None:
+            last = await repository.last_bucket(target)
+            since = last + bucket_size if last is not None else 0
+        if since < until:
+            await repository.rollup(source, target, bucket_size, since, until)
+            return until
+        return None
+
+    async def rollup(self, now: float | None = None) -> None:
+        """Roll up raw rows into hours and hours into days, then apply retention."""
+        now = time.time() if now is None else now
+        watermarks: dict[TrafficGranularity, int | None] = {}
+        async with self._database.session() as session:
+            repository = TrafficRepository(session)
+            watermarks[TrafficGranularity.HOUR] = await self._rollup_step(
+                repository, TrafficGranularity.RAW, TrafficGranularity.HOUR, HOUR, now
+            )
+            watermarks[TrafficGranularity.DAY] = await self._rollup_step(
+                repository, TrafficGranularity.HOUR, TrafficGranularity.DAY, DAY, now
+            )
+            for granularity, retention in self._retention.items():
+                await repository.delete_older_than(granularity, int(now - retention))
+        # Только после коммита: при откате те же бакеты свернутся в следующий раз
+        self._watermarks.update(
+            (granularity, until) for granularity, until in watermarks.items() if until is not None
+        )
+
+    async def collect(self, now: float | None = None) -> bool:
+        """Sample and roll up if this process holds the collector lease.
+
+        Returns:
+            False if another process collects
+        """
+        now = time.time() if now is None else now
+        async with self._database.session() as session:
+            held = await LeaseRepository(session).acquire(
+                LEASE_NAME, self._holder, self._lease_ttl, int(now)
+            )
+        if not held:
+            # Другой процесс пишет дельты: после перехвата аренды начинаем с базовой линии
+            self._counters.clear()
+            self._watermarks.clear()
+            return False
+        await self.sample(now)
+        await self.rollup(now)
+        return True
+
+    async def _run(self) -> None:
+        """Sample and roll up periodically."""
+        while True:
+            try:
+                await self.collect()
+            except Exception:
+                logger.exception("Traffic collection failed")
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        """Start background collection."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop background collection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            try:
+                async with self._database.session() as session:
+                    await LeaseRepository(session).release(LEASE_NAME, self._holder)
+            except Exception:
+                logger.warning("Failed to release traffic collector lease", exc_info=True)
@@ -1,25 +1,80 @@
 """3x-ui API adapter."""
 
+import asyncio
+import importlib.util
 import json
 import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager, AsyncExitStack, nullcontext
 from typing import Any
 
 import httpx
 
-from src.domain.entities import Client, Inbound, InboundTraffic, ServerStats, Settings
+from src.domain.entities import (
+    Client,
+    Inbound,
+    InboundTraffic,
+    ServerStats,
+)
 from src.domain.exceptions import (
     AuthenticationException,
     ClientNotFoundException,
     InboundNotFoundException,
+    InvalidConfigurationException,
     VPNServerException,
 )
 from src.domain.ports import VPNServerPort
+from src.infrastructure.coalescing import SingleFlight
+from src.infrastructure.codec import JSONCodec, default_codec
+from src.infrastructure.concurrency import AdaptiveLimiter
+from src.infrastructure.json_stream import (
+    JSONArrayNotFoundError,
+    JSONStreamError,
+    iter_json_array,
+)
+from src.infrastructure.lazy_inbound import LazyInbound
+from src.infrastructure.metrics import (
+    XUI_LOGINS,
+    XUI_REQUEST_DURATION,
+    XUI_RESPONSE_BYTES,
+    template_path,
+)
+from src.infrastructure.resilience import RETRIES, CircuitBreaker, RetryPolicy
 
 logger = logging.getLogger(__name__)
 
 
+# Сообщения checkLogin 3x-ui (pages.login.loginAgain) в `{"success": false, "msg": ...}`.
+# Только en/ru: в других локалях истечение распознаётся по 401, редиректу на логин
+# или удалённой cookie сессии (см. XUIAdapter._session_cookie_dropped)
+SESSION_EXPIRED_MESSAGES = frozenset(
+    {
+        "your session has expired, please log in again",
+        "the login time limit has expired, please log in again",
+        "сессия истекла, пожалуйста, войдите снова",
+    }
+)
+
+
+def is_session_expired_message(message: str) -> bool:
+    """Whether a failed panel response reports an expired session.
+
+    Matches the English and Russian panel texts only; the adapter also
+    checks locale-independent signals, this is the fallback for old panels
+    that answer 200 without touching the cookie.
+    """
+    return message.strip().rstrip(".!").lower() in SESSION_EXPIRED_MESSAGES
+
+
 class XUIAdapter(VPNServerPort):
-    """Adapter for 3x-ui API."""
+    """Adapter for 3x-ui API.
+
+    The panel session cookie is kept for the adapter's lifetime: login happens
+    lazily on the first request and again only when the panel reports that the
+    session has expired. Concurrent requests that hit an expired session share
+    a single re-login.
+    """
 
     def __init__(
         self,
@@ -28,23 +83,58 @@ class XUIAdapter(VPNServerPort):
         password: str,
         timeout: int = 30,
         verify_ssl: bool = True,
+        transport: httpx.AsyncBaseTransport | None = None,
+        codec: JSONCodec | None = None,
+        node: str = "default",
+        limits: httpx.Limits | None = None,
+        http2: bool = False,
+        limiter: AdaptiveLimiter | None = None,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
     ) -> None:
+        if http2 and importlib.util.find_spec("h2") is None:
+            raise InvalidConfigurationException(
+                "HTTP/2 to 3x-ui requires the h2 package (uv sync --extra http2)"
+            )
         self._base_url = base_url.rstrip("/")
+        self._base_path = httpx.URL(self._base_url).path.rstrip("/")
         self._username = username
         self._password = password
         self._timeout = timeout
         self._verify_ssl = verify_ssl
+        self._transport = transport
+        self._codec = codec or default_codec
+        # Имя узла - метка метрик, base_url в метки не попадает (секретный путь)
+        self._node = node
+        self._limits = limits or httpx.Limits()
+        self._http2 = http2
+        self._limiter = limiter
+        self._retry = retry or RetryPolicy()
+        self._breaker = breaker or CircuitBreaker(node)
         self._session: httpx.AsyncClient | None = None
         self._cookie: str | None = None
-
-    async def _get_session(self) -> httpx.AsyncClient:
-        """Get or create HTTP session."""
+        self._authenticated = False
+        self._auth_lock = asyncio.Lock()
+        # Increments on every successful login, lets waiters detect that
+        # somebody else has already refreshed the session
+        self._auth_generation = 0
+        self._inflight: SingleFlight[dict[str, Any]] = SingleFlight()
+
+    def _get_session(self) -> httpx.AsyncClient:
+        """Get or create HTTP session.
+
+        Synchronous on purpose: with no await between the check and the
+        assignment concurrent callers can never create two clients.
+        """
         if self._session is None:
             self._session = httpx.AsyncClient(
                 base_url=self._base_url,
                 timeout=self._timeout,
                 follow_redirects=True,
                 verify=self._verify_ssl,  # Отключаем проверку SSL если нужно
+                transport=self._transport,
+                limits=self._limits,
+                http2=self._http2,
             )
         return self._session
 
@@ -53,10 +143,71 @@ class XUIAdapter(VPNServerPort):
         if self._session is not None:
             await self._session.aclose()
             self._session = None
+        self._cookie = None
+        self._authenticated = False
+
+    def runtime_stats(self) -> dict[str, Any]:
+        """Request coalescing, concurrency limiter and circuit breaker state."""
+        stats: dict[str, Any] = {
+            "coalescing": self._inflight.stats.as_dict(),
+            "circuit": self._breaker.as_dict(),
+        }
+        if self._limiter is not None:
+            stats["concurrency"] = self._limiter.as_dict()
+        return stats
+
+    @property
+    def is_authenticated(self) -> bool:
+        """Whether a panel session is currently held."""
+        return self._authenticated
+
+    async def ensure_authenticated(self) -> None:
+        """Log in only if there is no session yet."""
+        if not self._authenticated:
+            await self._reauthenticate(self._auth_generation)
+
+    async def _reauthenticate(self, seen_generation: int) -> None:
+        """Log in again unless another coroutine already did it.
+
+        Args:
+            seen_generation: Auth generation observed by the caller before it
+                noticed the session was missing or expired
+        """
+        async with self._auth_lock:
+            if self._auth_generation != seen_generation and self._authenticated:
+                return
+            await self.authenticate()
 
     async def authenticate(self) -> bool:
         """Authenticate with 3x-ui panel."""
-        session = await self._get_session()
+        probe = self._breaker.before_request()
+        try:
+            result = await self._login()
+        except AuthenticationException as e:
+            XUI_LOGINS.inc((self._node, "failure"))
+            # Неверный пароль - панель жива; падает только транспорт или 5xx
+            cause = e.__cause__
+            if isinstance(cause, httpx.TransportError) or (
+                isinstance(cause, httpx.HTTPStatusError) and cause.response.status_code >= 500
+            ):
+                self._breaker.record_failure()
+            else:
+                self._breaker.record_success()
+            raise
+        except BaseException:
+            if probe:
+                self._breaker.release_probe()
+            raise
+        XUI_LOGINS.inc((self._node, "success"))
+        self._breaker.record_success()
+        return result
+
+    async def _login(self) -> bool:
+        """Log in and store the session cookie."""
+        session = self._get_session()
+        self._cookie = None
+        self._authenticated = False
+        session.cookies.clear()
 
         try:
             # 3x-ui ожидает JSON в теле запроса
@@ -74,7 +225,7 @@ class XUIAdapter(VPNServerPort):
                 # Если ответ пустой, но есть cookie - это может быть успех
                 if "3x-ui" in response.cookies or "session" in response.cookies:
                     logger.info("Authentication successful (empty response but got cookies)")
-                    self._cookie = response.cookies.get("3x-ui") or response.cookies.get("session")
+                    self._store_cookie(response)
                     return True
                 else:
                     raise AuthenticationException(
@@ -92,7 +243,7 @@ class XUIAdapter(VPNServerPort):
                     )
 
                 # Store session cookie
-                self._cookie = response.cookies.get("3x-ui") or response.cookies.get("session")
+                self._store_cookie(response)
                 if not self._cookie:
                     logger.warning("No session cookie received, authentication may fail")
 
@@ -104,7 +255,7 @@ class XUIAdapter(VPNServerPort):
                     "3x-ui" in response.cookies or "session" in response.cookies
                 ):
                     logger.info("Authentication successful (non-JSON response but got cookies)")
-                    self._cookie = response.cookies.get("3x-ui") or response.cookies.get("session")
+                    self._store_cookie(response)
                     return True
                 else:
                     raise AuthenticationException(
@@ -115,52 +266,224 @@ class XUIAdapter(VPNServerPort):
         except httpx.HTTPError as e:
             raise AuthenticationException(f"Authentication failed: {e}") from e
 
+    def _store_cookie(self, response: httpx.Response) -> None:
+        """Remember session cookie from login response and bump auth generation."""
+        self._cookie = response.cookies.get("3x-ui") or response.cookies.get("session")
+        self._authenticated = True
+        self._auth_generation += 1
+
+    def _is_session_expired(self, response: httpx.Response) -> bool:
+        """Check whether the panel rejected the request because of the session.
+
+        3x-ui answers 401 or redirects unauthenticated requests to the login page.
+        """
+        if response.status_code == 401:
+            return True
+        if response.history:
+            path = response.url.path.rstrip("/")
+            return path in (self._base_path, f"{self._base_path}/login")
+        return False
+
+    def _session_cookie_dropped(self) -> bool:
+        """Whether the panel deleted the session cookie (Set-Cookie with Max-Age=0).
+
+        Does not depend on the panel locale, unlike the `msg` text.
+        """
+        if self._cookie is None:
+            return False
+        cookies = self._get_session().cookies
+        return "3x-ui" not in cookies and "session" not in cookies
+
+    def _is_expired_failure(self, message: str) -> bool:
+        """Whether a `success: false` response means the session has expired."""
+        return self._session_cookie_dropped() or is_session_expired_message(message)
+
+    async def _send(
+        self, method: str, endpoint: str, idempotent: bool = False, **kwargs: Any
+    ) -> httpx.Response:
+        """Send raw request to 3x-ui API using the stored session cookie.
+
+        Every attempt passes the circuit breaker; failed attempts are repeated
+        according to the retry policy (see `RetryPolicy.should_retry`) within
+        its time budget.
+        """
+        if "json" in kwargs:
+            # Тело кодируем своим кодеком, а не stdlib json внутри httpx
+            kwargs["content"] = self._codec.dumps_bytes(kwargs.pop("json"))
+            kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": "application/json"}
+
+        template = template_path(endpoint)
+        started = time.monotonic()
+        retry = 0
+        while True:
+            probe = self._breaker.before_request()
+            try:
+                response = await self._send_once(method, endpoint, template, **kwargs)
+            except httpx.HTTPError as e:
+                self._breaker.record_failure()
+                elapsed = time.monotonic() - started
+                if not self._retry.should_retry(retry, idempotent, error=e, elapsed=elapsed):
+                    raise VPNServerException(f"API request failed: {e}") from e
+                logger.info(f"Retrying {method} {template} after error: {e!r}")
+            except BaseException:
+                if probe:
+                    self._breaker.release_probe()
+                raise
+            else:
+                if self._record_outcome(response):
+                    return response
+                if not self._retry.should_retry(
+                    retry,
+                    idempotent,
+                    status_code=response.status_code,
+                    elapsed=time.monotonic() - started,
+                ):
+                    return response
+                logger.info(f"Retrying {method} {template} after status {response.status_code}")
+
+            RETRIES.inc((self._node, method))
+            await asyncio.sleep(self._retry.delay(retry, time.monotonic() - started))
+            retry += 1
+
+    async def _send_once(
+        self, method: str, endpoint: str, template: str, **kwargs: Any
+    ) -> httpx.Response:
+        """Single attempt of `_send`."""
+        # Cookie сессии хранится в cookie jar клиента после логина
+        session = self._get_session()
+        try:
+            logger.debug(f"API request: {method} {endpoint}")
+            async with self._slot(template):
+                started = time.perf_counter()
+                response = await session.request(method, endpoint, **kwargs)
+            self._observe(method, template, str(response.status_code), started)
+            XUI_RESPONSE_BYTES.inc((self._node, template), len(response.content))
+
+            # Форматирование тела ответа дорого на больших списках - только в debug
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"API response status: {response.status_code}")
+                logger.debug(f"API response headers: {response.headers}")
+                logger.debug(f"API response text: {response.text[:500]}")
+            return response
+        except httpx.HTTPError:
+            self._observe(method, template, "error", started)
+            raise
+
+    def _record_outcome(self, response: httpx.Response) -> bool:
+        """Feed response status to the circuit breaker; True unless it is a 5xx."""
+        if response.status_code >= 500:
+            self._breaker.record_failure()
+            return False
+        self._breaker.record_success()
+        return True
+
+    def _slot(self, template: str) -> AbstractAsyncContextManager[None]:
+        """Concurrency slot for one panel request (no-op without a limiter)."""
+        return self._limiter.slot(template) if self._limiter else nullcontext()
+
+    def _observe(self, method: str, template: str, status: str, started: float) -> None:
+        """Record latency of one panel request."""
+        XUI_REQUEST_DURATION.observe(
+            (self._node, method, template, status), time.perf_counter() - started
+        )
+
     async def _request(
         self,
         method: str,
         endpoint: str,
+        idempotent: bool | None = None,
         **kwargs: Any,
     ) -> dict[str, Any]:
-        """Make authenticated request to 3x-ui API."""
-        session = await self._get_session()
-
-        if self._cookie:
-            kwargs.setdefault("cookies", {})["session"] = self._cookie
-            # Также пробуем 3x-ui cookie
-            kwargs["cookies"]["3x-ui"] = self._cookie
+        """Make authenticated request to 3x-ui API.
+
+        Concurrent identical GETs (same endpoint, no extra arguments) share one
+        upstream call and receive the same parsed result.
+
+        Args:
+            idempotent: Whether the request may be repeated after a timeout or
+                gateway error; defaults to True for GET only
+        """
+        if idempotent is None:
+            idempotent = method.upper() == "GET"
+        if method.upper() == "GET" and not kwargs:
+            return await self._inflight.do(
+                (method.upper(), endpoint),
+                lambda: self._perform_request(method, endpoint, idempotent),
+            )
+        return await self._perform_request(method, endpoint, idempotent, **kwargs)
 
-        try:
-            logger.debug(f"API request: {method} {endpoint}")
-            response = await session.request(method, endpoint, **kwargs)
+    async def _perform_request(
+        self,
+        method: str,
+        endpoint: str,
+        idempotent: bool = False,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        """Send request to 3x-ui API and decode the result.
 
-            logger.debug(f"API response status: {response.status_code}")
-            logger.debug(f"API response headers: {response.headers}")
-            logger.debug(f"API response text: {response.text[:500]}")
+        Logs in lazily and retries the request once after re-login if the
+        panel reports an expired session. A session rejection reported in
+        the response body is replayed for GETs only; other methods fail
+        with AuthenticationException after the re-login.
+        """
+        await self.ensure_authenticated()
 
-            response.raise_for_status()
+        for attempt in range(2):
+            generation = self._auth_generation
+            response = await self._send(method, endpoint, idempotent, **kwargs)
 
-            # Проверяем, что ответ не пустой
-            if not response.text:
-                raise VPNServerException(
-                    f"Empty response from {endpoint}. "
-                    f"Status: {response.status_code}. "
-                    f"Authentication may have failed or endpoint is incorrect."
-                )
+            if self._is_session_expired(response):
+                if attempt:
+                    raise AuthenticationException(
+                        f"Panel session rejected again after re-login: {endpoint}"
+                    )
+                logger.info(f"Panel session expired on {endpoint}, re-authenticating")
+                await self._reauthenticate(generation)
+                continue
 
-            result = response.json()
-            logger.debug(f"API response JSON: {result}")
+            result = self._decode_response(endpoint, response)
 
             if not result.get("success"):
-                raise VPNServerException(result.get("msg", "Unknown error from 3x-ui API"))
+                message = result.get("msg") or "Unknown error from 3x-ui API"
+                if attempt == 0 and self._is_expired_failure(message):
+                    logger.info(f"Panel session rejected on {endpoint}: {message}")
+                    await self._reauthenticate(generation)
+                    # Панель могла частично выполнить запрос - повторяем только GET
+                    if method.upper() == "GET":
+                        continue
+                    raise AuthenticationException(
+                        f"Panel session expired during {method} {endpoint}, "
+                        "request was not repeated"
+                    )
+                raise VPNServerException(message)
 
             return result
 
-        except json.JSONDecodeError as e:
+        raise VPNServerException(f"Request to {endpoint} was not completed")
+
+    def _decode_response(self, endpoint: str, response: httpx.Response) -> dict[str, Any]:
+        """Validate HTTP status and decode JSON body of 3x-ui response."""
+        try:
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise VPNServerException(f"API request failed: {e}") from e
+
+        # Проверяем, что ответ не пустой
+        if not response.content:
+            raise VPNServerException(
+                f"Empty response from {endpoint}. "
+                f"Status: {response.status_code}. "
+                f"Authentication may have failed or endpoint is incorrect."
+            )
+
+        try:
+            result: dict[str, Any] = self._codec.loads(response.content)
+        except ValueError as e:
             raise VPNServerException(
                 f"Invalid JSON response from {endpoint}. Response: {response.text[:200]}"
             ) from e
-        except httpx.HTTPError as e:
-            raise VPNServerException(f"API request failed: {e}") from e
+
+        return result
 
     async def get_inbounds(self) -> list[Inbound]:
         """Get all inbounds."""
@@ -169,6 +492,82 @@ class XUIAdapter(VPNServerPort):
         inbounds_data = result.get("obj", [])
         return [self._parse_inbound(data) for data in inbounds_data]
 
+    async def _open_stream(self, stack: AsyncExitStack, endpoint: str) -> httpx.Response:
+        """Open streamed GET whose body is read within the lifetime of `stack`.
+
+        The concurrency slot and the latency sample cover only the wait for
+        response headers: the panel has produced the body by then, and the
+        consumer may read it slowly.
+        """
+        probe = self._breaker.before_request()
+        try:
+            async with self._slot(endpoint):
+                started = time.perf_counter()
+                response = await stack.enter_async_context(
+                    self._get_session().stream("GET", endpoint)
+                )
+        except httpx.HTTPError:
+            self._breaker.record_failure()
+            raise
+        except BaseException:
+            if probe:
+                self._breaker.release_probe()
+            raise
+        self._observe("GET", endpoint, str(response.status_code), started)
+        self._record_outcome(response)
+        return response
+
+    async def iter_inbounds(self) -> AsyncIterator[Inbound]:
+        """Stream all inbounds, parsing the panel response incrementally.
+
+        Only one inbound is held in memory at a time. Session expiry is
+        handled like in `_perform_request` as long as nothing was yielded yet.
+        """
+        endpoint = "/panel/api/inbounds/list"
+        await self.ensure_authenticated()
+
+        for attempt in range(2):
+            generation = self._auth_generation
+            try:
+                async with AsyncExitStack() as stack:
+                    response = await self._open_stream(stack, endpoint)
+                    if self._is_session_expired(response):
+                        if attempt:
+                            raise AuthenticationException(
+                                f"Panel session rejected again after re-login: {endpoint}"
+                            )
+                        logger.info(f"Panel session expired on {endpoint}, re-authenticating")
+                        await self._reauthenticate(generation)
+                        continue
+                    response.raise_for_status()
+
+                    try:
+                        async for data in iter_json_array(response.aiter_text(), "obj"):
+                            yield self._parse_inbound(data)
+                        return
+                    except JSONArrayNotFoundError as e:
+                        document = e.document
+            except httpx.HTTPError as e:
+                raise VPNServerException(f"API request failed: {e}") from e
+            except JSONStreamError as e:
+                raise VPNServerException(f"Invalid JSON response from {endpoint}: {e}") from e
+
+            # Нет массива obj: ошибка панели или пустой список
+            try:
+                result = self._codec.loads(document)
+            except ValueError as e:
+                raise VPNServerException(
+                    f"Invalid JSON response from {endpoint}. Response: {document[:200]}"
+                ) from e
+            if result.get("success"):
+                return
+            message = result.get("msg") or "Unknown error from 3x-ui API"
+            if attempt == 0 and self._is_expired_failure(message):
+                logger.info(f"Panel session rejected on {endpoint}: {message}")
+                await self._reauthenticate(generation)
+                continue
+            raise VPNServerException(message)
+
     async def get_inbound(self, inbound_id: int) -> Inbound:
         """Get inbound by ID."""
         result = await self._request("GET", f"/panel/api/inbounds/get/{inbound_id}")
@@ -185,10 +584,12 @@ class XUIAdapter(VPNServerPort):
 
         result = await self._request("POST", "/panel/api/inbounds/add", json=data)
 
-        # Get created inbound
-        inbound_id = result.get("obj", {}).get("id")
-        if inbound_id:
-            return await self.get_inbound(inbound_id)
+        # 3x-ui возвращает созданный inbound в obj - повторный запрос не нужен
+        obj = result.get("obj") or {}
+        if "settings" in obj:
+            return self._parse_inbound(obj)
+        if obj.get("id"):
+            return await self.get_inbound(obj["id"])
 
         return inbound
 
@@ -197,8 +598,14 @@ class XUIAdapter(VPNServerPort):
         data = self._serialize_inbound(inbound)
         data["id"] = inbound_id
 
-        await self._request("POST", f"/panel/api/inbounds/update/{inbound_id}", json=data)
+        # Полное состояние по id - повтор безопасен
+        result = await self._request(
+            "POST", f"/panel/api/inbounds/update/{inbound_id}", idempotent=True, json=data
+        )
 
+        obj = result.get("obj") or {}
+        if "settings" in obj:
+            return self._parse_inbound(obj)
         return await self.get_inbound(inbound_id)
 
     async def delete_inbound(self, inbound_id: int) -> bool:
@@ -208,12 +615,23 @@ class XUIAdapter(VPNServerPort):
 
     async def add_client(self, inbound_id: int, client: Client) -> Client:
         """Add client to inbound."""
-        data = {"id": inbound_id, "settings": json.dumps({"clients": [client.model_dump()]})}
+        data = {"id": inbound_id, "settings": self._codec.dumps({"clients": [client.model_dump()]})}
 
         await self._request("POST", "/panel/api/inbounds/addClient", json=data)
 
         return client
 
+    async def add_clients(self, inbound_id: int, clients: list[Client]) -> list[Client]:
+        """Add several clients to inbound with a single addClient call."""
+        data = {
+            "id": inbound_id,
+            "settings": self._codec.dumps({"clients": [client.model_dump() for client in clients]}),
+        }
+
+        await self._request("POST", "/panel/api/inbounds/addClient", json=data)
+
+        return clients
+
     async def get_client(self, inbound_id: int, client_id: str) -> Client:
         """Get client from inbound."""
         # Получаем inbound со всеми клиентами
@@ -229,9 +647,11 @@ class XUIAdapter(VPNServerPort):
 
     async def update_client(self, inbound_id: int, client_id: str, client: Client) -> Client:
         """Update client in inbound."""
-        data = {"id": inbound_id, "settings": json.dumps({"clients": [client.model_dump()]})}
+        data = {"id": inbound_id, "settings": self._codec.dumps({"clients": [client.model_dump()]})}
 
-        await self._request("POST", f"/panel/api/inbounds/updateClient/{client_id}", json=data)
+        await self._request(
+            "POST", f"/panel/api/inbounds/updateClient/{client_id}", idempotent=True, json=data
+        )
 
         return client
 
@@ -270,27 +690,12 @@ class XUIAdapter(VPNServerPort):
         )
 
     def _parse_inbound(self, data: dict[str, Any]) -> Inbound:
-        """Parse inbound data from API response."""
-        settings_raw = json.loads(data.get("settings", "{}"))
-        stream_settings = json.loads(data.get("streamSettings", "{}"))
-        sniffing = json.loads(data.get("sniffing", "{}"))
-
-        # Парсим settings в объект Settings
-        settings = Settings(**settings_raw) if isinstance(settings_raw, dict) else Settings()
-
-        return Inbound(
-            id=data.get("id"),
-            up=data.get("up", 0),
-            down=data.get("down", 0),
-            total=data.get("total", 0),
-            remark=data.get("remark", "reality"),
-            enable=data.get("enable", True),
-            port=data.get("port", 443),
-            protocol=data.get("protocol", "vless"),
-            settings=settings,
-            stream_settings=stream_settings,
-            sniffing=sniffing,
-        )
+        """Parse inbound data from API response.
+
+        Settings with clients, stream settings, sniffing and client stats are
+        decoded lazily on first access.
+        """
+        return LazyInbound.from_panel(data, self._codec)
 
     def _serialize_inbound(self, inbound: Inbound) -> dict[str, Any]:
         """Serialize inbound for API request."""
@@ -299,7 +704,7 @@ class XUIAdapter(VPNServerPort):
             "enable": inbound.enable,
             "port": inbound.port,
             "protocol": inbound.protocol.value,
-            "settings": json.dumps(inbound.settings.model_dump()),
-            "streamSettings": json.dumps(inbound.stream_settings),
-            "sniffing": json.dumps(inbound.sniffing),
+            "settings": inbound.settings.model_dump_json(),
+            "streamSettings": self._codec.dumps(inbound.stream_settings),
+            "sniffing": self._codec.dumps(inbound.sniffing),
         }
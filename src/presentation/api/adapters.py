@@ -1,8 +1,18 @@
 """Adapters for converting between domain entities and API schemas."""
 
-from src.domain.entities import Client, ClientStat, Inbound
-from src.infrastructure.persistence.models import ClientMetadata
-from src.presentation.api.schemas import ClientResponse, InboundResponse
+from collections.abc import Mapping
+from datetime import UTC, datetime
+
+from src.domain.entities import Client, ClientRecord, ClientStat, Inbound
+from src.infrastructure.persistence.models import ClientMetadata, TrafficUsage
+from src.presentation.api.pagination import encode_cursor
+from src.presentation.api.schemas import (
+    ClientResponse,
+    ClientTrafficResponse,
+    InboundResponse,
+    InboundSummaryResponse,
+    TrafficPointResponse,
+)
 
 
 def client_to_response(
@@ -23,6 +33,7 @@ def client_to_response(
 
     return ClientResponse(
         id=client.id,
+        inbound_id=client_stat.inboundId if client_stat else None,
         email=client.email,
         enable=client.enable,
         limit_ip=client.limitIp,
@@ -33,19 +44,64 @@ def client_to_response(
     )
 
 
-def inbound_to_response(inbound: Inbound) -> InboundResponse:
+def record_to_response(
+    record: ClientRecord,
+    metadata: ClientMetadata | None = None,
+) -> ClientResponse:
+    """Convert ClientRecord (client located in its inbound) to ClientResponse schema."""
+    response = client_to_response(record.client, record.stat, metadata)
+    response.inbound_id = record.inbound_id
+    return response
+
+
+def client_page(
+    inbound: Inbound,
+    clients_limit: int | None = None,
+    clients_after: str | None = None,
+) -> tuple[list[Client], bool]:
+    """Clients of an inbound after the `clients_after` email, at most `clients_limit`.
+
+    Returns:
+        The page and whether more clients follow it
+    """
+    page = inbound.settings.clients
+    if clients_after is not None:
+        emails = [client.email for client in page]
+        page = page[emails.index(clients_after) + 1 :] if clients_after in emails else []
+    has_more = clients_limit is not None and len(page) > clients_limit
+    if clients_limit is not None:
+        page = page[:clients_limit]
+    return page, has_more
+
+
+def inbound_to_response(
+    inbound: Inbound,
+    clients_limit: int | None = None,
+    clients_after: str | None = None,
+    metadata: Mapping[str, ClientMetadata] | None = None,
+    settings_clients: bool = True,
+) -> InboundResponse:
     """Convert Inbound entity to InboundResponse schema.
 
     Maps camelCase entity fields to snake_case API fields and converts clients.
-    Enriches client data with statistics from clientStats.
+    Enriches client data with statistics from clientStats and owner_ref from
+    `metadata` (client_id to ClientMetadata, loaded in bulk by the caller).
+
+    Clients can be paged: `clients_after` is the email of the last client of
+    the previous page, at most `clients_limit` clients are returned.
+    `settings` keeps the full client list of the panel unless
+    `settings_clients` is False (callers that page clients opt out of it).
     """
+    page, has_more = client_page(inbound, clients_limit, clients_after)
+    metadata = metadata or {}
+
     # Create a mapping of email to ClientStat for quick lookup
     stats_by_email = {stat.email: stat for stat in inbound.clientStats}
 
     # Convert clients with their stats
     clients = [
-        client_to_response(client, stats_by_email.get(client.email))
-        for client in inbound.settings.clients
+        client_to_response(client, stats_by_email.get(client.email), metadata.get(client.id))
+        for client in page
     ]
 
     return InboundResponse(
@@ -57,8 +113,51 @@ def inbound_to_response(inbound: Inbound) -> InboundResponse:
         enable=inbound.enable,
         port=inbound.port,
         protocol=inbound.protocol,
-        settings=inbound.settings.model_dump(),
+        settings=inbound.settings.model_dump(exclude=None if settings_clients else {"clients"}),
         stream_settings=inbound.stream_settings,
         sniffing=inbound.sniffing,
         clients=clients,
+        clients_next_cursor=encode_cursor([page[-1].email]) if has_more and page else None,
+    )
+
+
+def inbound_to_summary(inbound: Inbound) -> InboundSummaryResponse:
+    """Convert Inbound entity to InboundSummaryResponse schema (no client lists)."""
+    clients = inbound.settings.clients
+    return InboundSummaryResponse(
+        id=inbound.id,
+        up=inbound.up,
+        down=inbound.down,
+        total=inbound.total,
+        remark=inbound.remark,
+        enable=inbound.enable,
+        port=inbound.port,
+        protocol=inbound.protocol,
+        client_count=len(clients),
+        enabled_client_count=sum(client.enable for client in clients),
+    )
+
+
+def client_stat_to_traffic_response(stat: ClientStat) -> ClientTrafficResponse:
+    """Convert ClientStat entity to ClientTrafficResponse schema."""
+    return ClientTrafficResponse(
+        id=stat.uuid,
+        email=stat.email,
+        inbound_id=stat.inboundId,
+        enable=stat.enable,
+        up=stat.up,
+        down=stat.down,
+        total=stat.up + stat.down,
+        all_time=stat.allTime,
+        expire_time=stat.expiryTime,
+    )
+
+
+def traffic_to_response(usage: TrafficUsage) -> TrafficPointResponse:
+    """Convert TrafficUsage row to TrafficPointResponse schema."""
+    return TrafficPointResponse(
+        start=datetime.fromtimestamp(usage.bucket, tz=UTC),
+        up=usage.up,
+        down=usage.down,
+        total=usage.up + usage.down,
     )
@@ -0,0 +1,191 @@
+"""Inbound-agnostic client API endpoints."""
+
+import logging
+from collections.abc import AsyncIterator
+
+from dishka import FromDishka
+from dishka.integrations.fastapi import DishkaRoute
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+
+from src.application.fleet import FleetService
+from src.application.placement import PlacementEngine, PlacementUnavailableException
+from src.application.services import BulkAction, VPNManagementService
+from src.config import Settings
+from src.domain.entities import ClientRecord
+from src.domain.exceptions import (
+    ClientNotFoundException,
+    DomainException,
+)
+from src.infrastructure.persistence import ClientMetadataRepository
+from src.presentation.api.adapters import client_to_response, record_to_response
+from src.presentation.api.clients import client_create_request_to_entity
+from src.presentation.api.etag import is_not_modified, not_modified_response, record_etag
+from src.presentation.api.schemas import (
+    ClientBulkItemResponse,
+    ClientBulkRequest,
+    ClientBulkResponse,
+    ClientPlacementRequest,
+    ClientResponse,
+    PlacedClientResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/clients", tags=["clients"], route_class=DishkaRoute)
+
+# Сколько клиентов обогащаем метаданными одним запросом к БД при экспорте
+EXPORT_METADATA_CHUNK = 500
+
+
+@router.post("", response_model=PlacedClientResponse, status_code=status.HTTP_201_CREATED)
+async def create_client(
+    http_request: Request,
+    request: ClientPlacementRequest,
+    fleet: FromDishka[FleetService],
+    placement: FromDishka[PlacementEngine],
+    metadata_repo: FromDishka[ClientMetadataRepository],
+) -> PlacedClientResponse:
+    """Create client on the least loaded inbound chosen by the placement engine.
+
+    Under /nodes/{node_id} placement is restricted to that node.
+    """
+    node = http_request.path_params.get("node_id") or request.node
+    try:
+        target = placement.choose(node=node, policy=request.policy)
+        client = client_create_request_to_entity(request)
+        await fleet.service_for(target.node).add_client(target.inbound_id, client)
+
+        # Save metadata to database
+        metadata = await metadata_repo.create(
+            client_id=client.id,
+            owner_ref=request.owner_ref,
+        )
+
+        response = record_to_response(
+            ClientRecord(inbound_id=target.inbound_id, client=client), metadata
+        )
+        return PlacedClientResponse(node=target.node, **response.model_dump())
+    except PlacementUnavailableException as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        ) from e
+
+
+@router.get("/{client_id}", response_model=ClientResponse, status_code=status.HTTP_200_OK)
+async def get_client(
+    client_id: str,
+    service: FromDishka[VPNManagementService],
+    metadata_repo: FromDishka[ClientMetadataRepository],
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+) -> ClientResponse | Response:
+    """Get client by ID without knowing its inbound (supports ETag / If-None-Match)."""
+    try:
+        record = await service.find_client(client_id)
+        metadata = await metadata_repo.get_by_client_id(client_id)
+        etag = record_etag(record, metadata)
+        if is_not_modified(if_none_match, etag):
+            return not_modified_response(etag)
+        response.headers["ETag"] = etag
+        return record_to_response(record, metadata)
+    except ClientNotFoundException as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        ) from e
+
+
+@router.post(":bulk", response_model=ClientBulkResponse, status_code=status.HTTP_200_OK)
+async def bulk_mutate_clients(
+    request: ClientBulkRequest,
+    service: FromDishka[VPNManagementService],
+    metadata_repo: FromDishka[ClientMetadataRepository],
+    settings: FromDishka[Settings],
+) -> ClientBulkResponse:
+    """Enable, disable or delete many clients selected by ids or owner_ref.
+
+    Work is grouped by inbound and written with bounded concurrency.
+    """
+    if request.client_ids is not None:
+        client_ids = request.client_ids
+    else:
+        records = await metadata_repo.get_by_owner_ref(request.owner_ref or "")
+        client_ids = [record.client_id for record in records]
+
+    results = await service.bulk_mutate_clients(
+        client_ids, request.action, settings.x_ui_bulk_concurrency
+    )
+
+    if request.action is BulkAction.DELETE:
+        # Also delete metadata from database in one statement
+        await metadata_repo.delete_many([result.client_id for result in results if result.success])
+
+    succeeded = sum(1 for result in results if result.success)
+    return ClientBulkResponse(
+        action=request.action,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=[
+            ClientBulkItemResponse(
+                client_id=result.client_id,
+                inbound_id=result.inbound_id,
+                success=result.success,
+                error=result.error,
+            )
+            for result in results
+        ],
+    )
+
+
+async def _export_lines(
+    service: VPNManagementService, metadata_repo: ClientMetadataRepository
+) -> AsyncIterator[bytes]:
+    """Yield NDJSON lines, one per client, EXPORT_METADATA_CHUNK clients at a time.
+
+    Clients of small inbounds are pooled so that metadata costs one query per
+    chunk of clients, not one per inbound.
+    """
+    pending: list[ClientResponse] = []
+
+    async def flush() -> bytes:
+        metadata = await metadata_repo.get_by_client_ids(r.id for r in pending)
+        for response in pending:
+            if (found := metadata.get(response.id)) is not None:
+                response.owner_ref = found.owner_ref
+        lines = "\n".join(response.model_dump_json() for response in pending) + "\n"
+        pending.clear()
+        return lines.encode()
+
+    try:
+        async for inbound in service.iter_inbounds():
+            stats_by_email = {stat.email: stat for stat in inbound.clientStats}
+            for client in inbound.settings.clients:
+                response = client_to_response(client, stats_by_email.get(client.email))
+                response.inbound_id = inbound.id
+                pending.append(response)
+                if len(pending) >= EXPORT_METADATA_CHUNK:
+                    yield await flush()
+        if pending:
+            yield await flush()
+    except DomainException:
+        # Статус уже отправлен - обрываем поток, клиент увидит неполный экспорт
+        logger.exception("Client export failed")
+        raise
+
+
+@router.get(":export", response_class=StreamingResponse)
+async def export_clients(
+    service: FromDishka[VPNManagementService],
+    metadata_repo: FromDishka[ClientMetadataRepository],
+) -> StreamingResponse:
+    """Export every client with stats and owner_ref as NDJSON.
+
+    Inbounds are parsed from the panel response one by one and metadata is
+    joined in chunks, so memory use does not grow with the number of clients.
+    """
+    await service.ensure_authenticated()
+    return StreamingResponse(
+        _export_lines(service, metadata_repo), media_type="application/x-ndjson"
+    )
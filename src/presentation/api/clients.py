@@ -1,17 +1,23 @@
 """Client management API endpoints."""
 
+import asyncio
 import uuid
 
 from dishka import FromDishka
 from dishka.integrations.fastapi import DishkaRoute
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
 
 from src.application.services import VPNManagementService
-from src.domain.entities import Client, ClientFlow
-from src.domain.exceptions import ClientNotFoundException, DomainException
+from src.config import Settings
+from src.domain.entities import Client, ClientFlow, ClientRecord
+from src.domain.exceptions import ClientNotFoundException
 from src.infrastructure.persistence import ClientMetadataRepository
-from src.presentation.api.adapters import client_to_response
+from src.presentation.api.adapters import record_to_response
+from src.presentation.api.etag import is_not_modified, not_modified_response, record_etag
 from src.presentation.api.schemas import (
+    ClientBatchCreateRequest,
+    ClientBatchItemResponse,
+    ClientBatchResponse,
     ClientCreateRequest,
     ClientResponse,
     ClientUpdateRequest,
@@ -49,32 +55,26 @@ async def get_client(
     client_id: str,
     service: FromDishka[VPNManagementService],
     metadata_repo: FromDishka[ClientMetadataRepository],
-) -> ClientResponse:
-    """Get client from inbound."""
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+) -> ClientResponse | Response:
+    """Get client from inbound (supports ETag / If-None-Match)."""
     try:
-        # Get inbound to access clientStats
-        inbound = await service.get_inbound(inbound_id)
-        client = await service.get_client(inbound_id, client_id)
-
-        # Find client stats
-        client_stat = next(
-            (stat for stat in inbound.clientStats if stat.email == client.email), None
+        # One inbound fetch gives both the client and its stats, metadata is read meanwhile
+        record, metadata = await asyncio.gather(
+            service.get_client_record(inbound_id, client_id),
+            metadata_repo.get_by_client_id(client_id),
         )
-
-        # Get metadata from database
-        metadata = await metadata_repo.get_by_client_id(client_id)
-
-        return client_to_response(client, client_stat, metadata)
+        etag = record_etag(record, metadata)
+        if is_not_modified(if_none_match, etag):
+            return not_modified_response(etag)
+        response.headers["ETag"] = etag
+        return record_to_response(record, metadata)
     except ClientNotFoundException as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         ) from e
-    except DomainException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        ) from e
 
 
 @router.post("", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
@@ -83,33 +83,79 @@ async def add_client(
     request: ClientCreateRequest,
     service: FromDishka[VPNManagementService],
     metadata_repo: FromDishka[ClientMetadataRepository],
+    refresh: bool = Query(
+        default=True,
+        description="Re-read the client from the panel after creation. "
+        "Disable when only the created id is needed.",
+    ),
 ) -> ClientResponse:
     """Add client to inbound."""
-    try:
-        client = client_create_request_to_entity(request)
-        await service.add_client(inbound_id, client)
+    client = client_create_request_to_entity(request)
+    await service.add_client(inbound_id, client)
 
+    if not refresh:
         # Save metadata to database
         metadata = await metadata_repo.create(
             client_id=client.id,
             owner_ref=request.owner_ref,
         )
+        return record_to_response(ClientRecord(inbound_id=inbound_id, client=client), metadata)
 
-        # Get full inbound to get client with stats
-        inbound = await service.get_inbound(inbound_id)
-        client = await service.get_client(inbound_id, client.id)
+    # Save metadata while reading the created client with its stats in one inbound fetch
+    metadata, record = await asyncio.gather(
+        metadata_repo.create(client_id=client.id, owner_ref=request.owner_ref),
+        service.get_client_record(inbound_id, client.id),
+    )
+    return record_to_response(record, metadata)
+
+
+@router.post(":batch", response_model=ClientBatchResponse, status_code=status.HTTP_200_OK)
+async def add_clients_batch(
+    inbound_id: int,
+    request: ClientBatchCreateRequest,
+    service: FromDishka[VPNManagementService],
+    metadata_repo: FromDishka[ClientMetadataRepository],
+    settings: FromDishka[Settings],
+) -> ClientBatchResponse:
+    """Add many clients to inbound using chunked multi-client addClient calls.
+
+    Returns per-item results in request order; metadata of created clients
+    is stored with a single bulk INSERT.
+    """
+    clients = [client_create_request_to_entity(item) for item in request.clients]
+    results = await service.add_clients(inbound_id, clients, settings.x_ui_batch_size)
+
+    await metadata_repo.create_many(
+        [
+            (result.client.id, item.owner_ref)
+            for result, item in zip(results, request.clients)
+            if result.success
+        ]
+    )
 
-        # Find client stats
-        client_stat = next(
-            (stat for stat in inbound.clientStats if stat.email == client.email), None
+    items = []
+    for index, (result, item) in enumerate(zip(results, request.clients)):
+        client_response = None
+        if result.success:
+            client_response = record_to_response(
+                ClientRecord(inbound_id=inbound_id, client=result.client)
+            )
+            client_response.owner_ref = item.owner_ref
+        items.append(
+            ClientBatchItemResponse(
+                index=index,
+                success=result.success,
+                client=client_response,
+                error=result.error,
+            )
         )
 
-        return client_to_response(client, client_stat, metadata)
-    except DomainException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        ) from e
+    succeeded = sum(1 for result in results if result.success)
+    return ClientBatchResponse(
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=items,
+    )
 
 
 @router.put("/{client_id}", response_model=ClientResponse)
@@ -122,24 +168,13 @@ async def update_client(
 ) -> ClientResponse:
     """Update client in inbound."""
     try:
-        # Get existing inbound to find client
-        inbound = await service.get_inbound(inbound_id)
-
-        existing_client = None
-        for client in inbound.settings.clients:
-            if client.id == client_id:
-                existing_client = client
-                break
-
-        if not existing_client:
-            raise ClientNotFoundException(f"Client {client_id} not found")
+        # Existing client and its stats come from a single inbound fetch
+        record = await service.get_client_record(inbound_id, client_id)
 
         # Update only provided fields, mapping snake_case to camelCase
         update_data = request.model_dump(exclude_unset=True)
-
-        # Update owner_ref in database if provided
-        if "owner_ref" in update_data:
-            await metadata_repo.update_owner_ref(client_id, update_data.pop("owner_ref"))
+        owner_ref_update = "owner_ref" in update_data
+        owner_ref = update_data.pop("owner_ref", None)
 
         field_mapping = {
             "limit_ip": "limitIp",
@@ -147,34 +182,29 @@ async def update_client(
             "expire_time": "expireTime",
         }
 
-        for field, value in update_data.items():
-            # Map snake_case to camelCase if needed
-            entity_field = field_mapping.get(field, field)
-            setattr(existing_client, entity_field, value)
-
-        updated_client = await service.update_client(inbound_id, client_id, existing_client)
-
-        # Get updated inbound to get fresh stats
-        updated_inbound = await service.get_inbound(inbound_id)
-        client_stat = next(
-            (stat for stat in updated_inbound.clientStats if stat.email == updated_client.email),
-            None,
+        # Snapshot may be cached, so work on a copy
+        existing_client = record.client.model_copy(
+            update={field_mapping.get(field, field): value for field, value in update_data.items()}
         )
 
-        # Get metadata from database
-        metadata = await metadata_repo.get_by_client_id(client_id)
+        # Update owner_ref in database if provided, otherwise just read metadata
+        metadata_call = (
+            metadata_repo.update_owner_ref(client_id, owner_ref)
+            if owner_ref_update
+            else metadata_repo.get_by_client_id(client_id)
+        )
+        updated_client, metadata = await asyncio.gather(
+            service.update_client(inbound_id, client_id, existing_client),
+            metadata_call,
+        )
 
-        return client_to_response(updated_client, client_stat, metadata)
+        # Traffic stats are not affected by the update, reuse the ones already fetched
+        return record_to_response(record.model_copy(update={"client": updated_client}), metadata)
     except ClientNotFoundException as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         ) from e
-    except DomainException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        ) from e
 
 
 @router.delete("/{client_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -194,8 +224,3 @@ async def delete_client(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         ) from e
-    except DomainException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        ) from e
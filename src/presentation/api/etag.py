@@ -0,0 +1,48 @@
+"""Entity tags for conditional GET requests."""
+
+import hashlib
+from collections.abc import Mapping
+from typing import Any
+
+from fastapi import Response, status
+
+from src.domain.entities import ClientRecord
+from src.infrastructure.persistence import ClientMetadata
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over representation inputs (versions, query parameters)."""
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def record_etag(record: ClientRecord, metadata: ClientMetadata | None) -> str:
+    """ETag of a client response: client, its stats and metadata."""
+    if metadata is None:
+        return make_etag(record.model_dump_json())
+    return make_etag(
+        record.model_dump_json(), metadata.owner_ref, metadata.created_at, metadata.updated_at
+    )
+
+
+def metadata_version(metadata: Mapping[str, ClientMetadata]) -> str:
+    """ETag part covering owner_ref of the clients in a response."""
+    return make_etag(
+        *sorted(f"{m.client_id}:{m.owner_ref}:{m.updated_at}" for m in metadata.values())
+    )
+
+
+def is_not_modified(if_none_match: str | None, etag: str) -> bool:
+    """Whether If-None-Match matches the current ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified_response(etag: str, headers: dict[str, str] | None = None) -> Response:
+    """Empty 304 response carrying the ETag."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers={**(headers or {}), "ETag": etag}
+    )
@@ -0,0 +1,91 @@
+"""Fleet-wide API endpoints spanning all VPN nodes."""
+
+from dishka import FromDishka
+from dishka.integrations.fastapi import DishkaRoute
+from fastapi import APIRouter
+
+from src.application.fleet import FleetService
+from src.infrastructure.persistence import ClientMetadataRepository
+from src.presentation.api.adapters import inbound_to_response
+from src.presentation.api.schemas import (
+    InboundTrafficResponse,
+    NodeInboundsResponse,
+    NodeServerStatsResponse,
+    NodeTrafficResponse,
+    ServerStatsResponse,
+)
+
+router = APIRouter(prefix="/fleet", tags=["fleet"], route_class=DishkaRoute)
+
+
+@router.get("/nodes", response_model=list[str])
+async def list_nodes(
+    fleet: FromDishka[FleetService],
+) -> list[str]:
+    """List names of all configured nodes."""
+    return fleet.node_names
+
+
+@router.get("/inbounds", response_model=list[NodeInboundsResponse])
+async def list_inbounds(
+    fleet: FromDishka[FleetService],
+    metadata_repo: FromDishka[ClientMetadataRepository],
+) -> list[NodeInboundsResponse]:
+    """List inbounds of every node; unavailable nodes are reported, not fatal."""
+    results = await fleet.list_inbounds()
+    metadata = await metadata_repo.get_by_client_ids(
+        client.id
+        for result in results
+        for inbound in result.value or []
+        for client in inbound.settings.clients
+    )
+    return [
+        NodeInboundsResponse(
+            node=result.node,
+            ok=result.ok,
+            error=result.error,
+            inbounds=[
+                inbound_to_response(inbound, metadata=metadata) for inbound in result.value or []
+            ],
+        )
+        for result in results
+    ]
+
+
+@router.get("/stats/traffic", response_model=list[NodeTrafficResponse])
+async def get_traffic_stats(
+    fleet: FromDishka[FleetService],
+) -> list[NodeTrafficResponse]:
+    """Get traffic statistics of every node."""
+    return [
+        NodeTrafficResponse(
+            node=result.node,
+            ok=result.ok,
+            error=result.error,
+            traffic=[
+                InboundTrafficResponse.model_validate(traffic.model_dump())
+                for traffic in result.value or []
+            ],
+        )
+        for result in await fleet.get_traffic_stats()
+    ]
+
+
+@router.get("/stats/server", response_model=list[NodeServerStatsResponse])
+async def get_server_stats(
+    fleet: FromDishka[FleetService],
+) -> list[NodeServerStatsResponse]:
+    """Get server statistics of every node."""
+    return [
+        NodeServerStatsResponse(
+            node=result.node,
+            ok=result.ok,
+            error=result.error,
+            stats=(
+                ServerStatsResponse.model_validate(result.value.model_dump())
+                if result.value is not None
+                else None
+            ),
+        )
+        for result in await fleet.get_server_stats()
+    ]
@@ -1,56 +1,225 @@
 """Inbound management API endpoints."""
 
+from typing import Any, Literal
+
 from dishka import FromDishka
 from dishka.integrations.fastapi import DishkaRoute
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from pydantic import BaseModel
 
 from src.application.services import VPNManagementService
 from src.domain.entities import Inbound, Settings
-from src.domain.exceptions import DomainException, InboundNotFoundException
-from src.presentation.api.adapters import inbound_to_response
+from src.domain.exceptions import InboundNotFoundException
+from src.infrastructure.persistence import ClientMetadata, ClientMetadataRepository
+from src.presentation.api.adapters import client_page, inbound_to_response, inbound_to_summary
+from src.presentation.api.etag import (
+    is_not_modified,
+    make_etag,
+    metadata_version,
+    not_modified_response,
+)
+from src.presentation.api.pagination import decode_cursor, encode_cursor
 from src.presentation.api.schemas import (
     InboundCreateRequest,
     InboundResponse,
+    InboundSummaryResponse,
     InboundUpdateRequest,
 )
+from src.presentation.responses import CodecJSONResponse
 
 router = APIRouter(prefix="/inbounds", tags=["inbounds"], route_class=DishkaRoute)
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_FIELDS_DESCRIPTION = "Comma-separated response fields to return, e.g. id,remark,port"
+
+
+def _parse_fields(fields: str | None, model: type[BaseModel]) -> set[str] | None:
+    """Parse `fields=` projection, rejecting unknown field names."""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - model.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    return requested
+
+
+def _cursor_value(cursor: str | None, kind: type) -> Any:
+    """Decode single-value cursor."""
+    if cursor is None:
+        return None
+    position = decode_cursor(cursor)
+    if len(position) != 1 or not isinstance(position[0], kind):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return position[0]
+
+
+async def _page_metadata(
+    repository: ClientMetadataRepository,
+    inbounds: list[Inbound],
+    clients_limit: int | None,
+    clients_after: str | None = None,
+) -> dict[str, ClientMetadata]:
+    """Metadata of the clients on the returned pages of inbounds, in bulk."""
+    return await repository.get_by_client_ids(
+        client.id
+        for inbound in inbounds
+        for client in client_page(inbound, clients_limit, clients_after)[0]
+    )
+
 
-@router.get("", response_model=list[InboundResponse])
+def _project(
+    payload: BaseModel | list[InboundResponse] | list[InboundSummaryResponse],
+    include: set[str],
+    headers: dict[str, str],
+) -> CodecJSONResponse:
+    """Serialize only requested fields."""
+    if isinstance(payload, list):
+        return CodecJSONResponse(
+            content=[item.model_dump(mode="json", include=include) for item in payload],
+            headers=headers,
+        )
+    return CodecJSONResponse(
+        content=payload.model_dump(mode="json", include=include), headers=headers
+    )
+
+
+@router.get("", response_model=list[InboundResponse | InboundSummaryResponse])
 async def list_inbounds(
+    response: Response,
     service: FromDishka[VPNManagementService],
-) -> list[InboundResponse]:
-    """List all inbounds."""
-    try:
-        inbounds = await service.list_inbounds()
-        return [inbound_to_response(inbound) for inbound in inbounds]
-    except DomainException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        ) from e
+    metadata_repo: FromDishka[ClientMetadataRepository],
+    view: Literal["full", "summary"] = Query(
+        default="full",
+        description="summary returns client counts instead of client lists and settings",
+    ),
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = Query(default=None, description=f"{NEXT_CURSOR_HEADER} of previous page"),
+    clients_limit: int | None = Query(
+        default=None,
+        ge=0,
+        description="Max clients returned per inbound (full view); "
+        "settings.clients is left out when set",
+    ),
+    fields: str | None = Query(default=None, description=_FIELDS_DESCRIPTION),
+    if_none_match: str | None = Header(default=None),
+) -> list[InboundResponse] | list[InboundSummaryResponse] | Response:
+    """List inbounds ordered by id.
+
+    With `limit` the cursor of the next page is returned in the X-Next-Cursor
+    header. Use `view=summary` or `fields=` when client lists are not needed.
+    owner_ref of the returned clients is loaded with one query per 500 clients.
+    The ETag covers inbound snapshot versions, owner_refs and the query; a
+    matching If-None-Match gets 304 without building the response.
+    """
+    include = _parse_fields(
+        fields, InboundSummaryResponse if view == "summary" else InboundResponse
+    )
+    after = _cursor_value(cursor, int)
+    inbounds = sorted(
+        (i for i in await service.list_inbounds() if i.id is not None),
+        key=lambda i: i.id or 0,
+    )
+
+    if after is not None:
+        inbounds = [i for i in inbounds if (i.id or 0) > after]
+    headers: dict[str, str] = {}
+    if limit is not None and len(inbounds) > limit:
+        inbounds = inbounds[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor([inbounds[-1].id])
+
+    page_limit = clients_limit
+    if include is not None and not include & {"clients", "clients_next_cursor"}:
+        page_limit = 0  # клиенты не запрошены - не конвертируем их
+    metadata: dict[str, ClientMetadata] = {}
+    if view == "full" and page_limit != 0:
+        metadata = await _page_metadata(metadata_repo, inbounds, page_limit)
+
+    etag = make_etag(
+        view,
+        clients_limit,
+        fields,
+        headers.get(NEXT_CURSOR_HEADER),
+        metadata_version(metadata),
+        *(inbound.content_version() for inbound in inbounds),
+    )
+    if is_not_modified(if_none_match, etag):
+        return not_modified_response(etag, headers)
+    headers["ETag"] = etag
+
+    items: list[InboundResponse] | list[InboundSummaryResponse]
+    if view == "summary":
+        items = [inbound_to_summary(inbound) for inbound in inbounds]
+    else:
+        items = [
+            inbound_to_response(
+                inbound, page_limit, metadata=metadata, settings_clients=clients_limit is None
+            )
+            for inbound in inbounds
+        ]
+
+    if include is not None:
+        return _project(items, include, headers)
+    response.headers.update(headers)
+    return items
 
 
 @router.get("/{inbound_id}", response_model=InboundResponse)
 async def get_inbound(
     inbound_id: int,
+    response: Response,
     service: FromDishka[VPNManagementService],
-) -> InboundResponse:
-    """Get inbound by ID."""
+    metadata_repo: FromDishka[ClientMetadataRepository],
+    clients_limit: int | None = Query(
+        default=None,
+        ge=0,
+        description="Max clients returned; settings.clients is left out when set",
+    ),
+    clients_cursor: str | None = Query(
+        default=None, description="clients_next_cursor of the previous page"
+    ),
+    fields: str | None = Query(default=None, description=_FIELDS_DESCRIPTION),
+    if_none_match: str | None = Header(default=None),
+) -> InboundResponse | Response:
+    """Get inbound by ID, optionally with a page of its clients.
+
+    Supports ETag / If-None-Match like the listing.
+    """
+    include = _parse_fields(fields, InboundResponse)
+    clients_after = _cursor_value(clients_cursor, str)
     try:
         inbound = await service.get_inbound(inbound_id)
-        return inbound_to_response(inbound)
+        page_limit = clients_limit
+        if include is not None and not include & {"clients", "clients_next_cursor"}:
+            page_limit = 0
+        metadata: dict[str, ClientMetadata] = {}
+        if page_limit != 0:
+            metadata = await _page_metadata(metadata_repo, [inbound], page_limit, clients_after)
+
+        etag = make_etag(
+            clients_limit,
+            clients_cursor,
+            fields,
+            metadata_version(metadata),
+            inbound.content_version(),
+        )
+        if is_not_modified(if_none_match, etag):
+            return not_modified_response(etag)
+        response.headers["ETag"] = etag
+
+        result = inbound_to_response(
+            inbound, page_limit, clients_after, metadata, settings_clients=clients_limit is None
+        )
+        return _project(result, include, {"ETag": etag}) if include is not None else result
     except InboundNotFoundException as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         ) from e
-    except DomainException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        ) from e
 
 
 @router.post("", response_model=InboundResponse, status_code=status.HTTP_201_CREATED)
@@ -59,23 +228,17 @@ async def create_inbound(
     service: FromDishka[VPNManagementService],
 ) -> InboundResponse:
     """Create new inbound."""
-    try:
-        inbound = Inbound(
-            remark=request.remark,
-            enable=request.enable,
-            port=request.port,
-            protocol=request.protocol,
-            settings=Settings(**request.settings),
-            stream_settings=request.stream_settings,
-            sniffing=request.sniffing,
-        )
-        created = await service.create_inbound(inbound)
-        return inbound_to_response(created)
-    except DomainException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        ) from e
+    inbound = Inbound(
+        remark=request.remark,
+        enable=request.enable,
+        port=request.port,
+        protocol=request.protocol,
+        settings=Settings(**request.settings),
+        stream_settings=request.stream_settings,
+        sniffing=request.sniffing,
+    )
+    created = await service.create_inbound(inbound)
+    return inbound_to_response(created)
 
 
 @router.put("/{inbound_id}", response_model=InboundResponse)
@@ -83,32 +246,30 @@ async def update_inbound(
     inbound_id: int,
     request: InboundUpdateRequest,
     service: FromDishka[VPNManagementService],
+    metadata_repo: FromDishka[ClientMetadataRepository],
 ) -> InboundResponse:
     """Update existing inbound."""
     try:
         # Get existing inbound
         existing = await service.get_inbound(inbound_id)
 
-        # Update only provided fields
+        # Update only provided fields (snapshot may be cached, so work on a copy)
         update_data = request.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            # Convert settings dict to Settings object if needed
-            if field == "settings" and isinstance(value, dict):
-                value = Settings(**value)
-            setattr(existing, field, value)
+        if isinstance(update_data.get("settings"), dict):
+            # Ответы отдают клиентов отдельно от settings: без ключа clients они сохраняются
+            update_data["settings"] = Settings(
+                **{"clients": existing.settings.clients, **update_data["settings"]}
+            )
+        existing = existing.model_copy(update=update_data)
 
         updated = await service.update_inbound(inbound_id, existing)
-        return inbound_to_response(updated)
+        metadata = await _page_metadata(metadata_repo, [updated], None)
+        return inbound_to_response(updated, metadata=metadata)
     except InboundNotFoundException as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         ) from e
-    except DomainException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        ) from e
 
 
 @router.delete("/{inbound_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -124,8 +285,3 @@ async def delete_inbound(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e),
         ) from e
-    except DomainException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        ) from e
@@ -0,0 +1,55 @@
+"""Owner-centric API endpoints for billing."""
+
+from dishka import FromDishka
+from dishka.integrations.fastapi import DishkaRoute
+from fastapi import APIRouter
+
+from src.application.fleet import FleetService
+from src.infrastructure.persistence import ClientMetadataRepository
+from src.presentation.api.adapters import record_to_response
+from src.presentation.api.schemas import (
+    NodeStatusResponse,
+    OwnerClientResponse,
+    OwnerClientsResponse,
+)
+
+router = APIRouter(prefix="/owners", tags=["owners"], route_class=DishkaRoute)
+
+
+@router.get("/{owner_ref}/clients", response_model=OwnerClientsResponse)
+async def get_owner_clients(
+    owner_ref: str,
+    fleet: FromDishka[FleetService],
+    metadata_repo: FromDishka[ClientMetadataRepository],
+) -> OwnerClientsResponse:
+    """Get every client of an owner_ref on all nodes with traffic and totals.
+
+    Client ids come from the metadata database and are located through the
+    client index of each node; an inbound holding several of the owner's
+    clients is fetched once. Unavailable nodes are reported in `nodes`, and
+    clients that were not found are listed in `missing` only when every node
+    answered.
+    """
+    metadata = {m.client_id: m for m in await metadata_repo.get_by_owner_ref(owner_ref)}
+    results = await fleet.find_clients(list(metadata)) if metadata else []
+
+    clients = []
+    for result in results:
+        for client_id, record in (result.value or {}).items():
+            response = record_to_response(record, metadata[client_id])
+            clients.append(OwnerClientResponse(**response.model_dump(), node=result.node))
+    clients.sort(key=lambda client: (client.node, client.inbound_id or 0, client.email))
+
+    found = {client.id for client in clients}
+    complete = all(result.ok for result in results)
+    return OwnerClientsResponse(
+        owner_ref=owner_ref,
+        clients=clients,
+        total_gb=sum(client.total_gb for client in clients),
+        all_time_gb=sum(client.all_time_gb for client in clients),
+        missing=sorted(metadata.keys() - found) if complete else [],
+        nodes=[
+            NodeStatusResponse(node=result.node, ok=result.ok, error=result.error)
+            for result in results
+        ],
+    )
@@ -1,9 +1,11 @@
 """API request/response schemas."""
 
-from typing import Any
+from datetime import datetime
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
+from src.application.services import BulkAction
 from src.domain.entities import InboundProtocol
 
 
@@ -16,6 +18,19 @@ class ClientCreateRequest(BaseModel):
     owner_ref: str | None = None  # user_id из биллинга для отладки и логгирования
 
 
+class ClientPlacementRequest(ClientCreateRequest):
+    """Request schema for creating a client on an automatically chosen inbound."""
+
+    node: str | None = None  # ограничить размещение одним узлом
+    policy: Literal["least_clients", "least_traffic", "weighted"] | None = None
+
+
+class ClientBatchCreateRequest(BaseModel):
+    """Request schema for creating many clients in one inbound."""
+
+    clients: list[ClientCreateRequest] = Field(min_length=1, max_length=5000)
+
+
 class ClientUpdateRequest(BaseModel):
     """Request schema for updating a client."""
 
@@ -32,6 +47,7 @@ class ClientResponse(BaseModel):
     """Response schema for client."""
 
     id: str
+    inbound_id: int | None = None
     email: str
     enable: bool
     limit_ip: int
@@ -41,6 +57,65 @@ class ClientResponse(BaseModel):
     owner_ref: str | None = None  # user_id из биллинга для отладки и логгирования
 
 
+class PlacedClientResponse(ClientResponse):
+    """Response schema for a client created by placement."""
+
+    node: str
+
+
+class ClientBatchItemResponse(BaseModel):
+    """Result of one item of a batch request."""
+
+    index: int
+    success: bool
+    client: ClientResponse | None = None
+    error: str | None = None
+
+
+class ClientBatchResponse(BaseModel):
+    """Response schema for batch client operations."""
+
+    succeeded: int
+    failed: int
+    results: list[ClientBatchItemResponse]
+
+
+class ClientBulkRequest(BaseModel):
+    """Request schema for bulk client mutations.
+
+    Clients are selected either by explicit ids or by owner_ref.
+    """
+
+    action: BulkAction
+    client_ids: list[str] | None = Field(default=None, min_length=1, max_length=10000)
+    owner_ref: str | None = None
+
+    @model_validator(mode="after")
+    def check_selector(self) -> "ClientBulkRequest":
+        """Require exactly one client selector."""
+        if (self.client_ids is None) == (self.owner_ref is None):
+            raise ValueError("Specify either client_ids or owner_ref")
+        return self
+
+
+class ClientBulkItemResponse(BaseModel):
+    """Result of a bulk mutation for one client."""
+
+    client_id: str
+    inbound_id: int | None
+    success: bool
+    error: str | None = None
+
+
+class ClientBulkResponse(BaseModel):
+    """Response schema for bulk client mutations."""
+
+    action: BulkAction
+    succeeded: int
+    failed: int
+    results: list[ClientBulkItemResponse]
+
+
 class InboundCreateRequest(BaseModel):
     """Request schema for creating an inbound."""
 
@@ -75,10 +150,29 @@ class InboundResponse(BaseModel):
     enable: bool
     port: int
     protocol: InboundProtocol
-    settings: dict[str, Any]
+    settings: dict[str, Any] = Field(
+        description="Panel settings including the full settings.clients list; "
+        "settings.clients is omitted when clients are paged with clients_limit"
+    )
     stream_settings: dict[str, Any]
     sniffing: dict[str, Any]
     clients: list[ClientResponse]
+    clients_next_cursor: str | None = None  # есть ещё клиенты, см. clients_cursor
+
+
+class InboundSummaryResponse(BaseModel):
+    """Response schema for inbound without client lists."""
+
+    id: int | None
+    up: int
+    down: int
+    total: int
+    remark: str
+    enable: bool
+    port: int
+    protocol: InboundProtocol
+    client_count: int
+    enabled_client_count: int
 
 
 class InboundTrafficResponse(BaseModel):
@@ -90,6 +184,45 @@ class InboundTrafficResponse(BaseModel):
     total: int
 
 
+class ClientTrafficResponse(BaseModel):
+    """Traffic counters of one client."""
+
+    id: str
+    email: str
+    inbound_id: int
+    enable: bool
+    up: int
+    down: int
+    total: int  # up + down
+    all_time: int
+    expire_time: int
+
+
+class ClientTrafficPageResponse(BaseModel):
+    """Page of the client traffic ranking."""
+
+    items: list[ClientTrafficResponse]
+    next_cursor: str | None = None
+
+
+class TrafficPointResponse(BaseModel):
+    """Traffic transferred during one time bucket."""
+
+    start: datetime
+    up: int
+    down: int
+    total: int
+
+
+class TrafficHistoryResponse(BaseModel):
+    """Response schema for traffic history of an inbound or client."""
+
+    node: str
+    key: str
+    granularity: Literal["hour", "day"]
+    points: list[TrafficPointResponse]
+
+
 class ServerStatsResponse(BaseModel):
     """Response schema for server statistics."""
 
@@ -105,3 +238,48 @@ class ErrorResponse(BaseModel):
     """Error response schema."""
 
     detail: str
+
+
+class NodeStatusResponse(BaseModel):
+    """Outcome of a fleet-wide read on one node."""
+
+    node: str
+    ok: bool
+    error: str | None = None
+
+
+class NodeInboundsResponse(NodeStatusResponse):
+    """Inbounds of one node."""
+
+    inbounds: list[InboundResponse] = Field(default_factory=list)
+
+
+class NodeTrafficResponse(NodeStatusResponse):
+    """Traffic statistics of one node."""
+
+    traffic: list[InboundTrafficResponse] = Field(default_factory=list)
+
+
+class NodeServerStatsResponse(NodeStatusResponse):
+    """Server statistics of one node."""
+
+    stats: ServerStatsResponse | None = None
+
+
+class OwnerClientResponse(ClientResponse):
+    """Client of an owner together with the node it lives on."""
+
+    node: str
+
+
+class OwnerClientsResponse(BaseModel):
+    """All clients of one owner_ref across the fleet with usage totals."""
+
+    owner_ref: str
+    clients: list[OwnerClientResponse]
+    total_gb: int  # сумма total_gb клиентов
+    all_time_gb: int
+    missing: list[str] = Field(
+        default_factory=list, description="Client ids with metadata not found on any node"
+    )
+    nodes: list[NodeStatusResponse] = Field(default_factory=list)
@@ -1,13 +1,36 @@
 """Statistics API endpoints."""
 
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from typing import Any, Literal
+
 from dishka import FromDishka
 from dishka.integrations.fastapi import DishkaRoute
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 
-from src.application.services import VPNManagementService
+from src.application.services import ClientTrafficSort, VPNManagementService
+from src.config import Settings
 from src.domain.entities import InboundTraffic, ServerStats
-from src.domain.exceptions import DomainException
-from src.presentation.api.schemas import InboundTrafficResponse, ServerStatsResponse
+from src.infrastructure.codec import get_codec
+from src.infrastructure.fleet import NodeRegistry
+from src.infrastructure.live_stats import LiveStatsHub
+from src.infrastructure.persistence import (
+    ClientMetadataCache,
+    ClientMetadataRepository,
+    TrafficGranularity,
+    TrafficRepository,
+    TrafficScope,
+)
+from src.presentation.api.adapters import client_stat_to_traffic_response, traffic_to_response
+from src.presentation.api.pagination import decode_cursor, encode_cursor
+from src.presentation.api.schemas import (
+    ClientTrafficPageResponse,
+    InboundTrafficResponse,
+    ServerStatsResponse,
+    TrafficHistoryResponse,
+)
 
 router = APIRouter(prefix="/stats", tags=["statistics"], route_class=DishkaRoute)
 
@@ -17,13 +40,51 @@ async def get_traffic_stats(
     service: FromDishka[VPNManagementService],
 ) -> list[InboundTraffic]:
     """Get traffic statistics for all inbounds."""
-    try:
-        return await service.get_traffic_stats()
-    except DomainException as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        ) from e
+    return await service.get_traffic_stats()
+
+
+@router.get("/clients", response_model=ClientTrafficPageResponse)
+async def get_client_traffic_stats(
+    service: FromDishka[VPNManagementService],
+    metadata_repo: FromDishka[ClientMetadataRepository],
+    sort: ClientTrafficSort = Query(default=ClientTrafficSort.TOTAL),
+    order: Literal["asc", "desc"] = Query(default="desc"),
+    limit: int = Query(default=50, ge=1, le=1000),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    enable: bool | None = Query(default=None),
+    expired: bool | None = Query(default=None),
+    owner_ref: str | None = Query(default=None),
+) -> ClientTrafficPageResponse:
+    """Get per-client traffic of all inbounds, ranked by a counter.
+
+    Built from inbound snapshots (cached when caching is on), so it is cheap
+    to poll.
+    """
+    after = None
+    if cursor is not None:
+        position = decode_cursor(cursor)
+        if len(position) != 2 or not isinstance(position[0], int):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        after = (position[0], str(position[1]))
+
+    client_ids = None
+    if owner_ref is not None:
+        client_ids = {m.client_id for m in await metadata_repo.get_by_owner_ref(owner_ref)}
+
+    page = await service.rank_client_traffic(
+        sort,
+        limit,
+        descending=order == "desc",
+        after=after,
+        enable=enable,
+        expired=expired,
+        client_ids=client_ids,
+    )
+
+    return ClientTrafficPageResponse(
+        items=[client_stat_to_traffic_response(stat) for stat in page.items],
+        next_cursor=encode_cursor(list(page.last)) if page.last else None,
+    )
 
 
 @router.get("/server", response_model=ServerStatsResponse)
@@ -31,10 +92,151 @@ async def get_server_stats(
     service: FromDishka[VPNManagementService],
 ) -> ServerStats:
     """Get server statistics."""
-    try:
-        return await service.get_server_stats()
-    except DomainException as e:
+    return await service.get_server_stats()
+
+
+_SSE_KEEPALIVE = 15.0
+
+
+async def _sse_events(
+    request: Request, hub: LiveStatsHub, node: str, settings: Settings
+) -> AsyncIterator[bytes]:
+    """Encode events of a node subscription as Server-Sent Events."""
+    codec = get_codec(settings.json_codec)
+    async with hub.subscribe(node) as subscription:
+        yield f"retry: {int(settings.live_stats_interval * 1000)}\n\n".encode()
+        while not await request.is_disconnected():
+            try:
+                async with asyncio.timeout(_SSE_KEEPALIVE):
+                    event = await subscription.get()
+            except TimeoutError:
+                # Комментарий держит соединение открытым через прокси
+                yield b": keepalive\n\n"
+                continue
+            data = codec.dumps_bytes(event.data)
+            yield b"event: %s\ndata: %s\n\n" % (event.name.encode(), data)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_stats(
+    request: Request,
+    hub: FromDishka[LiveStatsHub],
+    nodes: FromDishka[NodeRegistry],
+    settings: FromDishka[Settings],
+) -> StreamingResponse:
+    """Stream server stats and traffic deltas as Server-Sent Events.
+
+    Events: `server` (ServerStats), `traffic` (inbound counters with
+    `up_delta`/`down_delta` since the previous poll) and `error`. The node
+    is polled by one shared background task however many clients listen;
+    a client that reads too slowly skips the oldest events.
+    """
+    node = request.path_params.get("node_id", settings.x_ui_default_node)
+    nodes[node]  # 404 для неизвестного узла до начала потока
+    return StreamingResponse(
+        _sse_events(request, hub, node, settings),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/upstream", response_model=dict[str, Any])
+async def get_upstream_stats(
+    service: FromDishka[VPNManagementService],
+    metadata_cache: FromDishka[ClientMetadataCache],
+) -> dict[str, Any]:
+    """Get runtime counters of the 3x-ui adapter (cache hits/misses, ...).
+
+    `metadata_cache` reports the client metadata cache shared by all nodes.
+    """
+    return {**service.get_runtime_stats(), "metadata_cache": metadata_cache.as_dict()}
+
+
+_GRANULARITIES = {"hour": TrafficGranularity.HOUR, "day": TrafficGranularity.DAY}
+
+
+async def _traffic_history(
+    request: Request,
+    settings: Settings,
+    repository: TrafficRepository,
+    scope: TrafficScope,
+    key: str,
+    granularity: Literal["hour", "day"],
+    start: datetime | None,
+    end: datetime | None,
+) -> TrafficHistoryResponse:
+    """Read collected traffic buckets of the node addressed by the route."""
+    node = request.path_params.get("node_id", settings.x_ui_default_node)
+    end = end or datetime.now(UTC)
+    start = start or end - timedelta(days=1 if granularity == "hour" else 30)
+    if start >= end:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        ) from e
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be earlier than end",
+        )
+
+    rows = await repository.get_series(
+        node,
+        scope,
+        key,
+        _GRANULARITIES[granularity],
+        int(start.timestamp()),
+        int(end.timestamp()),
+    )
+    return TrafficHistoryResponse(
+        node=node,
+        key=key,
+        granularity=granularity,
+        points=[traffic_to_response(row) for row in rows],
+    )
+
+
+@router.get("/traffic/inbounds/{inbound_id}/history", response_model=TrafficHistoryResponse)
+async def get_inbound_traffic_history(
+    inbound_id: int,
+    request: Request,
+    settings: FromDishka[Settings],
+    repository: FromDishka[TrafficRepository],
+    granularity: Literal["hour", "day"] = Query(default="hour"),
+    start: datetime | None = Query(
+        default=None, description="Range start, defaults to 1 (hour) or 30 (day) days before end"
+    ),
+    end: datetime | None = Query(default=None, description="Range end, defaults to now"),
+) -> TrafficHistoryResponse:
+    """Get collected traffic of an inbound per hour or day.
+
+    Served from the traffic history in the database, not from the panel;
+    the current hour appears once it is complete.
+    """
+    return await _traffic_history(
+        request,
+        settings,
+        repository,
+        TrafficScope.INBOUND,
+        str(inbound_id),
+        granularity,
+        start,
+        end,
+    )
+
+
+@router.get("/traffic/clients/{client_id}/history", response_model=TrafficHistoryResponse)
+async def get_client_traffic_history(
+    client_id: str,
+    request: Request,
+    settings: FromDishka[Settings],
+    repository: FromDishka[TrafficRepository],
+    granularity: Literal["hour", "day"] = Query(default="hour"),
+    start: datetime | None = Query(
+        default=None, description="Range start, defaults to 1 (hour) or 30 (day) days before end"
+    ),
+    end: datetime | None = Query(default=None, description="Range end, defaults to now"),
+) -> TrafficHistoryResponse:
+    """Get collected traffic of a client per hour or day.
+
+    Served from the traffic history in the database, not from the panel;
+    the current hour appears once it is complete.
+    """
+    return await _traffic_history(
+        request, settings, repository, TrafficScope.CLIENT, client_id, granularity, start, end
+    )
@@ -4,17 +4,27 @@ import logging
 import traceback
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from typing import Any
 
 from dishka import make_async_container
-from dishka.integrations.fastapi import setup_dishka
+from dishka.integrations.fastapi import FastapiProvider, setup_dishka
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.security import APIKeyHeader
 
+from src.application.placement import PlacementEngine
 from src.config import settings
+from src.domain.exceptions import (
+    DomainException,
+    NodeNotFoundException,
+    NodeUnavailableException,
+)
 from src.infrastructure.di import ApplicationProvider, InfrastructureProvider
-from src.presentation.api import clients, inbounds, stats
-from src.presentation.middleware import api_key_middleware
+from src.infrastructure.fleet import NodeRegistry
+from src.infrastructure.metrics import registry
+from src.infrastructure.traffic_collector import TrafficCollector
+from src.presentation.api import client_directory, clients, fleet, inbounds, owners, stats
+from src.presentation.middleware import MetricsMiddleware, api_key_middleware
 
 # Настройка логирования
 logging.basicConfig(
@@ -27,11 +37,51 @@ logger = logging.getLogger(__name__)
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
+def add_domain_exception_handlers(app: FastAPI) -> None:
+    """Map domain exceptions escaping the routes to HTTP responses.
+
+    Routes handle only errors with a route-specific status (unknown inbound
+    or client); handlers are matched by exception class, the most specific
+    one wins.
+    """
+
+    @app.exception_handler(NodeNotFoundException)
+    async def node_not_found_handler(request: Request, exc: NodeNotFoundException) -> JSONResponse:
+        """Unknown node in /nodes/{node_id} routes."""
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"detail": exc.message},
+        )
+
+    @app.exception_handler(NodeUnavailableException)
+    async def node_unavailable_handler(
+        request: Request, exc: NodeUnavailableException
+    ) -> JSONResponse:
+        """Node circuit is open or its request queue timed out."""
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": exc.message},
+        )
+
+    @app.exception_handler(DomainException)
+    async def domain_exception_handler(request: Request, exc: DomainException) -> JSONResponse:
+        """Any other domain error (panel errors, failed authentication)."""
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"detail": exc.message},
+        )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Application lifespan manager."""
+    container = app.state.dishka_container
+    # Поднимаем фоновые задачи на старте, а не при первом запросе
+    await container.get(PlacementEngine)
+    await container.get(TrafficCollector)
     yield
-    # Cleanup will be handled by dishka
+    # Dishka finalizes providers: stops background tasks, closes adapters and DB
+    await container.close()
 
 
 def create_app() -> FastAPI:
@@ -85,21 +135,46 @@ def create_app() -> FastAPI:
     container = make_async_container(
         InfrastructureProvider(),
         ApplicationProvider(),
+        FastapiProvider(),
     )
     setup_dishka(container, app)
 
     # Add middleware
     app.middleware("http")(api_key_middleware)
-
-    # Include routers
-    app.include_router(inbounds.router, prefix="/api/v1")
-    app.include_router(clients.router, prefix="/api/v1")
-    app.include_router(stats.router, prefix="/api/v1")
+    app.add_middleware(MetricsMiddleware)
+
+    # Include routers: without prefix they work with the default node,
+    # under /nodes/{node_id} with the addressed one
+    for prefix in ("/api/v1", "/api/v1/nodes/{node_id}"):
+        app.include_router(inbounds.router, prefix=prefix)
+        app.include_router(clients.router, prefix=prefix)
+        app.include_router(client_directory.router, prefix=prefix)
+        app.include_router(stats.router, prefix=prefix)
+    app.include_router(fleet.router, prefix="/api/v1")
+    app.include_router(owners.router, prefix="/api/v1")
 
     @app.get("/health")
-    async def health() -> dict[str, str]:
-        """Health check endpoint."""
-        return {"status": "ok"}
+    async def health(request: Request) -> dict[str, Any]:
+        """Health check endpoint.
+
+        Reports circuit breaker state of every node; `degraded` while any
+        circuit is not closed.
+        """
+        nodes = await request.app.state.dishka_container.get(NodeRegistry)
+        circuits = {
+            name: stats["circuit"]["state"]
+            for name, stats in nodes.runtime_stats().items()
+            if "circuit" in stats
+        }
+        healthy = all(state == "closed" for state in circuits.values())
+        return {"status": "ok" if healthy else "degraded", "nodes": circuits}
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        """Metrics in Prometheus text format."""
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+    add_domain_exception_handlers(app)
 
     # Добавляем обработчик исключений для логирования
     @app.exception_handler(Exception)
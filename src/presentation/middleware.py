@@ -1,11 +1,14 @@
 """FastAPI middleware."""
 
+import time
 from typing import Callable
 
 from fastapi import Request, Response, status
 from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from src.config import settings
+from src.infrastructure.metrics import HTTP_REQUEST_DURATION
 
 # Публичные пути, которые не требуют API ключа
 PUBLIC_PATHS = {
@@ -13,6 +16,7 @@ PUBLIC_PATHS = {
     "/redoc",
     "/openapi.json",
     "/health",
+    "/metrics",
 }
 
 
@@ -34,3 +38,58 @@ async def api_key_middleware(request: Request, call_next: Callable) -> Response:
 
     response = await call_next(request)
     return response
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route, e.g. /api/v1/inbounds/{inbound_id}.
+
+    Taken from the route's `path_format`. Routers included without copying
+    their routes (newer FastAPI) know only their own part of the path; the
+    include prefix is then the rest of the request path, with parameter
+    values such as {node_id} replaced by their names. Unmatched requests
+    share one label.
+    """
+    route = scope.get("route")
+    if route is None or "endpoint" not in scope:
+        return "unmatched"
+    template = str(route.path_format)
+    path: str = scope["path"]
+    if route.path_regex.match(path):
+        return template
+    segments = path.split("/")
+    prefix = segments[: len(segments) - template.count("/")]
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(f"{{{names[s]}}}" if s in names else s for s in prefix) + template
+
+
+class MetricsMiddleware:
+    """Record latency of every API request by route template.
+
+    Plain ASGI middleware: unlike `BaseHTTPMiddleware` it does not wrap the
+    response body, so streaming responses are timed until the last chunk.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = "500"
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.observe(
+                (scope["method"], route_template(scope), status_code),
+                time.perf_counter() - started,
+            )
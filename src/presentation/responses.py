@@ -0,0 +1,22 @@
+"""Response classes."""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from src.config import settings
+from src.infrastructure.codec import get_codec
+
+_codec = get_codec(settings.json_codec)
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured JSON codec.
+
+    Routes with a response_model do not need it: FastAPI serializes their
+    models straight to bytes with pydantic. Use it for responses built from
+    plain data.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return _codec.dumps_bytes(content)
@@ -1 +1,232 @@
 """Tests configuration."""
+
+from collections.abc import AsyncIterator
+
+import httpx
+import pytest
+from dishka import Scope, make_async_container, provide
+from dishka.integrations.fastapi import FastapiProvider, setup_dishka
+from fastapi import FastAPI
+
+from src.application.fleet import FleetService
+from src.application.placement import PlacementEngine, create_policy
+from src.domain.entities import (
+    Client,
+    ClientStat,
+    Inbound,
+    InboundTraffic,
+    ServerStats,
+    Settings,
+)
+from src.domain.exceptions import ClientNotFoundException, InboundNotFoundException
+from src.domain.ports import VPNServerPort
+from src.infrastructure.cache import CachedVPNServer
+from src.infrastructure.di import ApplicationProvider, InfrastructureProvider
+from src.infrastructure.fleet import NodeRegistry
+from src.infrastructure.persistence import Database
+from src.presentation.api import client_directory, clients, inbounds, owners, stats
+from src.presentation.app import add_domain_exception_handlers
+
+
+def make_client(client_id: str, email: str | None = None) -> Client:
+    """Create client entity for tests."""
+    return Client(id=client_id, email=email or f"{client_id}@vpn.local", totalGB=0)
+
+
+def make_stat(inbound_id: int, client: Client, up: int = 0, down: int = 0) -> ClientStat:
+    """Create client stats entry for tests."""
+    return ClientStat(
+        id=0,
+        inboundId=inbound_id,
+        enable=client.enable,
+        email=client.email,
+        uuid=client.id,
+        subId=client.subId,
+        up=up,
+        down=down,
+        allTime=up + down,
+        expiryTime=client.expireTime,
+        total=0,
+        reset=0,
+        last=0,
+    )
+
+
+class FakeVPNServer(VPNServerPort):
+    """In-memory VPN server counting upstream calls."""
+
+    def __init__(self) -> None:
+        self.inbounds: dict[int, Inbound] = {}
+        self.calls: list[str] = []
+
+    def put_inbound(self, inbound_id: int, clients: list[Client]) -> Inbound:
+        """Store inbound with given clients."""
+        inbound = Inbound(
+            id=inbound_id,
+            port=10000 + inbound_id,
+            settings=Settings(clients=clients),
+            clientStats=[make_stat(inbound_id, client) for client in clients],
+        )
+        self.inbounds[inbound_id] = inbound
+        return inbound
+
+    async def authenticate(self) -> bool:
+        return True
+
+    async def get_inbounds(self) -> list[Inbound]:
+        self.calls.append("get_inbounds")
+        return list(self.inbounds.values())
+
+    async def get_inbound(self, inbound_id: int) -> Inbound:
+        self.calls.append(f"get_inbound:{inbound_id}")
+        if inbound_id not in self.inbounds:
+            raise InboundNotFoundException(f"Inbound {inbound_id} not found")
+        return self.inbounds[inbound_id]
+
+    async def create_inbound(self, inbound: Inbound) -> Inbound:
+        self.calls.append("create_inbound")
+        inbound_id = max(self.inbounds, default=0) + 1
+        return self.put_inbound(inbound_id, inbound.settings.clients)
+
+    async def update_inbound(self, inbound_id: int, inbound: Inbound) -> Inbound:
+        self.calls.append(f"update_inbound:{inbound_id}")
+        return self.put_inbound(inbound_id, inbound.settings.clients)
+
+    async def delete_inbound(self, inbound_id: int) -> bool:
+        self.calls.append(f"delete_inbound:{inbound_id}")
+        del self.inbounds[inbound_id]
+        return True
+
+    async def add_client(self, inbound_id: int, client: Client) -> Client:
+        self.calls.append(f"add_client:{inbound_id}")
+        if inbound_id not in self.inbounds:
+            raise InboundNotFoundException(f"Inbound {inbound_id} not found")
+        inbound = self.inbounds[inbound_id]
+        self.put_inbound(inbound_id, [*inbound.settings.clients, client])
+        return client
+
+    async def get_client(self, inbound_id: int, client_id: str) -> Client:
+        self.calls.append(f"get_client:{inbound_id}")
+        for client in self.inbounds[inbound_id].settings.clients:
+            if client.id == client_id:
+                return client
+        raise ClientNotFoundException(f"Client {client_id} not found")
+
+    async def update_client(self, inbound_id: int, client_id: str, client: Client) -> Client:
+        self.calls.append(f"update_client:{inbound_id}")
+        clients = [
+            client if existing.id == client_id else existing
+            for existing in self.inbounds[inbound_id].settings.clients
+        ]
+        self.put_inbound(inbound_id, clients)
+        return client
+
+    async def delete_client(self, inbound_id: int, client_id: str) -> bool:
+        self.calls.append(f"delete_client:{inbound_id}")
+        clients = [c for c in self.inbounds[inbound_id].settings.clients if c.id != client_id]
+        self.put_inbound(inbound_id, clients)
+        return True
+
+    async def get_traffic_stats(self) -> list[InboundTraffic]:
+        self.calls.append("get_traffic_stats")
+        return [
+            InboundTraffic(inbound_id=i.id or 0, up=i.up, down=i.down, total=i.total)
+            for i in self.inbounds.values()
+        ]
+
+    async def get_server_stats(self) -> ServerStats:
+        self.calls.append("get_server_stats")
+        return ServerStats(
+            cpu_usage=0.0,
+            memory_usage=0.0,
+            disk_usage=0.0,
+            uptime=0,
+            network_up=0,
+            network_down=0,
+        )
+
+
+@pytest.fixture
+def fake_server() -> FakeVPNServer:
+    """In-memory VPN server with two inbounds."""
+    server = FakeVPNServer()
+    server.put_inbound(1, [make_client("a"), make_client("b")])
+    server.put_inbound(2, [make_client("c")])
+    return server
+
+
+@pytest.fixture
+async def database() -> AsyncIterator[Database]:
+    """In-memory database with all tables."""
+    db = Database("sqlite+aiosqlite:///:memory:")
+    await db.create_tables()
+    yield db
+    await db.close()
+
+
+@pytest.fixture
+def api_nodes() -> dict[str, VPNServerPort]:
+    """Extra nodes served by the api fixture next to the default one."""
+    return {}
+
+
+class _ApiTestProvider(InfrastructureProvider):
+    """Real providers with the in-memory database and a cached fake node."""
+
+    def __init__(
+        self, server: VPNServerPort, database: Database, nodes: dict[str, VPNServerPort]
+    ) -> None:
+        super().__init__()
+        self._server = server
+        self._database = database
+        self._nodes = nodes
+
+    @provide(scope=Scope.APP)
+    async def provide_database(self) -> AsyncIterator[Database]:
+        yield self._database
+
+    @provide(scope=Scope.APP)
+    async def provide_node_registry(self) -> AsyncIterator[NodeRegistry]:
+        registry = NodeRegistry(default_node="default")
+        registry.register("default", CachedVPNServer(self._server))
+        for name, server in self._nodes.items():
+            registry.register(name, server)
+        yield registry
+
+
+class _ApiApplicationProvider(ApplicationProvider):
+    """Application providers with a placement table built once, without background refresh."""
+
+    @provide(scope=Scope.APP)
+    async def provide_placement_engine(self, fleet: FleetService) -> PlacementEngine:
+        engine = PlacementEngine(fleet, policy=create_policy("least_clients"), interval=60)
+        await engine.refresh()
+        return engine
+
+
+@pytest.fixture
+async def api(
+    fake_server: FakeVPNServer, database: Database, api_nodes: dict[str, VPNServerPort]
+) -> AsyncIterator[httpx.AsyncClient]:
+    """HTTP client of an app serving /api/v1 routes over fake_server and api_nodes."""
+    app = FastAPI()
+    container = make_async_container(
+        _ApiTestProvider(fake_server, database, api_nodes),
+        _ApiApplicationProvider(),
+        FastapiProvider(),
+    )
+    setup_dishka(container, app)
+    add_domain_exception_handlers(app)
+    for router in (
+        inbounds.router,
+        clients.router,
+        client_directory.router,
+        owners.router,
+        stats.router,
+    ):
+        app.include_router(router, prefix="/api/v1")
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+    await container.close()
@@ -0,0 +1,359 @@
+"""Tests for REST API routes."""
+
+import json
+
+import httpx
+import pytest
+
+from src.domain.entities import Inbound
+from src.domain.exceptions import NodeUnavailableException, VPNServerException
+from src.domain.ports import VPNServerPort
+from src.infrastructure.persistence import ClientMetadataRepository, Database
+from src.presentation.api import client_directory
+from tests.conftest import FakeVPNServer, make_client, make_stat
+
+
+class FlakyVPNServer(FakeVPNServer):
+    """Node whose reads fail while it is down."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.down = False
+
+    async def get_inbounds(self) -> list[Inbound]:
+        if self.down:
+            raise NodeUnavailableException("edge is down")
+        return await super().get_inbounds()
+
+
+@pytest.fixture
+def edge_server() -> FlakyVPNServer:
+    """Second node with one inbound."""
+    server = FlakyVPNServer()
+    server.put_inbound(5, [make_client("e")])
+    return server
+
+
+@pytest.fixture
+def api_nodes(edge_server: FlakyVPNServer) -> dict[str, VPNServerPort]:
+    """Serve edge_server as node "edge" next to the default node."""
+    return {"edge": edge_server}
+
+
+async def test_get_client_without_inbound(
+    api: httpx.AsyncClient, fake_server: FakeVPNServer, database: Database
+) -> None:
+    """Test GET /clients/{client_id} finds the inbound through the index."""
+    async with database.session() as session:
+        await ClientMetadataRepository(session).create("c", owner_ref="user-1")
+
+    response = await api.get("/api/v1/clients/c")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["inbound_id"], body["email"], body["owner_ref"]) == (2, "c@vpn.local", "user-1")
+    assert fake_server.calls == ["get_inbounds"]
+
+    not_modified = await api.get(
+        "/api/v1/clients/c", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert not_modified.status_code == 304
+    assert (await api.get("/api/v1/clients/zzz")).status_code == 404
+
+
+async def test_batch_create_clients(
+    api: httpx.AsyncClient, fake_server: FakeVPNServer, database: Database
+) -> None:
+    """Test POST :batch creates every client and stores owner_ref of each."""
+    response = await api.post(
+        "/api/v1/inbounds/2/clients:batch",
+        json={"clients": [{"owner_ref": "user-1"}, {"total_gb": 5}]},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 0)
+    assert [item["index"] for item in body["results"]] == [0, 1]
+    created = [item["client"] for item in body["results"]]
+    assert [c["owner_ref"] for c in created] == ["user-1", None]
+    assert len(fake_server.inbounds[2].settings.clients) == 3
+
+    async with database.session() as session:
+        owned = await ClientMetadataRepository(session).get_by_owner_ref("user-1")
+    assert [m.client_id for m in owned] == [created[0]["id"]]
+
+    missing = await api.post("/api/v1/inbounds/9/clients:batch", json={"clients": [{}]})
+    assert missing.json()["failed"] == 1
+
+
+async def test_bulk_delete_by_owner_ref(
+    api: httpx.AsyncClient, fake_server: FakeVPNServer, database: Database
+) -> None:
+    """Test POST /clients:bulk deletes an owner's clients and their metadata."""
+    async with database.session() as session:
+        await ClientMetadataRepository(session).create_many(
+            [("a", "user-1"), ("c", "user-1"), ("gone", "user-1"), ("b", "user-2")]
+        )
+
+    response = await api.post(
+        "/api/v1/clients:bulk", json={"action": "delete", "owner_ref": "user-1"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 1)
+    assert {r["client_id"]: r["inbound_id"] for r in body["results"]} == {
+        "a": 1,
+        "c": 2,
+        "gone": None,
+    }
+    assert [c.id for i in fake_server.inbounds.values() for c in i.settings.clients] == ["b"]
+    async with database.session() as session:
+        left = await ClientMetadataRepository(session).get_by_client_ids(["a", "c", "gone"])
+    assert list(left) == ["gone"]
+
+    invalid = await api.post("/api/v1/clients:bulk", json={"action": "delete"})
+    assert invalid.status_code == 422
+
+
+async def test_list_inbounds_pages_and_projects(
+    api: httpx.AsyncClient, fake_server: FakeVPNServer
+) -> None:
+    """Test limit/cursor paging, client pages, summary view and fields= projection."""
+    fake_server.put_inbound(3, [make_client(f"x{i}") for i in range(5)])
+
+    first = await api.get("/api/v1/inbounds", params={"limit": 2, "clients_limit": 1})
+    assert first.status_code == 200
+    body = first.json()
+    assert [inbound["id"] for inbound in body] == [1, 2]
+    assert [len(inbound["clients"]) for inbound in body] == [1, 1]
+    assert "clients" not in body[0]["settings"]
+    full = (await api.get("/api/v1/inbounds/1")).json()
+    assert [client["id"] for client in full["settings"]["clients"]] == ["a", "b"]
+    assert body[0]["clients_next_cursor"] is not None
+    assert body[1]["clients_next_cursor"] is None
+
+    rest = await api.get("/api/v1/inbounds", params={"cursor": first.headers["X-Next-Cursor"]})
+    assert [inbound["id"] for inbound in rest.json()] == [3]
+    assert "X-Next-Cursor" not in rest.headers
+
+    summary = await api.get("/api/v1/inbounds", params={"view": "summary"})
+    assert [(i["id"], i["client_count"]) for i in summary.json()] == [(1, 2), (2, 1), (3, 5)]
+    assert "clients" not in summary.json()[0]
+
+    projected = await api.get("/api/v1/inbounds", params={"fields": "id,port", "limit": 1})
+    assert projected.status_code == 200
+    assert projected.json() == [{"id": 1, "port": 10001}]
+    assert (await api.get("/api/v1/inbounds", params={"fields": "nope"})).status_code == 400
+    assert (await api.get("/api/v1/inbounds", params={"cursor": "bad"})).status_code == 400
+
+
+async def test_get_inbound_fields_without_clients(api: httpx.AsyncClient) -> None:
+    """Test fields= without clients skips the client page instead of failing on it."""
+    response = await api.get("/api/v1/inbounds/1", params={"fields": "id", "clients_limit": 1})
+
+    assert response.status_code == 200
+    assert response.json() == {"id": 1}
+
+
+async def test_update_inbound_keeps_clients_missing_from_settings(
+    api: httpx.AsyncClient, fake_server: FakeVPNServer
+) -> None:
+    """Test a paged GET response put back as is does not drop the clients."""
+    inbound = (await api.get("/api/v1/inbounds/1", params={"clients_limit": 1})).json()
+    assert "clients" not in inbound["settings"]
+
+    response = await api.put("/api/v1/inbounds/1", json={"settings": inbound["settings"]})
+
+    assert response.status_code == 200
+    assert [client.id for client in fake_server.inbounds[1].settings.clients] == ["a", "b"]
+
+
+async def test_domain_errors_mapped_by_app_handlers(
+    api: httpx.AsyncClient, fake_server: FakeVPNServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test an unavailable node is 503 on every route and other panel errors are 500."""
+
+    async def unavailable(*args: object) -> None:
+        raise NodeUnavailableException("Node default circuit is open")
+
+    async def failing(*args: object) -> None:
+        raise VPNServerException("Panel returned 502")
+
+    monkeypatch.setattr(fake_server, "get_inbounds", unavailable)
+    monkeypatch.setattr(fake_server, "get_server_stats", unavailable)
+    monkeypatch.setattr(fake_server, "get_inbound", failing)
+
+    for path in ("/api/v1/inbounds", "/api/v1/stats/server"):
+        response = await api.get(path)
+        assert response.status_code == 503
+        assert response.json() == {"detail": "Node default circuit is open"}
+    response = await api.get("/api/v1/inbounds/1")
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Panel returned 502"}
+
+
+async def test_client_routes_fetch_inbound_once(
+    api: httpx.AsyncClient, fake_server: FakeVPNServer
+) -> None:
+    """Test client PUT, GET and POST read the inbound from the panel once per request."""
+    updated = await api.put("/api/v1/inbounds/1/clients/a", json={"limit_ip": 3})
+    assert updated.status_code == 200
+    assert updated.json()["limit_ip"] == 3
+    assert fake_server.calls == ["get_inbound:1", "update_client:1"]
+
+    fake_server.calls.clear()
+    fetched = await api.get("/api/v1/inbounds/1/clients/a")
+    assert fetched.status_code == 200
+    assert fake_server.calls == ["get_inbound:1"]
+
+    fake_server.calls.clear()
+    created = await api.post("/api/v1/inbounds/1/clients", json={"owner_ref": "user-1"})
+    assert created.status_code == 201
+    assert created.json()["owner_ref"] == "user-1"
+    assert fake_server.calls == ["add_client:1", "get_inbound:1"]
+
+    fake_server.calls.clear()
+    fast = await api.post("/api/v1/inbounds/1/clients?refresh=false", json={})
+    assert fast.status_code == 201
+    assert fake_server.calls == ["add_client:1"]
+
+
+async def test_create_client_restricted_to_node(
+    api: httpx.AsyncClient,
+    fake_server: FakeVPNServer,
+    edge_server: FakeVPNServer,
+    database: Database,
+) -> None:
+    """Test POST /clients places the client on the requested node only."""
+    response = await api.post("/api/v1/clients", json={"node": "edge", "owner_ref": "user-1"})
+
+    assert response.status_code == 201
+    body = response.json()
+    assert (body["node"], body["inbound_id"], body["owner_ref"]) == ("edge", 5, "user-1")
+    assert [c.id for c in edge_server.inbounds[5].settings.clients] == ["e", body["id"]]
+    assert not any(call.startswith("add_client") for call in fake_server.calls)
+
+    async with database.session() as session:
+        metadata = await ClientMetadataRepository(session).get_by_client_id(body["id"])
+    assert metadata is not None and metadata.owner_ref == "user-1"
+
+
+async def test_create_client_without_candidate(
+    api: httpx.AsyncClient, fake_server: FakeVPNServer, edge_server: FakeVPNServer
+) -> None:
+    """Test POST /clients answers 503 when no inbound can take the client."""
+    response = await api.post("/api/v1/clients", json={"node": "missing"})
+
+    assert response.status_code == 503
+    assert "node missing" in response.json()["detail"]
+    calls = fake_server.calls + edge_server.calls
+    assert not any(call.startswith("add_client") for call in calls)
+
+
+async def test_export_clients_joins_owner_ref_across_chunks(
+    api: httpx.AsyncClient,
+    fake_server: FakeVPNServer,
+    database: Database,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test :export streams one NDJSON line per client with owner_ref from every chunk."""
+    monkeypatch.setattr(client_directory, "EXPORT_METADATA_CHUNK", 2)
+    fake_server.put_inbound(3, [make_client("d"), make_client("e")])
+    async with database.session() as session:
+        repo = ClientMetadataRepository(session)
+        for client_id, owner_ref in [("b", "user-1"), ("c", "user-2"), ("e", "user-3")]:
+            await repo.create(client_id, owner_ref=owner_ref)
+
+    async with api.stream("GET", "/api/v1/clients:export") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) async for line in response.aiter_lines() if line]
+
+    assert [(line["id"], line["inbound_id"], line["owner_ref"]) for line in lines] == [
+        ("a", 1, None),
+        ("b", 1, "user-1"),
+        ("c", 2, "user-2"),
+        ("d", 3, None),
+        ("e", 3, "user-3"),
+    ]
+
+
+async def test_inbound_etags_follow_owner_ref(
+    api: httpx.AsyncClient, fake_server: FakeVPNServer, database: Database
+) -> None:
+    """Test If-None-Match gets 304 on inbound reads until an owner_ref or the inbound changes."""
+    async with database.session() as session:
+        await ClientMetadataRepository(session).create("a", owner_ref="user-1")
+    urls = ["/api/v1/inbounds", "/api/v1/inbounds/1"]
+
+    etags = []
+    for url in urls:
+        response = await api.get(url)
+        assert response.status_code == 200
+        etags.append(response.headers["ETag"])
+        not_modified = await api.get(url, headers={"If-None-Match": etags[-1]})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["ETag"] == etags[-1]
+        assert not_modified.content == b""
+
+    version = fake_server.inbounds[1].content_version()
+    updated = await api.put("/api/v1/inbounds/1/clients/a", json={"owner_ref": "user-2"})
+    assert updated.json()["owner_ref"] == "user-2"
+    assert fake_server.inbounds[1].content_version() == version  # changed metadata only
+
+    for url, etag in zip(urls, etags):
+        response = await api.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        body = response.json()
+        inbound = body[0] if isinstance(body, list) else body
+        assert inbound["clients"][0]["owner_ref"] == "user-2"
+
+    etags = [(await api.get(url)).headers["ETag"] for url in urls]
+    assert (await api.put("/api/v1/inbounds/1/clients/b", json={"limit_ip": 2})).status_code == 200
+    for url, etag in zip(urls, etags):
+        assert (await api.get(url, headers={"If-None-Match": etag})).status_code == 200
+
+
+async def test_owner_clients_across_nodes(
+    api: httpx.AsyncClient,
+    fake_server: FakeVPNServer,
+    edge_server: FlakyVPNServer,
+    database: Database,
+) -> None:
+    """Test GET /owners/{owner_ref}/clients gathers clients, totals, missing ids and node status."""
+    for server, inbound_id, up, down in [(fake_server, 1, 3, 4), (edge_server, 5, 1, 1)]:
+        inbound = server.inbounds[inbound_id]
+        client = inbound.settings.clients[0]
+        stats = [make_stat(inbound_id, client, up, down), *inbound.clientStats[1:]]
+        server.inbounds[inbound_id] = inbound.model_copy(update={"clientStats": stats})
+    async with database.session() as session:
+        repo = ClientMetadataRepository(session)
+        for client_id in ["a", "e", "gone"]:
+            await repo.create(client_id, owner_ref="user-1")
+
+    response = await api.get("/api/v1/owners/user-1/clients")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(c["node"], c["inbound_id"], c["id"]) for c in body["clients"]] == [
+        ("default", 1, "a"),
+        ("edge", 5, "e"),
+    ]
+    assert {c["owner_ref"] for c in body["clients"]} == {"user-1"}
+    assert (body["total_gb"], body["all_time_gb"]) == (9, 9)
+    assert body["missing"] == ["gone"]
+    assert body["nodes"] == [
+        {"node": "default", "ok": True, "error": None},
+        {"node": "edge", "ok": True, "error": None},
+    ]
+
+    edge_server.down = True
+    partial = (await api.get("/api/v1/owners/user-1/clients")).json()
+
+    assert [c["id"] for c in partial["clients"]] == ["a"]
+    assert partial["total_gb"] == 7
+    assert partial["missing"] == []  # "e" may live on the failed node
+    assert partial["nodes"][1] == {"node": "edge", "ok": False, "error": "edge is down"}
+    assert (await api.get("/api/v1/owners/nobody/clients")).json()["clients"] == []
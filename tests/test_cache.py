@@ -0,0 +1,141 @@
+"""Tests for inbound snapshot cache."""
+
+import asyncio
+
+from src.infrastructure.cache import CachedVPNServer
+from tests.conftest import FakeVPNServer, make_client
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_fresh_snapshots_are_served_from_cache(fake_server: FakeVPNServer) -> None:
+    """Test repeated reads within TTL hit the cache."""
+    cache = CachedVPNServer(fake_server, ttl=5, stale_ttl=10, clock=FakeClock())
+
+    await cache.get_inbounds()
+    await cache.get_inbounds()
+    await cache.get_inbound(1)
+    await cache.get_client(1, "a")
+    await cache.get_traffic_stats()
+
+    assert fake_server.calls == ["get_inbounds"]
+    assert cache.stats.misses == 1
+
+
+async def test_mutation_invalidates_only_affected_inbound(fake_server: FakeVPNServer) -> None:
+    """Test client mutation refetches just its inbound."""
+    cache = CachedVPNServer(fake_server, ttl=5, stale_ttl=10, clock=FakeClock())
+    await cache.get_inbounds()
+
+    await cache.add_client(2, make_client("d"))
+    inbounds = await cache.get_inbounds()
+
+    assert [len(i.settings.clients) for i in inbounds] == [2, 2]
+    assert fake_server.calls[-1] == "get_inbound:2"
+    assert "get_inbounds" not in fake_server.calls[1:]
+
+
+async def test_stale_snapshot_is_served_while_refreshing(fake_server: FakeVPNServer) -> None:
+    """Test stale-while-revalidate returns old data and refreshes in background."""
+    clock = FakeClock()
+    cache = CachedVPNServer(fake_server, ttl=5, stale_ttl=10, clock=clock)
+    await cache.get_inbound(1)
+
+    fake_server.put_inbound(1, [make_client("a")])
+    clock.now = 7
+    stale = await cache.get_inbound(1)
+    await asyncio.sleep(0)
+    fresh = await cache.get_inbound(1)
+
+    assert len(stale.settings.clients) == 2
+    assert len(fresh.settings.clients) == 1
+    assert cache.stats.stale_hits == 1
+    await cache.close()
+
+
+async def test_find_client_uses_index(fake_server: FakeVPNServer) -> None:
+    """Test client lookup without inbound id goes through the index."""
+    cache = CachedVPNServer(fake_server, ttl=5, stale_ttl=10, clock=FakeClock())
+
+    record = await cache.find_client("c")
+    assert record.inbound_id == 2
+    assert record.stat is not None and record.stat.email == "c@vpn.local"
+
+    await cache.delete_client(1, "a")
+    await cache.add_client(1, make_client("e"))
+    assert cache.index.locate("a") is None
+    assert (await cache.find_client("e")).inbound_id == 1
+    assert fake_server.calls.count("get_inbounds") == 1
+
+
+async def test_find_clients_reads_each_inbound_once(fake_server: FakeVPNServer) -> None:
+    """Test bulk lookup groups clients by inbound and skips unknown ids."""
+    clock = FakeClock()
+    cache = CachedVPNServer(fake_server, ttl=5, stale_ttl=0, clock=clock)
+    await cache.get_inbounds()
+    clock.now = 6  # снимки протухли - нужные inbounds перечитываются
+
+    found = await cache.find_clients(["a", "b", "c"])
+
+    assert {i: r.inbound_id for i, r in found.items()} == {"a": 1, "b": 1, "c": 2}
+    assert found["b"].stat is not None
+    assert sorted(fake_server.calls[1:]) == ["get_inbound:1", "get_inbound:2"]
+
+    # Неизвестный id - один перечитанный список вместо поиска по inbounds
+    assert set(await cache.find_clients(["a", "zzz"])) == {"a"}
+    assert fake_server.calls[3:] == ["get_inbounds"]
+
+
+async def test_invalidation_during_listing_refresh_keeps_other_snapshots(
+    fake_server: FakeVPNServer,
+) -> None:
+    """Test a write to one inbound mid-refresh drops only that inbound's snapshot."""
+    started, release = asyncio.Event(), asyncio.Event()
+    get_inbounds = fake_server.get_inbounds
+
+    async def slow_get_inbounds():
+        inbounds = await get_inbounds()
+        started.set()
+        await release.wait()
+        return inbounds
+
+    fake_server.get_inbounds = slow_get_inbounds
+    cache = CachedVPNServer(fake_server, ttl=5, stale_ttl=10, clock=FakeClock())
+    listing = asyncio.create_task(cache.get_inbounds())
+    await started.wait()
+
+    await cache.add_client(2, make_client("d"))
+    release.set()
+    await listing
+    inbounds = await cache.get_inbounds()
+
+    assert [len(i.settings.clients) for i in inbounds] == [2, 2]
+    # Список и inbound 1 закешированы, перечитан только изменённый inbound 2
+    assert fake_server.calls.count("get_inbounds") == 1
+    assert "get_inbound:1" not in fake_server.calls
+    assert fake_server.calls[-1] == "get_inbound:2"
+
+
+async def test_listing_indexes_each_inbound_once(fake_server: FakeVPNServer) -> None:
+    """Test a full listing rebuilds the index without re-indexing inbound by inbound."""
+    cache = CachedVPNServer(fake_server, ttl=5, stale_ttl=10, clock=FakeClock())
+    indexed: list[int | None] = []
+    index_inbound = cache.index.index_inbound
+
+    def spy(inbound):
+        indexed.append(inbound.id)
+        index_inbound(inbound)
+
+    cache.index.index_inbound = spy
+    await cache.get_inbounds()
+
+    assert sorted(indexed) == [1, 2]
+    assert cache.index.locate("c").inbound_id == 2
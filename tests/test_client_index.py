@@ -0,0 +1,59 @@
+"""Tests for client index."""
+
+from src.domain.entities import Inbound, Settings
+from src.infrastructure.client_index import ClientIndex
+from tests.conftest import make_client, make_stat
+
+
+def make_inbound(inbound_id: int, *client_ids: str) -> Inbound:
+    """Create inbound with clients and their stats."""
+    clients = [make_client(i).model_copy(update={"subId": f"sub-{i}"}) for i in client_ids]
+    return Inbound(
+        id=inbound_id,
+        port=10000 + inbound_id,
+        settings=Settings(clients=clients),
+        clientStats=[make_stat(inbound_id, client, up=1) for client in clients],
+    )
+
+
+def test_snapshots_are_indexed_on_first_lookup() -> None:
+    """Test stored inbounds are not decoded until somebody looks a client up."""
+    index = ClientIndex()
+    index.replace_all([make_inbound(1, "a", "b"), make_inbound(2, "c")])
+
+    assert index._pending.keys() == {1, 2}
+    record = index.get("c")
+    assert not index._pending
+    assert record is not None and record.inbound_id == 2
+    assert record.stat is not None and record.stat.up == 1
+    assert len(index) == 3
+
+
+def test_reindexing_inbound_replaces_its_clients() -> None:
+    """Test a new snapshot of an inbound drops clients it no longer has."""
+    index = ClientIndex()
+    index.replace_all([make_inbound(1, "a", "b"), make_inbound(2, "c")])
+    assert "a" in index
+
+    index.index_inbound(make_inbound(1, "b", "d"))
+
+    assert index.locate("a") is None
+    assert index.stat_by_email("a@vpn.local") is None
+    assert {i: index.locate(i).inbound_id for i in ("b", "c", "d")} == {"b": 1, "c": 2, "d": 1}
+
+
+def test_single_client_updates() -> None:
+    """Test put/remove keep locations, emails and subIds consistent."""
+    index = ClientIndex()
+    index.replace_all([make_inbound(1, "a"), make_inbound(2, "c")])
+
+    index.put_client(2, make_client("a", "renamed@vpn.local").model_copy(update={"subId": "x"}))
+    assert index.locate("a").inbound_id == 2
+    assert index.get_by_sub_id("x").client.email == "renamed@vpn.local"
+    assert index.get_by_sub_id("sub-a") is None
+    assert index.stat_by_email("a@vpn.local") is None
+
+    index.remove_client("a")
+    index.remove_inbound(2)
+    assert len(index) == 0
+    assert index.get_by_sub_id("x") is None
@@ -0,0 +1,27 @@
+"""Tests for JSON codec selection."""
+
+import pytest
+
+from src.infrastructure.codec import get_codec
+
+
+@pytest.mark.parametrize("name", ["auto", "stdlib", "orjson", "msgspec"])
+def test_codec_round_trip(name: str) -> None:
+    """Test every installed backend encodes compactly and rejects bad input."""
+    try:
+        codec = get_codec(name)
+    except ValueError:
+        pytest.skip(f"{name} is not installed")
+
+    data = {"clients": [{"email": "ё@vpn.local", "up": 1}], "obj": None}
+
+    assert codec.loads(codec.dumps_bytes(data)) == data
+    assert codec.dumps({"a": 1}) == '{"a":1}'
+    with pytest.raises(ValueError):
+        codec.loads(b"{broken")
+
+
+def test_unknown_codec_rejected() -> None:
+    """Test unknown backend name is a configuration error."""
+    with pytest.raises(ValueError):
+        get_codec("yaml")
@@ -0,0 +1,48 @@
+"""Tests for adaptive concurrency limiter."""
+
+import asyncio
+
+import pytest
+
+from src.domain.exceptions import NodeUnavailableException
+from src.infrastructure.concurrency import AdaptiveLimiter
+
+
+async def test_queued_request_times_out_without_leaking_slot() -> None:
+    """Test request over the limit fails after queue_timeout and frees its place."""
+    limiter = AdaptiveLimiter(initial_limit=1, queue_timeout=0.05)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with limiter.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(NodeUnavailableException):
+        async with limiter.slot():
+            pass
+    assert limiter.queued == 0
+
+    release.set()
+    await holder
+    async with limiter.slot():
+        assert limiter.inflight == 1
+    assert limiter.inflight == 0
+
+
+async def test_limit_grows_when_saturated_and_shrinks_on_slow_response() -> None:
+    """Test AIMD: +1 per window of fast saturated requests, x backoff on slow one."""
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=8, tolerance=5, backoff=0.5)
+
+    async def request(delay: float) -> None:
+        async with limiter.slot("/list"):
+            await asyncio.sleep(delay)
+
+    for _ in range(4):
+        await asyncio.gather(request(0.01), request(0.01))
+    assert limiter.limit == 3
+
+    await request(0.2)
+    assert limiter.limit == 1
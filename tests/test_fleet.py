@@ -0,0 +1,72 @@
+"""Tests for fleet-wide reads."""
+
+import asyncio
+
+import pytest
+
+from src.application.fleet import FleetService
+from src.domain.entities import Inbound
+from src.domain.exceptions import InvalidConfigurationException, NodeNotFoundException
+from src.infrastructure.fleet import NodeRegistry, panel_node_settings
+from src.infrastructure.persistence import PanelNode
+from src.infrastructure.secrets import SecretBox
+from tests.conftest import FakeVPNServer
+
+
+class SlowVPNServer(FakeVPNServer):
+    """Node that never answers in time."""
+
+    async def get_inbounds(self) -> list[Inbound]:
+        await asyncio.sleep(10)
+        return []
+
+
+class BrokenVPNServer(FakeVPNServer):
+    """Node that fails every read."""
+
+    async def get_inbounds(self) -> list[Inbound]:
+        raise ConnectionError("panel unreachable")
+
+
+async def test_fan_out_returns_partial_results(fake_server: FakeVPNServer) -> None:
+    """Test failed and slow nodes do not fail the fleet-wide read."""
+    registry = NodeRegistry(default_node="main")
+    registry.register("main", fake_server)
+    registry.register("slow", SlowVPNServer())
+    registry.register("broken", BrokenVPNServer())
+
+    results = await FleetService(registry, timeout=0.05).list_inbounds()
+
+    by_node = {result.node: result for result in results}
+    assert by_node["main"].ok and len(by_node["main"].value or []) == 2
+    assert not by_node["slow"].ok and "Timed out" in (by_node["slow"].error or "")
+    assert by_node["broken"].error == "panel unreachable"
+
+
+def test_unknown_node_raises() -> None:
+    """Test unknown node name raises domain exception."""
+    registry = NodeRegistry(default_node="main")
+
+    with pytest.raises(NodeNotFoundException):
+        registry["missing"]
+
+
+def test_panel_node_settings_require_encrypted_password() -> None:
+    """Test database nodes are only loaded with the key their password was encrypted with."""
+    box = SecretBox(SecretBox.generate_key())
+    panel = PanelNode(
+        name="de-1",
+        base_url="https://de-1/x",
+        username="admin",
+        password_encrypted=box.encrypt("pw"),
+        verify_ssl=False,
+    )
+
+    node = panel_node_settings(panel, box)
+    assert (node.name, node.password, node.verify_ssl) == ("de-1", "pw", False)
+
+    with pytest.raises(InvalidConfigurationException, match="PANEL_SECRET_KEY is not set"):
+        panel_node_settings(panel, None)
+    panel.password_encrypted = "pw"
+    with pytest.raises(InvalidConfigurationException, match="encrypt-node-passwords"):
+        panel_node_settings(panel, box)
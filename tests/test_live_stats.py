@@ -0,0 +1,41 @@
+"""Tests for shared live stats pollers."""
+
+import asyncio
+
+from src.infrastructure.live_stats import LiveStatsHub
+from tests.conftest import FakeVPNServer, make_client
+
+
+async def test_subscribers_share_one_poller_and_get_deltas() -> None:
+    """Test upstream is polled once per interval regardless of subscriber count."""
+    server = FakeVPNServer()
+    inbound = server.put_inbound(1, [make_client("a")])
+    hub = LiveStatsHub({"default": server}, interval=3600)
+
+    async with hub.subscribe("default") as first, hub.subscribe("default") as second:
+        assert [(await first.get()).name for _ in range(2)] == ["server", "traffic"]
+        assert (await second.get()).name == "server"
+        assert (await second.get()).data[0]["up_delta"] == 0
+
+        inbound.up = 500
+        await hub.poll_once("default")
+        assert (await first.get()).name == "server"
+        traffic = (await first.get()).data
+        assert traffic[0]["up"] == 500 and traffic[0]["up_delta"] == 500
+
+    assert server.calls.count("get_server_stats") == 2
+    assert hub._pollers == {}
+
+
+async def test_slow_subscriber_drops_oldest_events() -> None:
+    """Test a full queue keeps the newest events instead of blocking the poller."""
+    server = FakeVPNServer()
+    server.put_inbound(1, [make_client("a")])
+    hub = LiveStatsHub({"default": server}, interval=3600, queue_size=2)
+
+    async with hub.subscribe("default") as subscription:
+        await asyncio.sleep(0.01)
+        await hub.poll_once("default")
+        assert subscription.dropped == 2
+        assert [(await subscription.get()).name for _ in range(2)] == ["server", "traffic"]
+    await hub.close()
@@ -0,0 +1,101 @@
+"""Tests for metrics registry and panel request instrumentation."""
+
+from typing import Any
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI, Request
+
+from src.domain.exceptions import VPNServerException
+from src.infrastructure.metrics import (
+    XUI_LOGINS,
+    XUI_REQUEST_DURATION,
+    MetricsRegistry,
+    template_path,
+)
+from src.presentation.middleware import route_template
+from tests.test_x_ui_adapter import login_response, make_adapter
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    """Test text format of a labelled histogram."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(("/a",), 0.05)
+    histogram.observe(("/a",), 0.5)
+    histogram.observe(("/a",), 5)
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_template_path_hides_ids() -> None:
+    """Test ids and uuids in panel endpoints do not become label values."""
+    assert template_path("/panel/api/inbounds/get/12") == "/panel/api/inbounds/get/{id}"
+    assert (
+        template_path("/panel/api/inbounds/3/delClient/0b7e4f0a-58a1-4c4c-9f0e-2d8e1c3b5a6d")
+        == "/panel/api/inbounds/{id}/delClient/{id}"
+    )
+    assert template_path("/panel/api/inbounds/list") == "/panel/api/inbounds/list"
+
+
+async def test_route_template_includes_router_prefix() -> None:
+    """Test API latency is labelled by the full route template, node prefix included."""
+    router = APIRouter(prefix="/inbounds")
+
+    @router.get("/{inbound_id}")
+    async def get_inbound(inbound_id: int) -> int:
+        return inbound_id
+
+    app = FastAPI()
+    for prefix in ("/api/v1", "/api/v1/nodes/{node_id}"):
+        app.include_router(router, prefix=prefix)
+    templates: list[str] = []
+
+    @app.middleware("http")
+    async def record(request: Request, call_next: Any) -> Any:
+        response = await call_next(request)
+        templates.append(route_template(request.scope))
+        return response
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        for path in ("/api/v1/inbounds/7", "/api/v1/nodes/de-1/inbounds/7", "/api/v1/missing"):
+            await client.get(path)
+
+    assert templates == [
+        "/api/v1/inbounds/{inbound_id}",
+        "/api/v1/nodes/{node_id}/inbounds/{inbound_id}",
+        "unmatched",
+    ]
+
+
+async def test_adapter_records_requests_and_logins() -> None:
+    """Test panel requests are recorded by endpoint template."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/login"):
+            return login_response()
+        return httpx.Response(404)
+
+    labels = ("default", "GET", "/panel/api/inbounds/get/{id}", "404")
+    child = XUI_REQUEST_DURATION._children.get(labels)
+    before = child.count if child else 0
+    logins = XUI_LOGINS.value(("default", "success"))
+
+    adapter = make_adapter(handler)
+    for inbound_id in (1, 2):
+        with pytest.raises(VPNServerException):
+            await adapter.get_inbound(inbound_id)
+    await adapter.close()
+
+    assert XUI_REQUEST_DURATION._children[labels].count == before + 2
+    assert XUI_LOGINS.value(("default", "success")) == logins + 1
@@ -0,0 +1,273 @@
+"""Tests for persistence repositories."""
+
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import Connection, event, inspect
+
+from src.config import Settings
+from src.domain.exceptions import InvalidConfigurationException
+from src.infrastructure.persistence import (
+    SCHEMA_VERSION,
+    Base,
+    ClientMetadata,
+    ClientMetadataCache,
+    ClientMetadataRepository,
+    Database,
+    EngineOptions,
+    PanelNodeRepository,
+    SchemaVersionError,
+)
+from src.infrastructure.persistence.migrations import _initial_schema, current_version, migrate
+from src.infrastructure.persistence.repository import IN_CHUNK_SIZE
+from src.infrastructure.secrets import SecretBox
+
+
+async def test_get_by_client_ids_queries_in_chunks(database: Database) -> None:
+    """Test bulk metadata lookup issues one IN query per chunk of ids."""
+    ids = [f"client-{i}" for i in range(IN_CHUNK_SIZE + 10)]
+    async with database.session() as session:
+        await ClientMetadataRepository(session).create_many(
+            [(client_id, f"owner-{i % 3}") for i, client_id in enumerate(ids)]
+        )
+
+    statements: list[str] = []
+    event.listen(
+        database.engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    async with database.session() as session:
+        found = await ClientMetadataRepository(session).get_by_client_ids([*ids, ids[0], "unknown"])
+
+    assert len(found) == len(ids)
+    assert found["client-4"].owner_ref == "owner-1"
+    assert sum(s.lstrip().upper().startswith("SELECT") for s in statements) == 2
+
+
+async def test_create_many_inserts_with_one_statement(database: Database) -> None:
+    """Test bulk metadata creation is a single executemany INSERT."""
+    statements: list[str] = []
+    event.listen(
+        database.engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    async with database.session() as session:
+        repo = ClientMetadataRepository(session)
+        await repo.create_many([("a", "owner-1"), ("b", None), ("c", "owner-1")])
+        await repo.create_many([])
+
+    assert sum(s.lstrip().upper().startswith("INSERT") for s in statements) == 1
+    async with database.session() as session:
+        owned = await ClientMetadataRepository(session).get_by_owner_ref("owner-1")
+    assert sorted(m.client_id for m in owned) == ["a", "c"]
+
+
+async def test_bulk_update_and_delete_are_single_statements(database: Database) -> None:
+    """Test owner_ref reassignment and deletion of many clients issue one statement each."""
+    cache = ClientMetadataCache()
+    async with database.session() as session:
+        repo = ClientMetadataRepository(session, cache)
+        await repo.create_many([("a", "owner-1"), ("b", "owner-1"), ("c", "owner-2")])
+        assert (await repo.get_by_client_id("a")).owner_ref == "owner-1"
+
+    statements: list[str] = []
+    event.listen(
+        database.engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    async with database.session() as session:
+        repo = ClientMetadataRepository(session, cache)
+        assert await repo.update_owner_ref_many(["a", "b", "zzz"], "owner-3") == 2
+        assert await repo.delete_many(["c", "zzz"]) == 1
+    assert [s.split()[0] for s in statements] == ["UPDATE", "DELETE"]
+
+    async with database.session() as session:
+        repo = ClientMetadataRepository(session, cache)
+        assert (await repo.get_by_client_id("a")).owner_ref == "owner-3"
+        assert await repo.get_by_client_id("c") is None
+
+
+async def test_metadata_cache_serves_reads_and_stays_coherent(database: Database) -> None:
+    """Test cached (also negative) lookups skip the database and writes invalidate them."""
+    cache = ClientMetadataCache(maxsize=2)
+    async with database.session() as session:
+        repo = ClientMetadataRepository(session, cache)
+        assert await repo.get_by_client_id("a") is None
+        assert await repo.get_by_client_id("a") is None
+        await repo.create("a", "owner-1")
+        await repo.create("b", "owner-2")
+    assert cache.stats.negative_hits == 1
+
+    async with database.session() as session:
+        repo = ClientMetadataRepository(session, cache)
+        assert (await repo.get_by_client_ids(["a", "b"]))["a"].owner_ref == "owner-1"
+        await repo.update_owner_ref("a", "owner-3")
+    async with database.session() as session:
+        repo = ClientMetadataRepository(session, cache)
+        assert (await repo.get_by_client_id("a")).owner_ref == "owner-3"
+        assert (await repo.get_by_client_id("a")).owner_ref == "owner-3"
+        await repo.get_by_client_id("c")  # вытесняет "b"
+        await repo.delete("a")
+    async with database.session() as session:
+        assert await ClientMetadataRepository(session, cache).get_by_client_id("a") is None
+
+    stats = cache.as_dict()
+    assert stats["evictions"] == 1 and stats["size"] == 2
+    assert 0 < stats["hit_ratio"] < 1
+
+
+def test_metadata_cache_drops_reads_that_raced_with_a_write() -> None:
+    """Test a query started before an invalidation cannot cache its stale result."""
+    cache = ClientMetadataCache(maxsize=2)
+    stale = ClientMetadata(
+        id=1,
+        client_id="a",
+        owner_ref="owner-1",
+        created_at=datetime(2026, 1, 1),
+        updated_at=datetime(2026, 1, 1),
+    )
+
+    since = cache.version
+    cache.invalidate(["a"])  # запись закоммичена, пока шёл запрос
+    cache.store("a", stale, since)
+    cache.store("b", None, since)
+    assert cache.lookup("a") == (False, None)
+    assert cache.lookup("b") == (True, None)
+
+    cache.store("a", stale, cache.version)
+    assert cache.lookup("a")[1].owner_ref == "owner-1"
+
+    # Старые инвалидации вытеснены: читатели до них не пишут ничего
+    cache.invalidate(["c", "d", "e"])
+    cache.store("f", None, since)
+    assert cache.lookup("f") == (False, None)
+    cache.store("f", None, cache.version)
+    assert cache.lookup("f") == (True, None)
+
+
+def _schema(conn: Connection) -> dict[str, tuple[set[str], set[tuple[str, ...]]]]:
+    """Columns and indexed column tuples of every model table."""
+    inspector = inspect(conn)
+    return {
+        table: (
+            {column["name"] for column in inspector.get_columns(table)},
+            {tuple(index["column_names"]) for index in inspector.get_indexes(table)},
+        )
+        for table in Base.metadata.tables
+    }
+
+
+async def _model_schema(database: Database) -> dict[str, tuple[set[str], set[tuple[str, ...]]]]:
+    async with database.engine.connect() as conn:
+        return await conn.run_sync(_schema)
+
+
+async def test_migrations_match_models_and_adopt_create_all_databases(database: Database) -> None:
+    """Test migrated schema equals the models and a pre-migrations database is upgraded."""
+    migrated = Database("sqlite+aiosqlite:///:memory:")
+    with pytest.raises(SchemaVersionError):
+        await migrated.prepare_schema(auto_migrate=False)
+    await migrated.prepare_schema()
+    statements: list[str] = []
+    event.listen(
+        migrated.engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    await migrated.prepare_schema()  # повторный запуск ничего не делает
+    assert sum("max(schema_version.version)" in sql for sql in statements) == 1
+    async with migrated.engine.connect() as conn:
+        assert await conn.run_sync(_schema) == await _model_schema(database)
+    assert await current_version(migrated.engine) == SCHEMA_VERSION
+    await migrated.close()
+
+    # База из create_all старых моделей без таблицы версий
+    legacy = Database("sqlite+aiosqlite:///:memory:")
+    async with legacy.engine.begin() as conn:
+        await conn.run_sync(_initial_schema)
+    async with legacy.session() as session:
+        await ClientMetadataRepository(session).create("a", "owner")
+    await legacy.prepare_schema()
+    async with legacy.session() as session:
+        assert len(await ClientMetadataRepository(session).get_by_owner_ref("owner")) == 1
+    await legacy.close()
+
+
+async def test_concurrent_workers_migrate_fresh_database_once(tmp_path: Path) -> None:
+    """Test workers starting together on an empty database do not race on the schema."""
+    url = f"sqlite+aiosqlite:///{tmp_path}/vpn.db"
+    workers = [Database(url) for _ in range(4)]
+    try:
+        await asyncio.gather(*(worker.prepare_schema() for worker in workers))
+        async with workers[0].engine.connect() as conn:
+            applied = await conn.exec_driver_sql("SELECT COUNT(*) FROM schema_version")
+            assert applied.scalar() == SCHEMA_VERSION
+    finally:
+        for worker in workers:
+            await worker.close()
+
+
+async def test_panel_passwords_are_stored_encrypted(database: Database) -> None:
+    """Test panel passwords are encrypted, and plaintext rows of old schemas can be encrypted."""
+    box = SecretBox(SecretBox.generate_key())
+    async with database.session() as session:
+        node = await PanelNodeRepository(session).add("de-1", "https://de-1/x", "admin", "pw", box)
+    assert node.password_encrypted != "pw"
+    assert box.decrypt(node.password_encrypted) == "pw"
+
+    # Версия 2: пароль ещё в открытом виде в колонке password
+    legacy = Database("sqlite+aiosqlite:///:memory:")
+    await migrate(legacy.engine, target=2)
+    async with legacy.engine.begin() as conn:
+        await conn.exec_driver_sql(
+            "INSERT INTO panel_nodes (name, base_url, username, password, verify_ssl, enabled, "
+            "created_at) VALUES ('nl-1', 'https://nl-1/x', 'admin', 'secret', 1, 1, '2026-01-01')"
+        )
+    await legacy.prepare_schema()
+    old_key, new_key = SecretBox.generate_key(), SecretBox.generate_key()
+    async with legacy.session() as session:
+        assert await PanelNodeRepository(session).encrypt_passwords(SecretBox(old_key)) == 1
+        # Ротация: новый ключ первым, старый ещё расшифровывает
+        rotating = SecretBox(f"{new_key},{old_key}")
+        assert await PanelNodeRepository(session).encrypt_passwords(rotating) == 0
+        (panel,) = await PanelNodeRepository(session).list_enabled()
+    await legacy.close()
+    assert SecretBox(new_key).decrypt(panel.password_encrypted) == "secret"
+    with pytest.raises(InvalidConfigurationException):
+        SecretBox(old_key).decrypt(panel.password_encrypted)
+
+
+def test_sqlite_pragma_settings_are_validated() -> None:
+    """Test pragma values are checked at startup, case-insensitively."""
+    configured = Settings(database_sqlite_journal_mode="wal", database_sqlite_synchronous="full")
+    assert (configured.database_sqlite_journal_mode, configured.database_sqlite_synchronous) == (
+        "WAL",
+        "FULL",
+    )
+    with pytest.raises(ValidationError):
+        Settings(database_sqlite_synchronous="fast")
+
+
+async def test_sqlite_profile_sets_pragmas_on_connect(tmp_path: Path) -> None:
+    """Test file-backed SQLite connections run in WAL with the configured pragmas."""
+    options = EngineOptions(sqlite_busy_timeout=1234, sqlite_mmap_size=1 << 20)
+    database = Database(f"sqlite+aiosqlite:///{tmp_path / 'vpn.db'}", options=options)
+    async with database.engine.connect() as conn:
+        pragmas = {
+            name: (await conn.exec_driver_sql(f"PRAGMA {name}")).scalar()
+            for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size")
+        }
+    await database.close()
+
+    assert pragmas == {
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "busy_timeout": 1234,
+        "mmap_size": 1 << 20,
+    }
@@ -0,0 +1,45 @@
+"""Tests for client placement."""
+
+import pytest
+
+from src.application.fleet import FleetService
+from src.application.placement import (
+    PlacementEngine,
+    PlacementUnavailableException,
+    create_policy,
+)
+from src.infrastructure.fleet import NodeRegistry
+from tests.conftest import FakeVPNServer, make_client
+
+
+@pytest.fixture
+def engine(fake_server: FakeVPNServer) -> PlacementEngine:
+    """Placement engine over two nodes."""
+    second = FakeVPNServer()
+    second.put_inbound(5, [make_client(f"s{i}") for i in range(3)])
+    registry = NodeRegistry(default_node="main")
+    registry.register("main", fake_server)
+    registry.register("second", second)
+    return PlacementEngine(
+        FleetService(registry, timeout=1),
+        policy=create_policy("least_clients"),
+        interval=60,
+    )
+
+
+async def test_least_clients_spreads_burst(engine: PlacementEngine) -> None:
+    """Test burst of placements between refreshes spreads over inbounds."""
+    await engine.refresh()
+
+    chosen = [(c.node, c.inbound_id) for c in (engine.choose() for _ in range(3))]
+
+    assert chosen == [("main", 2), ("main", 1), ("main", 2)]
+
+
+async def test_choose_restricted_to_node(engine: PlacementEngine) -> None:
+    """Test placement can be limited to one node."""
+    await engine.refresh()
+
+    assert engine.choose(node="second", policy="weighted").inbound_id == 5
+    with pytest.raises(PlacementUnavailableException):
+        engine.choose(node="missing")
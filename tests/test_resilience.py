@@ -0,0 +1,136 @@
+"""Tests for panel request retries and circuit breaker."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.domain.entities import Client
+from src.domain.exceptions import (
+    DomainException,
+    NodeUnavailableException,
+    VPNServerException,
+)
+from src.infrastructure.resilience import CircuitBreaker, CircuitState, RetryPolicy
+from src.infrastructure.x_ui_adapter import XUIAdapter
+from tests.test_x_ui_adapter import BASE_URL, login_response
+
+NO_DELAY = RetryPolicy(attempts=3, base_delay=0)
+
+
+def make_adapter(
+    handler, retry: RetryPolicy = NO_DELAY, breaker: CircuitBreaker | None = None
+) -> XUIAdapter:
+    """Adapter with retries and mocked transport."""
+    return XUIAdapter(
+        base_url=BASE_URL,
+        username="admin",
+        password="admin",
+        transport=httpx.MockTransport(handler),
+        retry=retry,
+        breaker=breaker,
+    )
+
+
+async def test_get_is_retried_but_add_client_is_not() -> None:
+    """Test GET survives gateway errors while a non-idempotent write fails at once."""
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/login"):
+            return login_response()
+        calls.append(request.url.path)
+        if request.url.path.endswith("/addClient"):
+            raise httpx.ReadTimeout("timed out", request=request)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"success": True, "obj": {"cpu": 1.5}})
+
+    adapter = make_adapter(handler)
+    stats = await adapter.get_server_stats()
+    with pytest.raises(VPNServerException):
+        await adapter.add_client(1, Client(id="c1", email="c1", totalGB=0))
+    await adapter.close()
+
+    assert stats.cpu_usage == 1.5
+    assert calls.count("/secret/panel/api/inbounds/addClient") == 1
+
+
+async def test_open_circuit_fails_fast_until_probe_succeeds() -> None:
+    """Test breaker opens after consecutive failures and closes on a probe."""
+    panel_up = False
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if not panel_up:
+            raise httpx.ConnectError("connection refused", request=request)
+        if request.url.path.endswith("/login"):
+            return login_response()
+        return httpx.Response(200, json={"success": True, "obj": {"cpu": 1.5}})
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    adapter = make_adapter(handler, retry=RetryPolicy(), breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(DomainException):
+            await adapter.get_server_stats()
+    with pytest.raises(NodeUnavailableException):
+        await adapter.get_server_stats()
+    assert breaker.state is CircuitState.OPEN
+    assert calls == 2
+
+    panel_up = True
+    breaker._opened_at -= 60  # reset_timeout истёк
+    await adapter.get_server_stats()
+    await adapter.close()
+
+    assert breaker.state is CircuitState.CLOSED
+
+
+async def test_cancelled_ordinary_request_keeps_probe_claimed() -> None:
+    """Test only the probe itself frees the half-open slot when it ends without outcome."""
+    started = {"/slow": asyncio.Event(), "/probe": asyncio.Event()}
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        name = request.url.path.removeprefix("/secret")
+        if name not in started:
+            raise httpx.ConnectError("connection refused", request=request)
+        started[name].set()
+        await release.wait()
+        return httpx.Response(200, json={"success": True})
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    adapter = make_adapter(handler, retry=RetryPolicy(), breaker=breaker)
+
+    slow = asyncio.create_task(adapter._send("GET", "/slow"))
+    await asyncio.wait_for(started["/slow"].wait(), 1)
+    with pytest.raises(VPNServerException):
+        await adapter._send("GET", "/down")
+    breaker._opened_at -= 60  # reset_timeout истёк
+    probe = asyncio.create_task(adapter._send("GET", "/probe"))
+    await asyncio.wait_for(started["/probe"].wait(), 1)
+
+    slow.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await slow
+    # Отменён обычный запрос - проба всё ещё идёт, второй пробы нет
+    with pytest.raises(NodeUnavailableException):
+        breaker.before_request()
+
+    release.set()
+    await asyncio.wait_for(probe, 1)
+    await adapter.close()
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_retry_budget_limits_attempts_and_backoff() -> None:
+    """Test no retry starts after the budget is spent and backoff stops at it."""
+    policy = RetryPolicy(attempts=10, base_delay=5, max_delay=5, budget=1)
+
+    assert policy.should_retry(0, True, status_code=503, elapsed=0.5)
+    assert not policy.should_retry(0, True, status_code=503, elapsed=1.0)
+    assert policy.delay(3, elapsed=0.9) <= 0.1 + 1e-9
+    assert RetryPolicy(attempts=10).should_retry(0, True, status_code=503, elapsed=1e6)
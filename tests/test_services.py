@@ -0,0 +1,127 @@
+"""Tests for application services."""
+
+import pytest
+from pydantic import ValidationError
+
+from src.application.services import BulkAction, ClientTrafficSort, VPNManagementService
+from src.config import Settings
+from src.domain.entities import Client
+from src.domain.exceptions import VPNServerException
+from tests.conftest import FakeVPNServer, make_client, make_stat
+
+
+def traffic_server() -> FakeVPNServer:
+    """Server with clients c0..c9 where client ci used i * 10 bytes down."""
+    server = FakeVPNServer()
+    for inbound_id in (1, 2):
+        clients = [make_client(f"c{i}") for i in range(inbound_id - 1, 10, 2)]
+        inbound = server.put_inbound(inbound_id, clients)
+        inbound.clientStats = [
+            make_stat(inbound_id, client, down=int(client.id[1:]) * 10) for client in clients
+        ]
+    return server
+
+
+async def test_rank_client_traffic_pages_through_top_clients() -> None:
+    """Test top-N ranking over all inbounds with keyset pagination."""
+    service = VPNManagementService(traffic_server())
+
+    first = await service.rank_client_traffic(ClientTrafficSort.DOWN, limit=4)
+    second = await service.rank_client_traffic(ClientTrafficSort.DOWN, limit=4, after=first.last)
+    third = await service.rank_client_traffic(ClientTrafficSort.DOWN, limit=4, after=second.last)
+
+    assert [s.uuid for s in first.items] == ["c9", "c8", "c7", "c6"]
+    assert [s.uuid for s in second.items] == ["c5", "c4", "c3", "c2"]
+    assert [s.uuid for s in third.items] == ["c1", "c0"]
+    assert third.last is None
+
+
+async def test_rank_client_traffic_filters() -> None:
+    """Test ranking honours owner and ascending order."""
+    service = VPNManagementService(traffic_server())
+
+    page = await service.rank_client_traffic(
+        ClientTrafficSort.TOTAL, limit=10, descending=False, client_ids={"c7", "c2", "c5"}
+    )
+
+    assert [s.uuid for s in page.items] == ["c2", "c5", "c7"]
+
+
+class BatchServer(FakeVPNServer):
+    """Fake server recording addClient chunks and rejecting chunks with a "bad" client."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.chunks: list[list[str]] = []
+
+    async def add_clients(self, inbound_id: int, clients: list[Client]) -> list[Client]:
+        self.chunks.append([client.id for client in clients])
+        if any(client.id.startswith("bad") for client in clients):
+            raise VPNServerException("Duplicate email")
+        return clients
+
+
+async def test_add_clients_sends_chunks_and_fails_only_the_broken_one() -> None:
+    """Test batch creation chunks clients and keeps per-item results in order."""
+    server = BatchServer()
+    clients = [make_client(i) for i in ("a", "b", "bad", "c", "d")]
+
+    results = await VPNManagementService(server).add_clients(1, clients, chunk_size=2)
+
+    assert server.chunks == [["a", "b"], ["bad", "c"], ["d"]]
+    assert [r.client.id for r in results] == ["a", "b", "bad", "c", "d"]
+    assert [r.success for r in results] == [True, True, False, False, True]
+    assert results[2].error == "Duplicate email"
+
+
+def test_batch_settings_must_be_positive() -> None:
+    """Test a zero batch size is rejected at startup instead of failing requests."""
+    with pytest.raises(ValidationError):
+        Settings(x_ui_batch_size=0)
+    with pytest.raises(ValidationError):
+        Settings(x_ui_bulk_concurrency=0)
+
+
+class FlakyServer(FakeVPNServer):
+    """Fake server failing deletes of clients whose id starts with "bad"."""
+
+    async def delete_client(self, inbound_id: int, client_id: str) -> bool:
+        if client_id.startswith("bad"):
+            self.calls.append(f"delete_client:{inbound_id}")
+            raise VPNServerException(f"Panel refused to delete {client_id}")
+        return await super().delete_client(inbound_id, client_id)
+
+
+async def test_bulk_mutation_groups_by_inbound_in_one_lookup() -> None:
+    """Test bulk disable resolves ids with one listing and skips unchanged clients."""
+    server = FakeVPNServer()
+    server.put_inbound(1, [make_client("a"), make_client("b")])
+    server.put_inbound(2, [make_client("c").model_copy(update={"enable": False})])
+
+    results = await VPNManagementService(server).bulk_mutate_clients(
+        ["a", "c", "zzz", "b"], BulkAction.DISABLE, concurrency=2
+    )
+
+    assert [(r.client_id, r.inbound_id, r.success) for r in results] == [
+        ("a", 1, True),
+        ("c", 2, True),
+        ("zzz", None, False),
+        ("b", 1, True),
+    ]
+    assert results[2].error == "Client zzz not found"
+    assert server.calls == ["get_inbounds", "update_client:1", "update_client:1"]
+    assert not any(client.enable for client in server.inbounds[1].settings.clients)
+
+
+async def test_bulk_delete_reports_partial_failure() -> None:
+    """Test a failed client does not stop the rest of its inbound group."""
+    server = FlakyServer()
+    server.put_inbound(1, [make_client("a"), make_client("bad"), make_client("b")])
+
+    results = await VPNManagementService(server).bulk_mutate_clients(
+        ["a", "bad", "b"], BulkAction.DELETE, concurrency=1
+    )
+
+    assert [r.success for r in results] == [True, False, True]
+    assert results[1].error == "Panel refused to delete bad"
+    assert [c.id for c in server.inbounds[1].settings.clients] == ["bad"]
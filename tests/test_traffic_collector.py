@@ -0,0 +1,124 @@
+"""Tests for traffic time-series collector."""
+
+import pytest
+
+from src.infrastructure.fleet import NodeRegistry
+from src.infrastructure.persistence import (
+    Database,
+    TrafficGranularity,
+    TrafficRepository,
+    TrafficScope,
+)
+from src.infrastructure.traffic_collector import DAY, HOUR, TrafficCollector
+from tests.conftest import FakeVPNServer, make_stat
+
+START = 1_700_000_000 // DAY * DAY  # полночь
+
+
+def set_counters(server: FakeVPNServer, up: int, down: int) -> None:
+    """Set cumulative counters of inbound 1 and its client "a"."""
+    inbound = server.inbounds[1]
+    client = inbound.settings.clients[0]
+    server.inbounds[1] = inbound.model_copy(
+        update={"up": up, "down": down, "clientStats": [make_stat(1, client, up, down)]}
+    )
+
+
+async def test_deltas_rolled_up_with_counter_reset(
+    fake_server: FakeVPNServer, database: Database
+) -> None:
+    """Test samples become hourly and daily deltas, surviving a counter reset."""
+    registry = NodeRegistry(default_node="main")
+    registry.register("main", fake_server)
+    collector = TrafficCollector(
+        registry,
+        database,
+        interval=60,
+        raw_retention=2 * DAY,
+        hourly_retention=31 * DAY,
+        daily_retention=400 * DAY,
+        node_timeout=1,
+    )
+
+    for offset, up in [(0, 100), (600, 150), (HOUR + 60, 400), (HOUR + 600, 30)]:
+        set_counters(fake_server, up=up, down=0)
+        await collector.sample(now=START + offset)
+    await collector.rollup(now=START + DAY + 60)
+
+    async with database.session() as session:
+        repository = TrafficRepository(session)
+        hourly = await repository.get_series(
+            "main", TrafficScope.CLIENT, "a", TrafficGranularity.HOUR, START, START + DAY
+        )
+        daily = await repository.get_series(
+            "main", TrafficScope.INBOUND, "1", TrafficGranularity.DAY, START, START + DAY
+        )
+
+    # Первый сэмпл - базовая линия; 400 -> 30 означает сброс счётчика
+    assert [(row.bucket - START, row.up) for row in hourly] == [(0, 50), (HOUR, 280)]
+    assert [(row.bucket, row.up) for row in daily] == [(START, 330)]
+
+
+def make_collector(registry: NodeRegistry, database: Database) -> TrafficCollector:
+    return TrafficCollector(
+        registry,
+        database,
+        interval=60,
+        raw_retention=2 * DAY,
+        hourly_retention=31 * DAY,
+        daily_retention=400 * DAY,
+        node_timeout=1,
+    )
+
+
+async def test_only_lease_holder_collects(fake_server: FakeVPNServer, database: Database) -> None:
+    """Test collectors of several workers do not store the same deltas twice."""
+    registry = NodeRegistry(default_node="main")
+    registry.register("main", fake_server)
+    first, second = make_collector(registry, database), make_collector(registry, database)
+
+    for offset, up in [(0, 100), (60, 150)]:
+        set_counters(fake_server, up=up, down=0)
+        assert await first.collect(now=START + offset)
+        assert not await second.collect(now=START + offset)
+
+    # Держатель пропал: аренда истекает, второй начинает с базовой линии
+    takeover = START + 60 + 3 * 60
+    set_counters(fake_server, up=400, down=0)
+    assert await second.collect(now=takeover)
+    set_counters(fake_server, up=500, down=0)
+    assert await second.collect(now=takeover + 60)
+    assert not await first.collect(now=takeover + 60)
+
+    async with database.session() as session:
+        raw = await TrafficRepository(session).get_series(
+            "main", TrafficScope.INBOUND, "1", TrafficGranularity.RAW, START, START + DAY
+        )
+    assert [(row.bucket - START, row.up) for row in raw] == [(60, 50), (takeover + 60 - START, 100)]
+
+
+async def test_failed_rollup_is_retried(
+    fake_server: FakeVPNServer, database: Database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test a rolled back rollup does not advance the watermark."""
+    registry = NodeRegistry(default_node="main")
+    registry.register("main", fake_server)
+    collector = make_collector(registry, database)
+    for offset, up in [(0, 100), (600, 150)]:
+        set_counters(fake_server, up=up, down=0)
+        await collector.sample(now=START + offset)
+
+    async def fail(*args: object) -> int:
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(TrafficRepository, "delete_older_than", fail)
+    with pytest.raises(RuntimeError):
+        await collector.rollup(now=START + HOUR + 60)
+    monkeypatch.undo()
+    await collector.rollup(now=START + HOUR + 60)
+
+    async with database.session() as session:
+        hourly = await TrafficRepository(session).get_series(
+            "main", TrafficScope.INBOUND, "1", TrafficGranularity.HOUR, START, START + DAY
+        )
+    assert [(row.bucket, row.up) for row in hourly] == [(START, 50)]
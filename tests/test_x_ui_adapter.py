@@ -0,0 +1,328 @@
+"""Tests for 3x-ui adapter."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.domain.entities import Client, Settings
+from src.domain.exceptions import AuthenticationException, VPNServerException
+from src.infrastructure.lazy_inbound import LazyInbound
+from src.infrastructure.x_ui_adapter import XUIAdapter
+from tests.conftest import make_client, make_stat
+
+BASE_URL = "https://panel.test/secret"
+
+
+def make_adapter(handler) -> XUIAdapter:
+    """Create adapter with mocked HTTP transport."""
+    return XUIAdapter(
+        base_url=BASE_URL,
+        username="admin",
+        password="admin",
+        transport=httpx.MockTransport(handler),
+    )
+
+
+def login_response() -> httpx.Response:
+    """Successful 3x-ui login response."""
+    return httpx.Response(
+        200,
+        json={"success": True, "msg": ""},
+        headers={"Set-Cookie": "3x-ui=cookie-value; Path=/"},
+    )
+
+
+async def test_login_happens_once_for_many_requests() -> None:
+    """Test session is reused between requests."""
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path.endswith("/login"):
+            return login_response()
+        return httpx.Response(200, json={"success": True, "obj": {"cpu": 1.5}})
+
+    adapter = make_adapter(handler)
+    for _ in range(3):
+        await adapter.get_server_stats()
+    await adapter.close()
+
+    assert calls.count("/secret/login") == 1
+    assert len(calls) == 4
+
+
+async def test_expired_session_is_refreshed_once_for_concurrent_requests() -> None:
+    """Test concurrent requests hitting an expired session share one re-login."""
+    logins = 0
+    expired = False
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal logins, expired
+        if request.url.path.endswith("/login"):
+            logins += 1
+            expired = False
+            return login_response()
+        await asyncio.sleep(0)
+        if expired:
+            return httpx.Response(401)
+        return httpx.Response(200, json={"success": True, "obj": {}})
+
+    adapter = make_adapter(handler)
+    await adapter.ensure_authenticated()
+    expired = True
+
+    await asyncio.gather(*(adapter.get_server_stats() for _ in range(10)))
+    await adapter.close()
+
+    assert logins == 2
+
+
+async def test_redirect_to_login_page_triggers_relogin() -> None:
+    """Test redirect to the panel login page is treated as expired session."""
+    logins = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal logins
+        path = request.url.path
+        if path.endswith("/login") and request.method == "POST":
+            logins += 1
+            return login_response()
+        if path == "/secret/":
+            return httpx.Response(200, text="<html>login</html>")
+        if logins < 2:
+            return httpx.Response(307, headers={"Location": "/secret/"})
+        return httpx.Response(200, json={"success": True, "obj": {}})
+
+    adapter = make_adapter(handler)
+    await adapter.get_server_stats()
+    await adapter.close()
+
+    assert logins == 2
+
+
+async def test_session_expired_message_replays_only_reads() -> None:
+    """Test a session-expired msg re-logs in, replaying GETs but never POSTs."""
+    logins = 0
+    sent: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal logins
+        if request.url.path.endswith("/login"):
+            logins += 1
+            return login_response()
+        sent.append(request.method)
+        if len(sent) in (1, 3):
+            msg = "Your session has expired, please log in again."
+            return httpx.Response(200, json={"success": False, "msg": msg})
+        return httpx.Response(200, json={"success": True, "obj": []})
+
+    adapter = make_adapter(handler)
+    assert await adapter.get_inbounds() == []
+    with pytest.raises(AuthenticationException):
+        await adapter.delete_inbound(1)
+    await adapter.close()
+
+    assert sent == ["GET", "GET", "POST"]
+    assert logins == 3
+
+
+async def test_session_cookie_deleted_by_panel_means_expiry_in_any_locale() -> None:
+    """Test expiry is recognised from the deleted cookie when the msg is not en/ru."""
+    logins = 0
+    sent = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal logins, sent
+        if request.url.path.endswith("/login"):
+            logins += 1
+            return login_response()
+        sent += 1
+        if sent == 1:
+            return httpx.Response(
+                200,
+                json={"success": False, "msg": "Sitzung abgelaufen, bitte erneut anmelden"},
+                headers={"Set-Cookie": "3x-ui=; Path=/; Max-Age=0"},
+            )
+        return httpx.Response(200, json={"success": True, "obj": []})
+
+    adapter = make_adapter(handler)
+    assert await adapter.get_inbounds() == []
+    await adapter.close()
+
+    assert (logins, sent) == (2, 2)
+
+
+async def test_unrelated_error_mentioning_auth_is_not_a_session_error() -> None:
+    """Test panel errors that merely contain "auth" are not treated as expiry."""
+    logins = 0
+    posts = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal logins, posts
+        if request.url.path.endswith("/login"):
+            logins += 1
+            return login_response()
+        posts += 1
+        return httpx.Response(200, json={"success": False, "msg": "Duplicate author email"})
+
+    adapter = make_adapter(handler)
+    with pytest.raises(VPNServerException, match="Duplicate author"):
+        await adapter.add_client(1, Client(id="1", email="1@vpn.local", totalGB=0))
+    await adapter.close()
+
+    assert (logins, posts) == (1, 1)
+
+
+async def test_concurrent_identical_gets_are_coalesced() -> None:
+    """Test concurrent identical reads share one upstream call and its errors."""
+    list_calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal list_calls
+        if request.url.path.endswith("/login"):
+            return login_response()
+        list_calls += 1
+        await asyncio.sleep(0.01)
+        if list_calls > 1:
+            return httpx.Response(200, json={"success": False, "msg": "boom"})
+        return httpx.Response(200, json={"success": True, "obj": []})
+
+    adapter = make_adapter(handler)
+    results = await asyncio.gather(*(adapter.get_inbounds() for _ in range(200)))
+    errors = await asyncio.gather(
+        *(adapter.get_inbounds() for _ in range(5)), return_exceptions=True
+    )
+    await adapter.close()
+
+    assert results == [[]] * 200
+    assert list_calls == 2
+    assert all(isinstance(error, VPNServerException) for error in errors)
+    stats = adapter.runtime_stats()["coalescing"]
+    assert stats["executions"] == 2
+    assert stats["coalesced"] == 203
+    assert stats["errors"] == 1
+
+
+async def test_add_clients_sends_single_request() -> None:
+    """Test batch add puts every client into one addClient call."""
+    bodies: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/login"):
+            return login_response()
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={"success": True, "obj": None})
+
+    adapter = make_adapter(handler)
+    clients = [Client(id=str(i), email=f"{i}@vpn.local", totalGB=0) for i in range(50)]
+    await adapter.add_clients(3, clients)
+    await adapter.close()
+
+    assert len(bodies) == 1
+    assert bodies[0]["id"] == 3
+    assert len(json.loads(bodies[0]["settings"])["clients"]) == 50
+
+
+async def test_iter_inbounds_streams_after_relogin() -> None:
+    """Test streamed inbound listing re-logs in on expired session and parses every item."""
+    logins = 0
+    inbounds = [
+        {
+            "id": i,
+            "port": 10000 + i,
+            "settings": json.dumps(
+                {"clients": [{"id": f"c{i}", "email": f"c{i}@vpn.local", "totalGB": 0}]}
+            ),
+            "streamSettings": "{}",
+            "sniffing": "{}",
+        }
+        for i in range(1, 4)
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal logins
+        if request.url.path.endswith("/login"):
+            logins += 1
+            return login_response()
+        if logins < 2:
+            return httpx.Response(401)
+        return httpx.Response(200, json={"success": True, "msg": "", "obj": inbounds})
+
+    adapter = make_adapter(handler)
+    streamed = [inbound async for inbound in adapter.iter_inbounds()]
+    await adapter.close()
+
+    assert logins == 2
+    assert [inbound.id for inbound in streamed] == [1, 2, 3]
+    assert streamed[2].settings.clients[0].email == "c3@vpn.local"
+
+
+def test_parsed_inbound_decodes_clients_on_first_access() -> None:
+    """Test panel inbound keeps sub-documents raw until they are read."""
+    inbound = LazyInbound.from_panel(
+        {
+            "id": 1,
+            "up": 5,
+            "protocol": "vless",
+            "settings": json.dumps({"clients": [{"id": "a", "email": "a@x", "totalGB": 0}]}),
+            "streamSettings": '{"network": "tcp"}',
+            "sniffing": "{}",
+            "clientStats": None,
+        }
+    )
+
+    assert inbound.up == 5
+    assert "settings" not in inbound.__dict__
+    copy = inbound.model_copy(update={"remark": "copy"})
+    assert inbound.settings.clients[0].id == "a"
+    assert copy.settings.clients[0].id == "a"
+    assert inbound.model_dump()["stream_settings"] == {"network": "tcp"}
+    assert inbound.clientStats == []
+
+
+def test_unmaterialized_inbound_copies_dumps_and_compares() -> None:
+    """Test model_copy, model_dump and == work before any lazy field was read."""
+    data = {
+        "id": 1,
+        "settings": json.dumps({"clients": [make_client("a").model_dump()]}),
+        "streamSettings": '{"network": "tcp"}',
+        "clientStats": [make_stat(1, make_client("a"), up=7).model_dump()],
+    }
+    inbound = LazyInbound.from_panel(data)
+
+    emptied = inbound.model_copy(update={"settings": Settings()})
+    assert emptied.settings.clients == []
+    assert "settings" not in inbound.__dict__
+    assert inbound.model_copy().settings.clients[0].id == "a"
+
+    dumped = LazyInbound.from_panel(data).model_dump()
+    assert dumped["settings"]["clients"][0]["email"] == "a@vpn.local"
+    assert dumped["stream_settings"] == {"network": "tcp"}
+    assert dumped["clientStats"][0]["up"] == 7
+
+    other = LazyInbound.from_panel(dict(data))
+    other.content_version()
+    assert LazyInbound.from_panel(data) == other
+    assert LazyInbound.from_panel(data) != emptied
+
+
+def test_content_version_follows_panel_data() -> None:
+    """Test inbound version is stable for equal data and changes with it."""
+    data = {
+        "id": 1,
+        "up": 5,
+        "settings": json.dumps({"clients": [{"id": "a", "email": "a@x", "totalGB": 0}]}),
+    }
+    inbound = LazyInbound.from_panel(data)
+    version = inbound.content_version()
+
+    assert inbound.settings.clients[0].id == "a"
+    assert LazyInbound.from_panel(dict(data)).content_version() == version
+    assert LazyInbound.from_panel({**data, "up": 6}).content_version() != version
+    updated = inbound.model_copy(
+        update={"settings": inbound.settings.model_copy(update={"clients": []})}
+    )
+    assert updated.content_version() != version
+    assert updated.settings.clients == []